@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Compare OptionsFlowEngine.detect on print dicts with the columnar path.
+
+Generates a synthetic tape of ``prints`` rows, converts it once to a struct of
+arrays (as a columnar feed would deliver it) and times ``detect`` against
+``detect_columnar`` with and without a top-K cut. Install the ``fast`` extra
+(NumPy) for the vectorized filters.
+
+Usage: python scripts/bench_flow.py [prints] [top_k]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from engines import options_flow
+from engines.options_flow import OptionsFlowEngine
+
+
+def synthetic_tape(prints: int):
+    rng = random.Random(3)
+    now = datetime.utcnow()
+    flows = []
+    for i in range(prints):
+        premium = rng.uniform(20_000, 2_000_000)
+        side = rng.choice(["CALL", "PUT"])
+        flows.append(
+            {
+                "ticker": f"T{i % 2000:04d}",
+                "direction": side.lower(),
+                "notional": premium * rng.uniform(3, 6),
+                "premium": premium,
+                "iv": rng.uniform(0.25, 0.9),
+                "expiry": now + timedelta(days=rng.randint(5, 45)),
+                "strike": rng.uniform(80, 120),
+                "spot": rng.uniform(80, 120),
+                "volume_multiple": rng.uniform(0.5, 10),
+                "is_sweep": rng.random() < 0.3,
+                "is_block": rng.random() < 0.2,
+                "option_symbol": f"T{i % 2000:04d}-{i}",
+                "side": side,
+                "volume": rng.randint(500, 5000),
+                "open_interest": rng.randint(500, 10_000),
+            }
+        )
+    return flows
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<32}{elapsed:9.1f}ms  events={len(result)}")
+    return elapsed
+
+
+def main(prints: int, top_k: int):
+    engine = OptionsFlowEngine()
+    flows = synthetic_tape(prints)
+    columns = OptionsFlowEngine.to_columns(flows)
+    if options_flow.np is not None:
+        columns = {name: options_flow.np.asarray(values) for name, values in columns.items()}
+    print(f"{prints} prints, numpy={'yes' if options_flow.np is not None else 'no'}")
+    baseline = timed("detect (dicts)", lambda: engine.detect(flows))
+    full = timed("detect_columnar", lambda: engine.detect_columnar(columns))
+    top = timed(f"detect_columnar top_k={top_k}", lambda: engine.detect_columnar(columns, top_k=top_k))
+    print(f"speedup: {baseline / full:.1f}x all survivors, {baseline / top:.1f}x top-{top_k}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(prints=int(args[0]) if args else 100_000, top_k=int(args[1]) if len(args) > 1 else 500)
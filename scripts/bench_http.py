@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Measure request latency and connection reuse against the local fake vendor.
+
+Usage: python scripts/bench_http.py [requests] [concurrency] [latency_ms]
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+from data.fake_vendor import FakeVendorServer
+from data.http import AsyncHTTPClient
+
+
+async def run_case(label: str, server: FakeVendorServer, client: AsyncHTTPClient, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    tickers = [f"T{i:04d}" for i in range(requests)]
+
+    async def one(ticker: str):
+        async with semaphore:
+            await client.get_json(f"{server.base_url}/v2/aggs/{ticker}", {"limit": 50})
+
+    accepted_before = server.stats["connections"]
+    start = time.perf_counter()
+    await asyncio.gather(*(one(t) for t in tickers))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(client.latencies_ms)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<12} {requests / elapsed:>9.0f} req/s  p50={statistics.median(latencies):6.2f}ms "
+        f"p95={p95:6.2f}ms p99={p99:6.2f}ms  opened={client.stats['connections_opened']} "
+        f"reused={client.stats['connections_reused']} server_accepts={server.stats['connections'] - accepted_before}"
+    )
+    await client.close()
+
+
+async def main(requests: int, concurrency: int, latency_ms: float):
+    async with FakeVendorServer(latency_ms=latency_ms) as server:
+        print(f"{requests} requests, concurrency={concurrency}, server latency={latency_ms}ms")
+        await run_case("keep-alive", server, AsyncHTTPClient(max_connections_per_host=concurrency), requests, concurrency)
+        await run_case(
+            "no-reuse",
+            server,
+            AsyncHTTPClient(max_connections_per_host=concurrency, keepalive_seconds=0),
+            requests,
+            concurrency,
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        main(
+            requests=int(args[0]) if len(args) > 0 else 2_000,
+            concurrency=int(args[1]) if len(args) > 1 else 16,
+            latency_ms=float(args[2]) if len(args) > 2 else 1.0,
+        )
+    )
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Compare per-candidate ScoringEngine.score with one score_batch call.
+
+Builds ``candidates`` synthetic candidates and times the existing loop (full
+presentation for every candidate), ``score_batch`` (presentation only above
+the reject cut-off) and the bare ``score_columns`` vector pass. Install the
+``fast`` extra (NumPy) for the vectorized path.
+
+Usage: python scripts/bench_scoring.py [candidates]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from engines import scoring
+from engines.scoring import ScoringEngine
+from models.schemas import Candidate, Direction, FlowEvent, MarketRegimeState, PriceSnapshot, TechnicalContext
+
+
+def synthetic_candidates(count: int):
+    rng = random.Random(9)
+    now = datetime.utcnow()
+    candidates = []
+    for i in range(count):
+        ticker = f"T{i % 5000:04d}"
+        direction = rng.choice([Direction.CALL, Direction.PUT])
+        flow = FlowEvent(
+            ticker=ticker,
+            direction=direction,
+            notional=rng.uniform(1e6, 1e7),
+            premium=rng.uniform(2.5e5, 2e6),
+            iv=0.4,
+            expiry_horizon=timedelta(days=20),
+            dte=20,
+            conviction_score=rng.uniform(0.5, 6),
+            spot_price=100.0,
+            strike=105.0,
+            expiry=now + timedelta(days=20),
+            option_symbol=f"{ticker}C105-{i}",
+            side=direction.value.upper(),
+            volume_multiple=rng.uniform(2, 10),
+            is_sweep=rng.random() < 0.3,
+        )
+        price = PriceSnapshot(ticker=ticker, price=100.0, change_pct=0.5, volume=1e6, vwap=99.5, sector_strength=0.0)
+        regime = MarketRegimeState("neutral", rng.uniform(0.2, 1.5), 0.01, "balanced", 0.1, 0.2, "bench")
+        technical = TechnicalContext(
+            ticker, rng.uniform(20, 80), rng.gauss(0, 1), rng.gauss(0, 1), 100.0, 99.0, 98.0, 99.5, 1e6, 1.0, rng.choice(["bullish", "bearish", "neutral"])
+        )
+        candidates.append(Candidate(ticker=ticker, flow=flow, price=price, regime=regime, technical=technical))
+    news = [rng.random() < 0.5 for _ in range(count)]
+    return candidates, news
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<28}{elapsed:9.1f}ms")
+    return elapsed
+
+
+def main(count: int):
+    engine = ScoringEngine()
+    candidates, news = synthetic_candidates(count)
+    print(f"{count} candidates, numpy={'yes' if scoring.np is not None else 'no'}")
+    loop = timed("score (per candidate)", lambda: [engine.score(c, has_news=n) for c, n in zip(candidates, news)])
+    batch = timed("score_batch", lambda: engine.score_batch(candidates, news))
+    features = ScoringEngine.features(candidates, news)
+    columns = timed("score_columns (vectors)", lambda: engine.score_columns(features))
+    kept = sum(1 for c in candidates if c.total_score >= 50)
+    print(f"above reject: {kept}/{count}")
+    print(f"speedup: {loop / batch:.1f}x batch, {loop / columns:.1f}x vector pass")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(count=int(args[0]) if args else 50_000)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Compare per-row AlertStore writes with one batched transaction.
+
+The baseline mirrors the previous store: a new connection and a commit per
+row in rollback-journal mode with ``synchronous=FULL``. It is timed against
+``record_signal`` on the long-lived WAL connection and against a single
+``record_signals`` call, each on a fresh database in a temp directory.
+
+It then measures event-loop stalls while a cycle's signals are persisted in
+per-ticker batches, once with ``record_signals`` called on the loop and once
+through ``AsyncAlertWriter``. A heartbeat task records its worst and total
+wake-up delay. The writer's residual stall is GIL hand-off, bounded by
+``sys.getswitchinterval()`` rather than by transaction size.
+
+Usage: python scripts/bench_storage.py [rows]
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from core.alert_writer import AsyncAlertWriter
+from core.storage import AlertStore
+from models.schemas import Candidate, Direction, FlowEvent, MarketRegimeState, PriceSnapshot, RoutedSignal, ScoreResult, TechnicalContext
+
+
+def synthetic_signals(count: int):
+    now = datetime.utcnow()
+    routes = ["immediate_alert", "intraday_watch", "swing_watch"]
+    signals = []
+    for i in range(count):
+        ticker = f"T{i % 500:03d}"
+        flow = FlowEvent(
+            ticker=ticker,
+            direction=Direction.CALL if i % 2 else Direction.PUT,
+            notional=1_000_000 + i,
+            premium=250_000,
+            iv=0.4,
+            expiry_horizon=timedelta(days=20),
+            dte=20,
+            conviction_score=2.0,
+            spot_price=100.0,
+            strike=105.0,
+            expiry=now + timedelta(days=20),
+            option_symbol=f"{ticker}C105",
+            side="CALL",
+            volume_multiple=3.0,
+        )
+        price = PriceSnapshot(ticker=ticker, price=100.0, change_pct=0.5, volume=1e6, vwap=99.5, sector_strength=0.0)
+        regime = MarketRegimeState("neutral", 0.3, 0.01, "balanced", 0.1, 0.2, "bench")
+        technical = TechnicalContext(ticker, 55, 0.2, 0.1, 100.0, 99.0, 98.0, 99.5, 1e6, 1.0, "bullish")
+        candidate = Candidate(ticker=ticker, flow=flow, price=price, regime=regime, technical=technical)
+        signals.append(RoutedSignal(candidate=candidate, score=ScoreResult(70, "B", "bench"), route=routes[i % 3]))
+    return signals
+
+
+def legacy_writes(path: str, rows):
+    for row in rows:
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(
+                "INSERT INTO alerts (ticker, route, status, created_at, expires_at, score, grade, direction, reasoning, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            conn.commit()
+
+
+def timed(label: str, count: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30}{elapsed * 1000:9.1f}ms {count / elapsed:12,.0f} rows/s")
+    return elapsed
+
+
+async def loop_stalls_ms(persist):
+    loop = asyncio.get_running_loop()
+    worst = total = 0.0
+
+    async def heartbeat():
+        nonlocal worst, total
+        while True:
+            start = loop.time()
+            await asyncio.sleep(0.001)
+            lag = (loop.time() - start - 0.001) * 1000
+            worst, total = max(worst, lag), total + lag
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    await persist()
+    beat.cancel()
+    return worst, total
+
+
+async def stalls(tmp: str, signals, per_ticker: int = 200):
+    store = AlertStore(os.path.join(tmp, "stall_sync.db"), synchronous="full")
+
+    async def inline():
+        for start in range(0, len(signals), per_ticker):
+            store.record_signals((s, None) for s in signals[start : start + per_ticker])
+            await asyncio.sleep(0)
+
+    inline_ms = await loop_stalls_ms(inline)
+    store.close()
+
+    store = AlertStore(os.path.join(tmp, "stall_writer.db"), synchronous="full")
+    writer = AsyncAlertWriter(store)
+
+    async def queued():
+        for start in range(0, len(signals), per_ticker):
+            await writer.submit((s, None) for s in signals[start : start + per_ticker])
+            await asyncio.sleep(0)
+        await writer.flush()
+
+    writer_ms = await loop_stalls_ms(queued)
+    await writer.close()
+    store.close()
+    for label, (worst, total) in (("inline record_signals", inline_ms), ("AsyncAlertWriter", writer_ms)):
+        print(f"loop stall, {label:<22} worst {worst:6.1f}ms, total {total:8.1f}ms")
+
+
+def main(count: int):
+    signals = synthetic_signals(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = AlertStore(os.path.join(tmp, "legacy.db"), journal_mode="delete", synchronous="full")
+        rows = [legacy._row(signal, {"has_news": False}) for signal in signals]
+        legacy.close()
+        baseline = timed("connect + commit per row", count, lambda: legacy_writes(legacy.db_path, rows))
+
+        store = AlertStore(os.path.join(tmp, "per_row.db"))
+        per_row = timed("record_signal (WAL)", count, lambda: [store.record_signal(s, {"has_news": False}) for s in signals])
+        store.close()
+
+        store = AlertStore(os.path.join(tmp, "batch.db"))
+        batch = timed("record_signals (one txn)", count, lambda: store.record_signals((s, {"has_news": False}) for s in signals))
+        store.close()
+        print(f"speedup: {baseline / per_row:.1f}x per-row WAL, {baseline / batch:.1f}x batched")
+        asyncio.run(stalls(tmp, signals))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(count=int(args[0]) if args else 5_000)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Compare per-ticker TechnicalEngine.evaluate against one evaluate_batch call.
+
+Builds a random-walk universe of ``tickers`` x ``bars`` closes and times the
+existing per-ticker loop, the batch call returning TechnicalContext objects,
+and the columnar compute_batch result. Install the ``fast`` extra (NumPy) for
+the vectorized path; without it the batch API falls back to the loop.
+
+Usage: python scripts/bench_technical.py [tickers] [bars]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from engines import technical
+from engines.technical import TechnicalEngine
+
+
+def universe(tickers: int, bars: int):
+    rng = random.Random(11)
+    prices = []
+    for _ in range(tickers):
+        price = rng.uniform(10, 500)
+        row = []
+        for _ in range(bars):
+            price *= 1 + rng.gauss(0, 0.01)
+            row.append(price)
+        prices.append(row)
+    volumes = [rng.uniform(1e4, 1e6) for _ in range(tickers)]
+    vwaps = [row[-1] * rng.uniform(0.98, 1.02) for row in prices]
+    return [f"T{i:04d}" for i in range(tickers)], prices, volumes, vwaps
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<28}{elapsed:9.1f}ms")
+    return elapsed
+
+
+def main(count: int, bars: int):
+    engine = TechnicalEngine()
+    tickers, prices, volumes, vwaps = universe(count, bars)
+    print(f"{count} tickers x {bars} bars, numpy={'yes' if technical.np is not None else 'no'}")
+    loop = timed(
+        "per-ticker evaluate",
+        lambda: [engine.evaluate(t, p, v, w, 0.0) for t, p, v, w in zip(tickers, prices, volumes, vwaps)],
+    )
+    batch = timed("evaluate_batch", lambda: engine.evaluate_batch(tickers, prices, volumes, vwaps))
+    columnar = timed("compute_batch (columnar)", lambda: engine.compute_batch(prices, volumes, vwaps))
+    print(f"speedup: {loop / batch:.1f}x contexts, {loop / columnar:.1f}x columnar")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(count=int(args[0]) if args else 5_000, bars=int(args[1]) if len(args) > 1 else 50)
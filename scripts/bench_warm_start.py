@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""Compare first-cycle latency and vendor calls for a cold and a warm cache.
+
+A DataService talks to the local fake vendor over HTTP and loads price, greeks
+and news for the universe one ticker at a time (the per-ticker stage of a
+refresh). The "warm" run is a fresh DataService reopening the on-disk cache
+written by the cold run, i.e. a restart mid-session.
+
+Usage: python scripts/bench_warm_start.py [tickers] [latency_ms]
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from data.fake_vendor import FakeVendorServer
+from data.service import DataService
+
+
+async def first_cycle(server: FakeVendorServer, cache_path: str, tickers):
+    service = DataService("key", "key", market_base_url=server.base_url, news_base_url=server.base_url, persistent_cache_path=cache_path)
+    requests_before = server.stats["requests"]
+    semaphore = asyncio.Semaphore(32)
+
+    async def load(ticker: str):
+        async with semaphore:
+            await asyncio.gather(service.get_price_snapshot(ticker), service.get_greeks(ticker), service.get_news(ticker))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(load(t) for t in tickers))
+    elapsed = time.perf_counter() - start
+    await service.close()
+    return elapsed, server.stats["requests"] - requests_before
+
+
+async def main(universe: int, latency_ms: float):
+    tickers = [f"T{i:04d}" for i in range(universe)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "market_cache.db")
+        async with FakeVendorServer(latency_ms=latency_ms) as server:
+            cold_seconds, cold_calls = await first_cycle(server, cache_path, tickers)
+            warm_seconds, warm_calls = await first_cycle(server, cache_path, tickers)
+    print(f"{universe} tickers, vendor latency={latency_ms}ms")
+    print(f"cold start: {cold_seconds * 1000:8.1f}ms  vendor calls={cold_calls}")
+    print(f"warm start: {warm_seconds * 1000:8.1f}ms  vendor calls={warm_calls}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(universe=int(args[0]) if args else 500, latency_ms=float(args[1]) if len(args) > 1 else 5.0))
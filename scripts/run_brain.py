@@ -3,18 +3,54 @@ from __future__ import annotations
 
 import asyncio
 import os
+import signal
+from pathlib import Path
 
 from core.brain import TradingBrain
 from core.config import load_config
 from core.logging import get_logger
 from core.scheduler import BrainScheduler
+from core.stream import FlowStreamProcessor
+from data.streaming import ReplayFlowSource, SocketFlowSource
 
 logger = get_logger(__name__)
 
 
+def config_path() -> str:
+    return os.getenv("ALPHA_FLOW_CONFIG", "config/settings.yaml")
+
+
 def bootstrap_config():
-    config_path = os.getenv("ALPHA_FLOW_CONFIG", "config/settings.yaml")
-    return load_config(config_path)
+    return load_config(config_path())
+
+
+async def watch_routing_rules(brain: TradingBrain, path: str, interval_seconds: float):
+    """Recompile routing rules whenever the config file changes on disk."""
+
+    source = Path(path)
+    if not source.exists():
+        source = source.with_name(f"{source.stem}.example{source.suffix}")
+    last_mtime = source.stat().st_mtime if source.exists() else None
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            mtime = source.stat().st_mtime
+        except OSError:
+            continue
+        if mtime == last_mtime:
+            continue
+        last_mtime = mtime
+        load_config.cache_clear()
+        try:
+            brain.reload_rules(load_config(path))
+        except Exception as exc:
+            logger.warning(f"Keeping current routing rules, reload failed: {exc}")
+
+
+def build_flow_source(stream_cfg):
+    if stream_cfg.get("replay_path"):
+        return ReplayFlowSource(stream_cfg["replay_path"], delay_seconds=stream_cfg.get("replay_delay_seconds", 0))
+    return SocketFlowSource(stream_cfg.get("host", "127.0.0.1"), int(stream_cfg.get("port", 9100)), reconnect_seconds=5)
 
 
 async def main():
@@ -23,15 +59,46 @@ async def main():
     tickers = ["AAPL", "MSFT", "TSLA", "NVDA"]
 
     async def run_once(symbols):
-        await brain.refresh(symbols)
+        if brain.recheck_enabled:
+            await asyncio.gather(brain.refresh(symbols), brain.recheck_pending())
+        else:
+            await brain.refresh(symbols)
 
     scheduler = BrainScheduler(interval_seconds=config.get("app", {}).get("scheduler_interval_seconds", 300))
     scheduler.start(run_once, tickers)
+    stream = None
+    stream_cfg = config.get("streaming", {})
+    if stream_cfg.get("enabled"):
+        stream = FlowStreamProcessor(
+            brain,
+            build_flow_source(stream_cfg),
+            batch_size=stream_cfg.get("batch_size", 50),
+            max_batch_delay_ms=stream_cfg.get("max_batch_delay_ms", 25),
+        )
+        stream.start()
+    rules_watcher = None
+    reload_interval = config.get("routing", {}).get("reload_interval_seconds", 5)
+    if reload_interval:
+        rules_watcher = asyncio.create_task(watch_routing_rules(brain, config_path(), reload_interval))
+    # asyncio.run turns Ctrl-C into a cancellation of this task; SIGTERM does
+    # the same so both reach the shutdown below and flush the alert writer.
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    except NotImplementedError:  # pragma: no cover - Windows event loops
+        pass
     try:
         while True:
             await asyncio.sleep(1)
-    except (KeyboardInterrupt, SystemExit):
+    except asyncio.CancelledError:
+        logger.info("Shutting down")
+    finally:
+        if rules_watcher:
+            rules_watcher.cancel()
+        if stream:
+            await stream.shutdown()
         await scheduler.shutdown()
+        await brain.close()
 
 
 if __name__ == "__main__":
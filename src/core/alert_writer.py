@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.logging import StructuredAdapter, get_logger
+from core.storage import AlertStore
+from models.schemas import RoutedSignal
+
+logger = StructuredAdapter(get_logger(__name__), {})
+
+SignalRecord = Tuple[RoutedSignal, Optional[Dict]]
+
+
+class AsyncAlertWriter:
+    """Persists routed signals from a dedicated thread, off the event loop.
+
+    ``submit`` enqueues ``(signal, metadata)`` pairs on a bounded queue and
+    waits for room when it is full, so producers slow down to the rate SQLite
+    can absorb instead of growing memory. A background task drains up to
+    ``batch_size`` records at a time into one ``AlertStore.record_signals``
+    transaction on a single worker thread. ``call`` runs any other store
+    operation on that same thread, after the batches already handed to it.
+    A batch that fails is retried ``max_retries`` times with a doubling
+    delay before it is dropped and counted in ``stats["dropped"]``.
+
+    ``flush`` waits until everything submitted so far is written; ``close``
+    flushes and stops the worker and must be awaited on shutdown.
+    """
+
+    def __init__(
+        self,
+        store: AlertStore,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        max_retries: int = 3,
+        retry_seconds: float = 0.5,
+    ):
+        self.store = store
+        self.max_pending = max(max_pending, 1)
+        self.batch_size = max(batch_size, 1)
+        self.max_retries = max(max_retries, 0)
+        self.retry_seconds = retry_seconds
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-writer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, float] = {"submitted": 0, "written": 0, "batches": 0, "errors": 0, "dropped": 0, "backpressure_waits": 0, "last_batch_ms": 0.0}
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            if self._loop is not loop:
+                self._queue = self._carry_over(self._queue)
+            self._loop = loop
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    def _carry_over(self, old: Optional[asyncio.Queue]) -> asyncio.Queue:
+        # A queue belongs to the loop that created it. Records the old loop
+        # never wrote move to the new queue; a loop that is still running
+        # keeps its writer and a second one is refused.
+        if self._loop is not None and self._loop.is_running():
+            raise RuntimeError("AsyncAlertWriter is already running on another event loop")
+        queue: asyncio.Queue = asyncio.Queue(self.max_pending)
+        while old is not None and not old.empty():
+            queue.put_nowait(old.get_nowait())
+        return queue
+
+    async def submit(self, records: Iterable[SignalRecord]):
+        queue = self._ensure_started()
+        for record in records:
+            if queue.full():
+                self.stats["backpressure_waits"] += 1
+            await queue.put(record)
+            self.stats["submitted"] += 1
+
+    async def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the writer thread and return its result."""
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch: List[SignalRecord] = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            start = time.perf_counter()
+            try:
+                await self._write(batch)
+            finally:
+                self.stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: List[SignalRecord]):
+        # ``record_signals`` is one transaction, so a failed batch left nothing
+        # behind. Once a batch reaches the thread it finishes even if this task
+        # is cancelled, e.g. when ``asyncio.run`` tears its loop down.
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = self._executor.submit(self.store.record_signals, batch)
+                self.stats["written"] += await asyncio.shield(asyncio.wrap_future(written))
+                self.stats["batches"] += 1
+                return
+            except Exception as exc:
+                self.stats["errors"] += 1
+                if attempt == self.max_retries:
+                    self.stats["dropped"] += len(batch)
+                    logger.error(f"Dropped {len(batch)} alerts after {attempt + 1} attempts: {exc}")
+                    return
+                logger.warning(f"Failed to persist {len(batch)} alerts, retrying: {exc}")
+                await asyncio.sleep(self.retry_seconds * 2**attempt)
+
+    async def flush(self):
+        if self._queue is not None:
+            await self._ensure_started().join()
+
+    async def close(self):
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:  # pragma: no cover - expected path
+                pass
+            self._task = None
+        self._executor.shutdown(wait=True)
+        logger.info("Alert writer stopped", extra=self.stats)
@@ -1,26 +1,45 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, List
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
 
 from alerts.dispatcher import AlertDispatcher
 from core.logging import StructuredAdapter, get_logger
+from data.http import AsyncHTTPClient
 from data.service import DataService
-from engines.candidate_builder import CandidateBuilder
+from engines.candidate_builder import CandidateBuilder, CandidateRanker
 from engines.classifier import ClassificationEngine
+from engines.flow_index import FlowIndex
 from engines.market_regime import MarketRegimeEngine
 from engines.options_flow import OptionsFlowEngine
 from engines.routing import RoutingEngine
+from engines.rules import RuleTable
 from engines.scoring import ScoringEngine
 from engines.technical import TechnicalEngine
-from core.storage import AlertStore
+from core.alert_writer import AsyncAlertWriter
+from core.retention import LedgerRetention
+from core.storage import AlertRow, AlertStore
 from learning.engine import LearningEngine
-from models.schemas import Candidate, RoutedSignal
+from models.schemas import Candidate, FlowEvent, MarketRegimeState, PriceSnapshot, RoutedSignal
 
 logger = StructuredAdapter(get_logger(__name__), {})
 
 
+@dataclass
+class TickerInputs:
+    """Provider results gathered for one ticker plus per-call latency in milliseconds."""
+
+    ticker: str
+    price: Optional[PriceSnapshot] = None
+    flows: List[FlowEvent] = field(default_factory=list)
+    greeks: Dict[str, float] = field(default_factory=dict)
+    news: List[Dict] = field(default_factory=list)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+
 class TradingBrain:
     def __init__(self, config: Dict):
         self.config = config
@@ -30,57 +49,386 @@ class TradingBrain:
             market_data_key=md.get("massive_polygon_api_key", ""),
             benzinga_key=news.get("benzinga_api_key", ""),
             cache_ttl_seconds=md.get("cache_ttl_seconds", 120),
+            cache_max_entries=md.get("cache_max_entries", 10_000),
+            cache_max_bytes=md.get("cache_max_bytes") or None,
+            cache_namespace_ttls=md.get("cache_namespace_ttls"),
+            negative_cache_ttl_seconds=md.get("negative_cache_ttl_seconds", 15),
+            bar_lookback=md.get("bar_lookback", 50),
+            bar_capacity=md.get("bar_capacity", 128),
+            market_base_url=md.get("base_url") or None,
+            news_base_url=news.get("base_url") or None,
+            http=self._http_client(md),
+            market_rate_limit=md.get("rate_limit_per_second") or None,
+            market_rate_burst=md.get("rate_limit_burst") or None,
+            news_rate_limit=news.get("rate_limit_per_second") or None,
+            news_rate_burst=news.get("rate_limit_burst") or None,
+            persistent_cache_path=md.get("persistent_cache_path") or None,
+            persistent_cache_max_age_seconds=md.get("persistent_cache_max_age_seconds", 86_400),
+            persistent_prune_every=md.get("persistent_prune_every", 12),
+        )
+        regime_config = self.config.get("regime", {})
+        self.regime_engine = MarketRegimeEngine(
+            history_size=regime_config.get("history_size", 100),
+            max_tickers=regime_config.get("max_tickers", 5_000),
         )
-        self.regime_engine = MarketRegimeEngine()
+        self.regime_scope = regime_config.get("scope", "ticker")
+        symbols = regime_config.get("market_symbols", "SPY,QQQ")
+        self.market_symbols = [s.strip() for s in (symbols.split(",") if isinstance(symbols, str) else symbols) if s.strip()]
+        self.market_regime_ttl = float(regime_config.get("market_ttl_seconds", 60))
+        self._market_regime: Optional[MarketRegimeState] = None
+        self._market_regime_at = 0.0
+        self._market_regime_lock = asyncio.Lock()
         self.flow_engine = OptionsFlowEngine()
-        self.tech_engine = TechnicalEngine()
-        self.candidate_builder = CandidateBuilder()
+        flow_index = self.config.get("flow_index", {})
+        self.flow_index: Optional[FlowIndex] = None
+        if flow_index.get("enabled", True):
+            self.flow_index = FlowIndex(
+                bucket_seconds=flow_index.get("bucket_seconds", 300),
+                window_seconds=flow_index.get("window_seconds", 3_600),
+                growth_threshold=flow_index.get("growth_threshold", 0.5),
+                seen_ttl_seconds=flow_index.get("seen_ttl_seconds", 86_400),
+                max_seen=flow_index.get("max_seen", 500_000),
+                max_contracts=flow_index.get("max_contracts", 50_000),
+            )
+        technical = self.config.get("technical", {})
+        self.tech_engine = TechnicalEngine(
+            incremental=bool(technical.get("incremental", False)),
+            max_tickers=technical.get("max_tickers", 5_000),
+        )
+        candidates_config = self.config.get("candidates", {})
+        self.candidate_builder = CandidateBuilder(max_per_ticker=candidates_config.get("max_per_ticker", 1))
+        self.top_n_candidates = int(candidates_config.get("top_n", 0) or 0)
         self.classifier = ClassificationEngine()
-        self.scoring = ScoringEngine()
+        self.rules = RuleTable.from_config(self.config)
+        self.scoring = ScoringEngine(rules=self.rules)
+        queues = self.config.get("queues", {})
         self.routing = RoutingEngine(
-            intraday_expiry_minutes=self.config.get("queues", {}).get("intraday_refresh_minutes", 60),
-            swing_expiry_days=self.config.get("queues", {}).get("expiry_days", 10),
+            intraday_expiry_minutes=queues.get("intraday_refresh_minutes", 60),
+            swing_expiry_days=queues.get("expiry_days", 10),
+            immediate_retention_minutes=queues.get("immediate_retention_minutes", 24 * 60),
+            rejected_retention_minutes=queues.get("rejected_retention_minutes", 60),
+            max_immediate=queues.get("max_immediate", 1_000),
+            max_rejected=queues.get("max_rejected", 1_000),
+            rules=self.rules,
         )
+        storage = self.config.get("storage", {})
         self.alert_store = AlertStore(
-            db_path=self.config.get("storage", {}).get("path", "data/alerts.db"),
+            db_path=storage.get("path", "data/alerts.db"),
             intraday_expiry_minutes=self.config.get("queues", {}).get("intraday_refresh_minutes", 60),
             swing_expiry_days=self.config.get("queues", {}).get("expiry_days", 10),
+            journal_mode=storage.get("journal_mode", "wal"),
+            synchronous=storage.get("synchronous", "normal"),
+        )
+        self.alert_writer = AsyncAlertWriter(
+            self.alert_store,
+            max_pending=storage.get("writer_queue_size", 10_000),
+            batch_size=storage.get("writer_batch_size", 500),
         )
+        recheck = storage.get("recheck", {})
+        self.recheck_enabled = bool(recheck.get("enabled", False))
+        self.recheck_close_after_check = bool(recheck.get("close_after_check", False))
+        self.recheck_limit = int(recheck.get("limit", 50))
+        retention = storage.get("retention", {})
+        self.retention: Optional[LedgerRetention] = None
+        if retention.get("enabled", False):
+            self.retention = LedgerRetention(
+                self.alert_store,
+                archive_dir=retention.get("archive_dir", "data/archive"),
+                horizon_days=retention.get("horizon_days", 30),
+                interval_minutes=retention.get("interval_minutes", 60),
+                batch_size=retention.get("batch_size", 5_000),
+                vacuum_pages=retention.get("vacuum_pages", 2_000),
+            )
         self.alerts = AlertDispatcher(config)
         self.learning = LearningEngine()
+        self.max_concurrent_tasks = max(int(self.config.get("app", {}).get("max_concurrent_tasks", 5) or 1), 1)
+        self.skip_enrichment_without_flow = bool(self.config.get("app", {}).get("skip_enrichment_without_flow", False))
+        self.fetch_timings: Dict[str, Dict[str, float]] = {}
+        self.batch_prefetch = bool(md.get("batch_prefetch", True))
+
+    def reload_rules(self, config: Dict) -> RuleTable:
+        """Compile the ``routing`` section of ``config`` and swap it in for scoring and routing.
+
+        Raises ``ConfigError`` and keeps the current rules if the section is invalid.
+        """
+
+        rules = RuleTable.from_config(config)
+        self.rules = self.scoring.rules = rules
+        self.routing.set_rules(rules)
+        logger.info("Reloaded routing rules", extra={"bands": rules.bands})
+        return rules
+
+    @staticmethod
+    def _http_client(md: Dict) -> Optional[AsyncHTTPClient]:
+        if not md.get("base_url"):
+            return None
+        return AsyncHTTPClient(
+            max_connections_per_host=md.get("http_max_connections_per_host", 8),
+            keepalive_seconds=md.get("http_keepalive_seconds", 30),
+            timeout=md.get("http_timeout_seconds", 10),
+        )
+
+    @staticmethod
+    async def _timed(name: str, awaitable: Awaitable[Any], timings: Dict[str, float]) -> Any:
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    async def _ticker_greeks(self, ticker: str, timings: Dict[str, float]) -> Dict[str, float]:
+        # With a market-wide regime the per-name greeks are not used.
+        if self.regime_scope == "market":
+            return {}
+        return await self._timed("greeks", self.data.get_greeks(ticker), timings)
+
+    async def market_regime(self, force: bool = False) -> Optional[MarketRegimeState]:
+        """Market-wide regime from ``regime.market_symbols``, cached for ``market_ttl_seconds``.
+
+        Returns None when the index data cannot be loaded. Tickers then keep
+        using the previous market regime, or their own when there is none yet.
+        """
+
+        async with self._market_regime_lock:
+            fresh = time.monotonic() - self._market_regime_at < self.market_regime_ttl
+            if self._market_regime is not None and fresh and not force:
+                return self._market_regime
+            try:
+                snapshots, greeks = await asyncio.gather(
+                    self.data.get_price_snapshots(self.market_symbols),
+                    self.data.get_greeks_many(self.market_symbols),
+                )
+                gex = sum(g.get("gamma", 0) for g in greeks.values()) / max(len(greeks), 1)
+                vex = sum(abs(g.get("vega", 0)) for g in greeks.values()) / max(len(greeks), 1)
+                self._market_regime = self.regime_engine.evaluate_market(snapshots, gex=gex, vex=vex)
+                self._market_regime_at = time.monotonic()
+            except Exception as exc:
+                logger.warning(f"Failed to evaluate market regime: {exc}")
+                return None
+            return self._market_regime
+
+    def detect_flows(self, raw_flows: Iterable[Dict]) -> List[FlowEvent]:
+        """Detect flow and, with the flow index enabled, drop prints already acted on.
+
+        Returned prints are not remembered yet: ``evaluate`` commits them to
+        the index once they have been routed and submitted for storage, so a
+        failure on the way leaves them to be picked up again.
+        """
+
+        events = self.flow_engine.detect(raw_flows)
+        if self.flow_index is not None and events:
+            events, suppressed = self.flow_index.partition(events)
+            # Suppression is final; record it so the premium counts towards growth.
+            self.flow_index.commit(suppressed, passed_on=False)
+        return events
+
+    @staticmethod
+    def _contract_key(event: FlowEvent) -> Tuple[str, str]:
+        return event.ticker, event.option_symbol or event.ticker
+
+    def commit_flows(self, flows: List[FlowEvent]):
+        if self.flow_index is not None and flows:
+            self.flow_index.commit(flows)
+
+    async def fetch_inputs(self, ticker: str) -> TickerInputs:
+        """Issue the provider calls for ``ticker`` concurrently.
+
+        With ``app.skip_enrichment_without_flow`` enabled, greeks and news are
+        only requested once flow detection has produced at least one event.
+        """
+
+        inputs = TickerInputs(ticker=ticker)
+        timings = inputs.timings_ms
+        if self.skip_enrichment_without_flow:
+            inputs.price, raw_flows = await asyncio.gather(
+                self._timed("price", self.data.get_price_snapshot(ticker), timings),
+                self._timed("flow", self.data.get_options_flow(ticker), timings),
+            )
+            inputs.flows = self.detect_flows(raw_flows)
+            if inputs.flows:
+                inputs.greeks, inputs.news = await asyncio.gather(
+                    self._ticker_greeks(ticker, timings),
+                    self._timed("news", self.data.get_news(ticker), timings),
+                )
+        else:
+            inputs.price, raw_flows, inputs.greeks, inputs.news = await asyncio.gather(
+                self._timed("price", self.data.get_price_snapshot(ticker), timings),
+                self._timed("flow", self.data.get_options_flow(ticker), timings),
+                self._ticker_greeks(ticker, timings),
+                self._timed("news", self.data.get_news(ticker), timings),
+            )
+            inputs.flows = self.detect_flows(raw_flows)
+        self.fetch_timings[ticker] = dict(timings)
+        logger.debug("Fetched ticker inputs", extra={"ticker": ticker, **{f"{k}_ms": v for k, v in timings.items()}})
+        return inputs
 
     async def run_for_ticker(self, ticker: str) -> List[RoutedSignal]:
-        price = await self.data.get_price_snapshot(ticker)
-        raw_flows = await self.data.get_options_flow(ticker)
-        flows = self.flow_engine.detect(raw_flows)
-        greeks = await self.data.get_greeks(ticker)
-        gex = greeks.get("gamma", 0)
-        vex = abs(greeks.get("vega", 0))
-        regime = self.regime_engine.evaluate(price.ohlc or [], gex=gex, vex=vex)
-        technical = self.tech_engine.evaluate(ticker, price.ohlc or [], price.volume, price.vwap, price.sector_strength)
-        candidates = self.candidate_builder.build(flows, price, regime, technical)
+        inputs = await self.fetch_inputs(ticker)
+        if not inputs.flows:
+            return []
+        return await self.evaluate(inputs)
+
+    async def process_flows(self, ticker: str, flows: List[FlowEvent]) -> List[RoutedSignal]:
+        """Enrich, score and route flow that was detected outside the polling loop.
+
+        Used by the streaming path: price, greeks and news for ``ticker`` are
+        fetched concurrently (usually from cache) and flow is not re-polled.
+        """
+
+        if not flows:
+            return []
+        if self.regime_scope == "market":
+            await self.market_regime()
+        inputs = TickerInputs(ticker=ticker, flows=flows)
+        timings = inputs.timings_ms
+        inputs.price, inputs.greeks, inputs.news = await asyncio.gather(
+            self._timed("price", self.data.get_price_snapshot(ticker), timings),
+            self._ticker_greeks(ticker, timings),
+            self._timed("news", self.data.get_news(ticker), timings),
+        )
+        return await self.evaluate(inputs)
+
+    async def evaluate(self, inputs: TickerInputs) -> List[RoutedSignal]:
+        signals = await self.process_candidates(self.build_candidates(inputs))
+        self.commit_flows(inputs.flows)
+        return signals
+
+    def build_candidates(self, inputs: TickerInputs) -> List[Tuple[Candidate, bool]]:
+        """Regime, technicals and candidates for one ticker, each paired with its has-news flag."""
+
+        ticker = inputs.ticker
+        price = inputs.price
+        if self.regime_scope == "market" and self._market_regime is not None:
+            regime = self.regime_engine.overlay(self._market_regime, price.ohlc or [])
+        else:
+            gex = inputs.greeks.get("gamma", 0)
+            vex = abs(inputs.greeks.get("vega", 0))
+            regime = self.regime_engine.evaluate(price.ohlc or [], gex=gex, vex=vex, ticker=ticker, bars_total=price.bars_total)
+        technical = self.tech_engine.evaluate(
+            ticker, price.ohlc or [], price.volume, price.vwap, price.sector_strength, bars_total=price.bars_total
+        )
+        candidates = self.candidate_builder.build(inputs.flows, price, regime, technical)
+        has_news = bool(inputs.news)
+        return [(candidate, has_news) for candidate in candidates]
+
+    async def process_candidates(self, candidates: List[Tuple[Candidate, bool]]) -> List[RoutedSignal]:
+        """Classify, score, route, dispatch and record candidates in the given order."""
+
         routed: List[RoutedSignal] = []
-        news_items = await self.data.get_news(ticker)
-        has_news = bool(news_items)
-        for candidate in candidates:
+        records: List[Tuple[RoutedSignal, Dict]] = []
+        for candidate, _ in candidates:
             self.classifier.classify(candidate)
-            score = self.scoring.score(candidate, has_news=has_news)
+        scores = self.scoring.score_batch([c for c, _ in candidates], [news for _, news in candidates])
+        for (candidate, has_news), score in zip(candidates, scores):
             signal = RoutedSignal(candidate=candidate, score=score, route="pending")
             route = self.routing.route(score, signal)
             if route == "immediate_alert":
                 await self.alerts.dispatch(signal)
-            self.alert_store.record_signal(signal, metadata={"has_news": has_news})
+            records.append((signal, {"has_news": has_news}))
             routed.append(signal)
+        await self.alert_writer.submit(records)
         return routed
 
-    async def refresh(self, tickers: Iterable[str]) -> List[RoutedSignal]:
-        signals: List[RoutedSignal] = []
-        for ticker in tickers:
+    async def _run_isolated(self, ticker: str, semaphore: asyncio.Semaphore) -> List[RoutedSignal]:
+        async with semaphore:
             try:
-                signals.extend(await self.run_for_ticker(ticker))
+                return await self.run_for_ticker(ticker)
             except Exception as exc:
                 logger.warning(f"Failed to run for ticker {ticker}: {exc}")
+                return []
+
+    async def _collect_isolated(
+        self, ticker: str, semaphore: asyncio.Semaphore, ranker: CandidateRanker, flows: Dict[Tuple[str, str], List[FlowEvent]]
+    ):
+        async with semaphore:
+            try:
+                inputs = await self.fetch_inputs(ticker)
+                if inputs.flows:
+                    for event in inputs.flows:
+                        flows.setdefault(self._contract_key(event), []).append(event)
+                    for item in self.build_candidates(inputs):
+                        ranker.offer(CandidateRanker.rank_key(item[0]), item)
+            except Exception as exc:
+                logger.warning(f"Failed to collect candidates for {ticker}: {exc}")
+
+    async def refresh(self, tickers: Iterable[str]) -> List[RoutedSignal]:
+        """Run the pipeline for every ticker, at most ``max_concurrent_tasks`` at a time.
+
+        Failures are isolated per ticker and signals are returned in the order
+        of ``tickers`` regardless of completion order. With ``candidates.top_n``
+        set, the cycle runs in two stages instead: candidates are collected for
+        the whole universe into a ``CandidateRanker`` and only the best
+        ``top_n`` are classified, scored and routed, best first. Signals are
+        persisted by ``alert_writer`` off the event loop and flushed before the
+        cycle returns.
+        """
+
+        tickers = list(tickers)
+        if self.batch_prefetch:
+            try:
+                await self.data.prefetch(
+                    tickers, enrichment=not self.skip_enrichment_without_flow, greeks=self.regime_scope != "market"
+                )
+            except Exception as exc:
+                logger.warning(f"Batch prefetch failed, falling back to per-ticker fetches: {exc}")
+        if self.regime_scope == "market":
+            await self.market_regime(force=True)
+        semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
+        if self.top_n_candidates:
+            ranker: CandidateRanker = CandidateRanker(self.top_n_candidates)
+            collected: Dict[Tuple[str, str], List[FlowEvent]] = {}
+            await asyncio.gather(*(self._collect_isolated(ticker, semaphore, ranker, collected) for ticker in tickers))
+            kept = len(ranker)
+            ranked = ranker.drain()
+            signals = await self.process_candidates(ranked)
+            # Contracts ranked out stay unseen and compete again next cycle.
+            contracts = {self._contract_key(candidate.flow) for candidate, _ in ranked}
+            self.commit_flows([event for key in contracts for event in collected.get(key, [])])
+            logger.info("Ranked candidates", extra={"offered": ranker.offered, "kept": kept})
+        else:
+            results = await asyncio.gather(*(self._run_isolated(ticker, semaphore) for ticker in tickers))
+            signals: List[RoutedSignal] = [signal for batch in results for signal in batch]
+        await self.data.persist()
         self.routing.refresh_queues()
-        self.alert_store.expire_stale()
+        logger.debug("Refreshed routing queues", extra={**self.routing.queue_sizes(), **self.routing.stats})
+        await self.alert_writer.flush()
+        await self.alert_writer.call(self.alert_store.expire_stale)
+        if self.retention and self.retention.due():
+            await self.alert_writer.call(self.retention.run)
         self.learning.adjust_weights(self.scoring)
         return signals
+
+    async def recheck_pending(self, limit: Optional[int] = None) -> int:
+        """Re-price queued alerts and record the move since the alert fired.
+
+        Price requests go through the ``immediate``/``intraday``/``swing``
+        rate-limit lanes so they are served ahead of the universe scan. Alerts
+        stay pending, with their latest movement, until they expire, unless
+        ``storage.recheck.close_after_check`` closes them on the first check.
+        """
+
+        lanes = {"immediate_alert": "immediate", "intraday_watch": "intraday", "swing_watch": "swing"}
+        pending = await self.alert_writer.call(self.alert_store.get_pending_for_checks, limit or self.recheck_limit)
+        checked: List[Tuple[int, float]] = []
+
+        async def check(alert: AlertRow) -> bool:
+            try:
+                snapshot = await self.data.get_price_snapshot(alert["ticker"], lane=lanes.get(alert["route"], "swing"))
+            except Exception as exc:
+                logger.warning(f"Failed to recheck alert {alert['id']} for {alert['ticker']}: {exc}")
+                return False
+            spot = alert["spot_price"] or snapshot.price
+            movement = (snapshot.price - spot) / spot * 100 if spot else 0.0
+            if alert["direction"] == "put":
+                movement = -movement
+            checked.append((alert["id"], round(movement, 4)))
+            return True
+
+        results = await asyncio.gather(*(check(alert) for alert in pending))
+        await self.alert_writer.call(self.alert_store.mark_checked_many, checked, self.recheck_close_after_check)
+        return sum(results)
+
+    async def close(self):
+        await self.data.close()
+        await self.alert_writer.close()
+        self.alert_store.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime
+from typing import List, NamedTuple, Sequence
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    statements: Sequence[str]
+
+
+ALERTS_MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "create alerts",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                route TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                expires_at TEXT,
+                score REAL,
+                grade TEXT,
+                direction TEXT,
+                reasoning TEXT,
+                payload TEXT,
+                last_checked_at TEXT,
+                movement_observed REAL
+            )
+            """,
+        ],
+    ),
+    Migration(
+        2,
+        "index alert access paths",
+        [
+            # expire_stale: status='pending' AND expires_at < now
+            "CREATE INDEX IF NOT EXISTS idx_alerts_status_expires ON alerts (status, expires_at)",
+            # get_pending_for_checks: status='pending' ORDER BY created_at
+            "CREATE INDEX IF NOT EXISTS idx_alerts_status_created ON alerts (status, created_at)",
+            # get_history: ticker=? ORDER BY created_at
+            "CREATE INDEX IF NOT EXISTS idx_alerts_ticker_created ON alerts (ticker, created_at)",
+        ],
+    ),
+    Migration(
+        3,
+        "promote payload fields to columns",
+        [
+            "ALTER TABLE alerts ADD COLUMN classification TEXT",
+            "ALTER TABLE alerts ADD COLUMN notional REAL",
+            "ALTER TABLE alerts ADD COLUMN strike REAL",
+            "ALTER TABLE alerts ADD COLUMN spot_price REAL",
+            "ALTER TABLE alerts ADD COLUMN expiry TEXT",
+            "ALTER TABLE alerts ADD COLUMN regime TEXT",
+            "ALTER TABLE alerts ADD COLUMN option_symbol TEXT",
+            """
+            UPDATE alerts SET
+                classification = json_extract(payload, '$.candidate.classification'),
+                notional = json_extract(payload, '$.candidate.flow.notional'),
+                strike = json_extract(payload, '$.candidate.flow.strike'),
+                spot_price = json_extract(payload, '$.candidate.flow.spot_price'),
+                expiry = json_extract(payload, '$.candidate.flow.expiry'),
+                regime = json_extract(payload, '$.candidate.regime')
+            WHERE payload IS NOT NULL AND json_valid(payload)
+            """,
+            # query_pending: status='pending' AND direction=? AND notional >= ?
+            "CREATE INDEX IF NOT EXISTS idx_alerts_status_direction_notional ON alerts (status, direction, notional)",
+        ],
+    ),
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)"
+    )
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration] = ALERTS_MIGRATIONS) -> int:
+    """Apply every migration newer than the recorded schema version.
+
+    Each migration runs in its own transaction together with its
+    ``schema_version`` row, so a failed migration leaves the database at the
+    previous version. Returns the resulting version.
+    """
+
+    current = schema_version(conn)
+    conn.commit()
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        with conn:
+            conn.execute("BEGIN")
+            for statement in migration.statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.utcnow().isoformat()),
+            )
+        logger.info("Applied schema migration", extra={"version": migration.version, "migration": migration.name})
+        current = migration.version
+    return current
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import glob
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from core.logging import get_logger
+from core.storage import AlertStore
+
+logger = get_logger(__name__)
+
+# Archive files are written with explicit column lists so they keep working
+# when the hot table gains columns; missing ones are added on attach.
+ARCHIVED_COLUMNS = {
+    "id": "INTEGER PRIMARY KEY",
+    "ticker": "TEXT NOT NULL",
+    "route": "TEXT NOT NULL",
+    "status": "TEXT NOT NULL",
+    "created_at": "TEXT NOT NULL",
+    "expires_at": "TEXT",
+    "score": "REAL",
+    "grade": "TEXT",
+    "direction": "TEXT",
+    "reasoning": "TEXT",
+    "classification": "TEXT",
+    "notional": "REAL",
+    "strike": "REAL",
+    "spot_price": "REAL",
+    "expiry": "TEXT",
+    "regime": "TEXT",
+    "option_symbol": "TEXT",
+    "payload": "TEXT",
+    "last_checked_at": "TEXT",
+    "movement_observed": "REAL",
+}
+ARCHIVED_STATUSES = ("expired", "checked")
+
+
+class LedgerRetention:
+    """Moves finished alerts out of the hot ``alerts`` table into monthly archives.
+
+    Rows whose status is ``expired`` or ``checked`` and that were created more
+    than ``horizon_days`` ago are copied into ``<archive_dir>/alerts-YYYY-MM.db``
+    (by ``created_at`` month) and deleted from the ledger, ``batch_size`` rows
+    per transaction. Each run then releases up to ``vacuum_pages`` free pages
+    with ``PRAGMA incremental_vacuum`` and truncates the WAL with a checkpoint,
+    so the hot table and file stay sized to the live window.
+
+    ``run`` uses the store's connection and must not overlap other writes; the
+    brain calls it on the ``AsyncAlertWriter`` thread every ``interval_minutes``.
+    Archives are plain SQLite files, readable with ``iter_archived``.
+    """
+
+    def __init__(
+        self,
+        store: AlertStore,
+        archive_dir: str = "data/archive",
+        horizon_days: float = 30,
+        interval_minutes: float = 60,
+        batch_size: int = 5_000,
+        vacuum_pages: int = 2_000,
+    ):
+        self.store = store
+        self.archive_dir = archive_dir
+        self.horizon = timedelta(days=horizon_days)
+        self.interval_seconds = interval_minutes * 60
+        self.batch_size = max(batch_size, 1)
+        self.vacuum_pages = vacuum_pages
+        self._last_run: Optional[float] = None
+        self.stats: Dict[str, float] = {"runs": 0, "archived": 0, "freed_pages": 0, "last_run_ms": 0.0}
+
+    def due(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return self._last_run is None or now - self._last_run >= self.interval_seconds
+
+    def run(self, now: Optional[datetime] = None) -> int:
+        """Archive rows past the horizon, compact the ledger and return the rows moved."""
+
+        start = time.perf_counter()
+        self._last_run = time.monotonic()
+        cutoff = ((now or datetime.utcnow()) - self.horizon).isoformat()
+        moved = 0
+        with self.store._lock:
+            conn = self.store._conn
+            for month in self._months(conn, cutoff):
+                moved += self._archive_month(conn, month, cutoff)
+            self.stats["freed_pages"] += self._compact(conn)
+        self.stats["runs"] += 1
+        self.stats["archived"] += moved
+        self.stats["last_run_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if moved:
+            logger.info("Archived alerts", extra={"rows": moved, "cutoff": cutoff})
+        return moved
+
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"alerts-{month}.db")
+
+    def _months(self, conn: sqlite3.Connection, cutoff: str) -> List[str]:
+        rows = conn.execute(
+            f"""
+            SELECT DISTINCT substr(created_at, 1, 7) FROM alerts
+            WHERE status IN ({",".join("?" * len(ARCHIVED_STATUSES))}) AND created_at < ?
+            """,
+            (*ARCHIVED_STATUSES, cutoff),
+        ).fetchall()
+        return sorted(month for (month,) in rows)
+
+    def _archive_month(self, conn: sqlite3.Connection, month: str, cutoff: str) -> int:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        columns = ", ".join(ARCHIVED_COLUMNS)
+        placeholders = ",".join("?" * len(ARCHIVED_STATUSES))
+        # Month bounds keep the range inside the (status, created_at) index.
+        bounds = (month, min(cutoff, _next_month(month)))
+        conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path(month),))
+        moved = 0
+        try:
+            self._ensure_archive_table(conn)
+            while True:
+                ids = [
+                    row[0]
+                    for row in conn.execute(
+                        f"""
+                        SELECT id FROM main.alerts
+                        WHERE status IN ({placeholders}) AND created_at >= ? AND created_at < ?
+                        LIMIT ?
+                        """,
+                        (*ARCHIVED_STATUSES, *bounds, self.batch_size),
+                    )
+                ]
+                if not ids:
+                    break
+                marks = ",".join("?" * len(ids))
+                # Transactions spanning a WAL database and an attached one are not
+                # atomic, so the archive copy is committed before the delete. A
+                # crash in between leaves the rows in both; the retry replaces them.
+                with conn:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO archive.alerts ({columns}) SELECT {columns} FROM main.alerts WHERE id IN ({marks})",
+                        ids,
+                    )
+                with conn:
+                    conn.execute(f"DELETE FROM main.alerts WHERE id IN ({marks})", ids)
+                moved += len(ids)
+        finally:
+            conn.execute("DETACH DATABASE archive")
+        return moved
+
+    @staticmethod
+    def _ensure_archive_table(conn: sqlite3.Connection):
+        definition = ", ".join(f"{name} {kind}" for name, kind in ARCHIVED_COLUMNS.items())
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS archive.alerts ({definition})")
+            existing = {row[1] for row in conn.execute("PRAGMA archive.table_info(alerts)")}
+            for name, kind in ARCHIVED_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE archive.alerts ADD COLUMN {name} {kind.replace(' NOT NULL', '')}")
+            conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_ticker_created ON alerts (ticker, created_at)")
+
+    def _compact(self, conn: sqlite3.Connection) -> int:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # Ledgers created before incremental vacuum need one full rebuild.
+            logger.info("Enabling incremental vacuum on alert ledger", extra={"path": self.store.db_path})
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+        freed = free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return freed
+
+
+def _next_month(month: str) -> str:
+    year, number = (int(part) for part in month.split("-"))
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def iter_archived(
+    archive_dir: str = "data/archive",
+    ticker: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[Dict]:
+    """Yield archived alerts as dicts, oldest first, optionally filtered.
+
+    Only monthly files overlapping ``since``/``until`` are opened, read-only.
+    ``payload`` is returned as the stored JSON text.
+    """
+
+    clauses, params = [], []
+    if ticker:
+        clauses.append("ticker = ?")
+        params.append(ticker)
+    if since:
+        clauses.append("created_at >= ?")
+        params.append(since.isoformat())
+    if until:
+        clauses.append("created_at < ?")
+        params.append(until.isoformat())
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    for path in sorted(glob.glob(os.path.join(archive_dir, "alerts-????-??.db"))):
+        month = os.path.basename(path)[len("alerts-") : -len(".db")]
+        if (since and month < since.strftime("%Y-%m")) or (until and month > until.strftime("%Y-%m")):
+            continue
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(f"SELECT * FROM alerts {where} ORDER BY created_at", params)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor:
+                yield dict(zip(columns, row))
+        finally:
+            conn.close()
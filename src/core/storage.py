@@ -3,26 +3,116 @@ from __future__ import annotations
 import json
 import os
 import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
 from dataclasses import asdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+from core.migrations import migrate
 from models.schemas import RoutedSignal
 
+EXPIRE_SQL = """UPDATE alerts SET status='expired' WHERE status='pending' AND expires_at IS NOT NULL AND expires_at < ?"""
+
+ALERT_COLUMNS = (
+    "id, ticker, route, status, created_at, expires_at, score, grade, direction, reasoning, "
+    "classification, notional, strike, spot_price, expiry, regime, option_symbol, payload, last_checked_at, movement_observed"
+)
+
+PENDING_SQL = f"""
+SELECT {ALERT_COLUMNS}
+FROM alerts
+WHERE status='pending' AND (expires_at IS NULL OR expires_at >= ?)
+ORDER BY created_at ASC
+LIMIT ?
+"""
+
+HISTORY_SQL = f"""
+SELECT {ALERT_COLUMNS}
+FROM alerts
+WHERE ticker=? AND created_at >= ?
+ORDER BY created_at DESC
+LIMIT ?
+"""
+
+# Pending alerts in one direction above a notional floor, largest first.
+PENDING_FILTERED_SQL = f"""
+SELECT {ALERT_COLUMNS}
+FROM alerts
+WHERE {{where}}
+ORDER BY notional DESC
+LIMIT ?
+"""
+PENDING_FILTERS = ("status='pending'", "direction=?", "notional >= ?", "(expires_at IS NULL OR expires_at >= ?)")
+
+
+class AlertRow(Mapping):
+    """Read-only alert record whose JSON ``payload`` is decoded on first access.
+
+    Promoted fields (ticker, direction, notional, strike, spot_price, ...) are
+    plain columns, so callers that only read those never pay for ``json.loads``.
+    """
+
+    __slots__ = ("_values", "_raw_payload", "_payload")
+
+    def __init__(self, columns: Sequence[str], row: Sequence[Any]):
+        self._values = dict(zip(columns, row))
+        self._raw_payload = self._values.pop("payload", None)
+        self._payload: Optional[Dict] = None
+
+    @classmethod
+    def from_cursor(cls, cursor: sqlite3.Cursor) -> List["AlertRow"]:
+        columns = [column[0] for column in cursor.description]
+        return [cls(columns, row) for row in cursor.fetchall()]
+
+    @property
+    def payload(self) -> Dict:
+        if self._payload is None:
+            self._payload = json.loads(self._raw_payload) if self._raw_payload else {}
+        return self._payload
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "payload":
+            return self.payload
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._values
+        yield "payload"
+
+    def __len__(self) -> int:
+        return len(self._values) + 1
+
+    def __repr__(self) -> str:
+        return f"AlertRow(id={self._values.get('id')!r}, ticker={self._values.get('ticker')!r}, route={self._values.get('route')!r})"
+
 
 class AlertStore:
-    """SQLite-backed store for queued alerts needing follow-up movement checks."""
+    """SQLite-backed store for queued alerts needing follow-up movement checks.
+
+    One connection is opened for the lifetime of the store and shared behind a
+    lock, so the store can be used from a worker thread. The database runs in
+    WAL mode with ``synchronous=NORMAL`` by default: writers append to the log
+    and only fsync on checkpoints. ``record_signals`` and ``mark_checked_many``
+    write a whole cycle in one transaction. Reads return ``AlertRow`` objects.
+    """
 
     def __init__(
         self,
         db_path: str = "data/alerts.db",
         intraday_expiry_minutes: int = 60,
         swing_expiry_days: int = 10,
+        journal_mode: str = "wal",
+        synchronous: str = "normal",
+        busy_timeout_ms: int = 5_000,
     ):
         self.db_path = db_path
         self.intraday_expiry = timedelta(minutes=intraday_expiry_minutes)
         self.swing_expiry = timedelta(days=swing_expiry_days)
+        self._lock = threading.RLock()
         self._ensure_directory()
+        self._conn = self._connect(journal_mode, synchronous, busy_timeout_ms)
         self._ensure_schema()
 
     def _ensure_directory(self):
@@ -30,31 +120,28 @@ class AlertStore:
         if directory and not os.path.exists(directory):
             os.makedirs(directory, exist_ok=True)
 
-    def _connect(self):
-        return sqlite3.connect(self.db_path)
+    def _connect(self, journal_mode: str, synchronous: str, busy_timeout_ms: int) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        # Only takes effect on a new database; LedgerRetention converts old ones.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
     def _ensure_schema(self):
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    route TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    expires_at TEXT,
-                    score REAL,
-                    grade TEXT,
-                    direction TEXT,
-                    reasoning TEXT,
-                    payload TEXT,
-                    last_checked_at TEXT,
-                    movement_observed REAL
-                )
-                """
-            )
-            conn.commit()
+        with self._lock:
+            self.schema_version = migrate(self._conn)
 
     def _expiry_for_route(self, route: str) -> Optional[datetime]:
         now = datetime.utcnow()
@@ -66,10 +153,7 @@ class AlertStore:
             return now + timedelta(hours=4)
         return None
 
-    def record_signal(self, signal: RoutedSignal, metadata: Optional[Dict] = None):
-        if signal.route == "reject":
-            return
-
+    def _row(self, signal: RoutedSignal, metadata: Optional[Dict]) -> Tuple:
         expires_at = self._expiry_for_route(signal.route)
         payload = {
             "candidate": {
@@ -91,74 +175,106 @@ class AlertStore:
             "route": signal.route,
             "metadata": metadata or {},
         }
-        with self._connect() as conn:
-            conn.execute(
+        flow = signal.candidate.flow
+        return (
+            signal.candidate.ticker,
+            signal.route,
+            "pending",
+            signal.created_at.isoformat(),
+            expires_at.isoformat() if expires_at else None,
+            signal.score.score,
+            signal.score.grade,
+            flow.direction.value,
+            signal.score.reasoning,
+            signal.candidate.classification,
+            flow.notional,
+            flow.strike,
+            flow.spot_price,
+            payload["candidate"]["flow"]["expiry"],
+            signal.candidate.regime.risk_environment,
+            flow.option_symbol,
+            json.dumps(payload),
+        )
+
+    def record_signal(self, signal: RoutedSignal, metadata: Optional[Dict] = None):
+        self.record_signals([(signal, metadata)])
+
+    def record_signals(self, signals: Iterable[Tuple[RoutedSignal, Optional[Dict]]]) -> int:
+        """Insert ``(signal, metadata)`` pairs in one transaction; rejects are skipped.
+
+        Returns the number of rows written.
+        """
+
+        rows = [self._row(signal, metadata) for signal, metadata in signals if signal.route != "reject"]
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(
                 """
                 INSERT INTO alerts (
-                    ticker, route, status, created_at, expires_at, score, grade, direction, reasoning, payload
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ticker, route, status, created_at, expires_at, score, grade, direction, reasoning,
+                    classification, notional, strike, spot_price, expiry, regime, option_symbol, payload
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    signal.candidate.ticker,
-                    signal.route,
-                    "pending",
-                    signal.created_at.isoformat(),
-                    expires_at.isoformat() if expires_at else None,
-                    signal.score.score,
-                    signal.score.grade,
-                    signal.candidate.flow.direction.value,
-                    signal.score.reasoning,
-                    json.dumps(payload),
-                ),
+                rows,
             )
-            conn.commit()
+        return len(rows)
 
     def expire_stale(self):
         now = datetime.utcnow().isoformat()
-        with self._connect() as conn:
-            conn.execute(
-                """UPDATE alerts SET status='expired' WHERE status='pending' AND expires_at IS NOT NULL AND expires_at < ?""",
-                (now,),
-            )
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(EXPIRE_SQL, (now,))
 
-    def get_pending_for_checks(self, limit: int = 50) -> List[Dict]:
+    def get_pending_for_checks(self, limit: int = 50) -> List[AlertRow]:
         self.expire_stale()
         now = datetime.utcnow().isoformat()
-        with self._connect() as conn:
-            cursor = conn.execute(
-                """
-                SELECT id, ticker, route, created_at, expires_at, score, grade, direction, reasoning, payload
-                FROM alerts
-                WHERE status='pending' AND (expires_at IS NULL OR expires_at >= ?)
-                ORDER BY created_at ASC
-                LIMIT ?
-                """,
-                (now, limit),
-            )
-            rows = cursor.fetchall()
-        results: List[Dict] = []
-        for row in rows:
-            results.append(
-                {
-                    "id": row[0],
-                    "ticker": row[1],
-                    "route": row[2],
-                    "created_at": row[3],
-                    "expires_at": row[4],
-                    "score": row[5],
-                    "grade": row[6],
-                    "direction": row[7],
-                    "reasoning": row[8],
-                    "payload": json.loads(row[9]) if row[9] else {},
-                }
-            )
-        return results
+        with self._lock:
+            return AlertRow.from_cursor(self._conn.execute(PENDING_SQL, (now, limit)))
+
+    def query_pending(
+        self,
+        direction: str,
+        min_notional: float = 0.0,
+        classification: Optional[str] = None,
+        regime: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[AlertRow]:
+        """Live pending alerts in ``direction`` with at least ``min_notional``, largest first.
+
+        Runs on the ``(status, direction, notional)`` index; ``classification``
+        and ``regime`` are not indexed and are checked on the rows it yields.
+        """
+
+        where, params = list(PENDING_FILTERS), [direction, min_notional, datetime.utcnow().isoformat()]
+        for column, value in (("classification", classification), ("regime", regime)):
+            if value is not None:
+                where.append(f"{column}=?")
+                params.append(value)
+        sql = PENDING_FILTERED_SQL.format(where=" AND ".join(where))
+        with self._lock:
+            return AlertRow.from_cursor(self._conn.execute(sql, (*params, limit)))
 
     def mark_checked(self, alert_id: int, movement_observed: float = 0.0):
-        with self._connect() as conn:
-            conn.execute(
-                """UPDATE alerts SET status='checked', last_checked_at=?, movement_observed=? WHERE id=?""",
-                (datetime.utcnow().isoformat(), movement_observed, alert_id),
-            )
-            conn.commit()
+        self.mark_checked_many([(alert_id, movement_observed)])
+
+    def mark_checked_many(self, checks: Iterable[Tuple[int, float]], close: bool = True) -> int:
+        """Record ``(alert_id, movement_observed)`` pairs in one transaction.
+
+        With ``close`` the alerts become ``checked`` and leave the pending set;
+        otherwise only the movement and check time are updated.
+        """
+
+        checked_at = datetime.utcnow().isoformat()
+        rows = [(checked_at, movement, alert_id) for alert_id, movement in checks]
+        if not rows:
+            return 0
+        status = "status='checked', " if close else ""
+        with self._transaction() as conn:
+            conn.executemany(f"UPDATE alerts SET {status}last_checked_at=?, movement_observed=? WHERE id=?", rows)
+        return len(rows)
+
+    def get_history(self, ticker: str, since: Optional[datetime] = None, limit: int = 100) -> List[AlertRow]:
+        """Alerts recorded for ``ticker`` in any status, newest first."""
+
+        with self._lock:
+            return AlertRow.from_cursor(self._conn.execute(HISTORY_SQL, (ticker, since.isoformat() if since else "", limit)))
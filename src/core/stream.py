@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.logging import StructuredAdapter, get_logger
+from data.streaming import FlowSource
+from models.schemas import RoutedSignal
+
+logger = StructuredAdapter(get_logger(__name__), {})
+
+_END = object()
+
+
+class FlowStreamProcessor:
+    """Event-driven alternative to ``BrainScheduler`` polling.
+
+    Prints from a ``FlowSource`` are grouped into micro-batches of up to
+    ``batch_size`` prints or ``max_batch_delay_ms``, whichever comes first.
+    Each batch runs through ``TradingBrain.detect_flows`` per ticker and only
+    the tickers with surviving events are enriched, scored and routed.
+    Print-to-signal latency is kept in ``latencies_ms`` and counts in
+    ``stats``; routed signals are only collected when ``run`` is asked to,
+    since a live feed never ends.
+    """
+
+    def __init__(self, brain, source: FlowSource, batch_size: int = 50, max_batch_delay_ms: float = 25.0, buffer_size: int = 10_000):
+        self.brain = brain
+        self.source = source
+        self.batch_size = max(batch_size, 1)
+        self.max_batch_delay = max_batch_delay_ms / 1000
+        self._buffer: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.latencies_ms: Deque[float] = deque(maxlen=10_000)
+        self.stats: Dict[str, int] = {"prints": 0, "batches": 0, "signals": 0, "errors": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self.run())
+        logger.info("Flow stream started", extra={"batch_size": self.batch_size})
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:  # pragma: no cover - expected path
+                pass
+        logger.info("Flow stream stopped", extra=self.stats)
+
+    async def run(self, collect: bool = False) -> List[RoutedSignal]:
+        """Consume the source until it ends.
+
+        With ``collect`` (for finite sources such as a replay) every routed
+        signal is returned; otherwise nothing is kept and the result is empty.
+        A batch that fails is logged and counted in ``stats["errors"]``; an
+        error that ends the source is raised once its last prints are handled.
+        """
+
+        reader = asyncio.create_task(self._read())
+        signals: List[RoutedSignal] = []
+        try:
+            while True:
+                batch, ended = await self._next_batch()
+                if batch:
+                    try:
+                        routed = await self._process(batch)
+                    except Exception as exc:
+                        self.stats["errors"] += 1
+                        logger.warning(f"Failed to process a streamed batch of {len(batch)} prints: {exc}")
+                        routed = []
+                    if collect:
+                        signals.extend(routed)
+                if ended:
+                    await reader
+                    return signals
+        finally:
+            reader.cancel()
+
+    async def _read(self):
+        try:
+            async for flow in self.source.stream():
+                await self._buffer.put((flow, time.perf_counter()))
+        finally:
+            try:
+                self._buffer.put_nowait(_END)
+            except asyncio.QueueFull:  # pragma: no cover - consumer is gone or saturated
+                pass
+
+    async def _next_batch(self) -> Tuple[List[Tuple[Dict, float]], bool]:
+        item = await self._buffer.get()
+        if item is _END:
+            return [], True
+        batch = [item]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_batch_delay
+        while len(batch) < self.batch_size:
+            if self._buffer.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._buffer.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._buffer.get_nowait()
+            if item is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _process(self, batch: List[Tuple[Dict, float]]) -> List[RoutedSignal]:
+        self.stats["prints"] += len(batch)
+        self.stats["batches"] += 1
+        by_ticker: Dict[str, List[Tuple[Dict, float]]] = defaultdict(list)
+        for flow, received in batch:
+            by_ticker[flow.get("ticker")].append((flow, received))
+
+        async def run_ticker(ticker: str, items: List[Tuple[Dict, float]]) -> List[RoutedSignal]:
+            try:
+                events = self.brain.detect_flows([flow for flow, _ in items])
+                if not events:
+                    return []
+                routed = await self.brain.process_flows(ticker, events)
+            except Exception as exc:
+                self.stats["errors"] += 1
+                logger.warning(f"Failed to process streamed flow for {ticker}: {exc}")
+                return []
+            done = time.perf_counter()
+            self.latencies_ms.extend((done - received) * 1000 for _, received in items)
+            return routed
+
+        results = await asyncio.gather(*(run_ticker(t, items) for t, items in by_ticker.items()))
+        routed = [signal for signals in results for signal in signals]
+        self.stats["signals"] += len(routed)
+        return routed
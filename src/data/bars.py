@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+class BarRing:
+    """Fixed-size, array-backed ring of (timestamp, close, volume) bars.
+
+    Rolling VWAP and volume over the last ``vwap_window`` bars are maintained
+    incrementally, so each append is O(1).
+    """
+
+    def __init__(self, capacity: int = 128, vwap_window: int = 20):
+        if capacity < vwap_window:
+            raise ValueError("capacity must be at least vwap_window")
+        self.capacity = capacity
+        self.vwap_window = vwap_window
+        self._ts = array("d", bytes(8 * capacity))
+        self._close = array("d", bytes(8 * capacity))
+        self._volume = array("d", bytes(8 * capacity))
+        self.count = 0
+        self.last_ts: Optional[float] = None
+        self._pv_sum = 0.0
+        self._volume_sum = 0.0
+        self._close_sum = 0.0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, ts: float, close: float, volume: float = 0.0) -> bool:
+        """Append a bar newer than the last stored one; older bars are ignored."""
+
+        if self.last_ts is not None and ts <= self.last_ts:
+            return False
+        if self.count >= self.vwap_window:
+            # Read the bar leaving the window before its slot can be reused.
+            leaving = (self.count - self.vwap_window) % self.capacity
+            self._pv_sum -= self._close[leaving] * self._volume[leaving]
+            self._volume_sum -= self._volume[leaving]
+            self._close_sum -= self._close[leaving]
+        slot = self.count % self.capacity
+        self._ts[slot] = ts
+        self._close[slot] = close
+        self._volume[slot] = volume
+        self._pv_sum += close * volume
+        self._volume_sum += volume
+        self._close_sum += close
+        self.count += 1
+        self.last_ts = ts
+        if self.count % self.capacity == 0:
+            self._resum()
+        return True
+
+    def extend(self, bars: Iterable[Dict]) -> int:
+        return sum(self.append(float(bar["t"]), float(bar["c"]), float(bar.get("v", 0.0))) for bar in bars)
+
+    def close_at(self, position: int) -> float:
+        if position < self.count - self.capacity or position >= self.count:
+            raise IndexError("bar is no longer held in the ring")
+        return self._close[position % self.capacity]
+
+    def closes(self, last: Optional[int] = None) -> array:
+        """Copy of the last ``last`` closes, oldest first.
+
+        A copy (two ``array`` slices at most) rather than a view, so snapshots
+        that outlive later appends never see overwritten slots.
+        """
+
+        size = len(self) if last is None else min(last, len(self))
+        start = (self.count - size) % self.capacity
+        if start + size <= self.capacity:
+            return self._close[start : start + size]
+        return self._close[start:] + self._close[: start + size - self.capacity]
+
+    def to_bars(self, last: Optional[int] = None) -> List[Dict]:
+        size = len(self) if last is None else min(last, len(self))
+        slots = ((self.count - size + i) % self.capacity for i in range(size))
+        return [{"t": self._ts[s], "c": self._close[s], "v": self._volume[s]} for s in slots]
+
+    @property
+    def last_close(self) -> float:
+        return self.close_at(self.count - 1)
+
+    @property
+    def window_volume(self) -> float:
+        return self._volume_sum
+
+    @property
+    def vwap(self) -> float:
+        if self._volume_sum > 0:
+            return self._pv_sum / self._volume_sum
+        window = min(self.count, self.vwap_window)
+        return self._close_sum / window if window else 0.0
+
+    def _resum(self):
+        # Periodically rebuild the rolling sums to shed floating point drift.
+        window = min(self.count, self.vwap_window)
+        slots = [(self.count - 1 - i) % self.capacity for i in range(window)]
+        self._pv_sum = sum(self._close[s] * self._volume[s] for s in slots)
+        self._volume_sum = sum(self._volume[s] for s in slots)
+        self._close_sum = sum(self._close[s] for s in slots)
+
+
+class BarStore:
+    """Per-ticker ``BarRing`` registry bounded to ``max_tickers`` (LRU)."""
+
+    def __init__(self, capacity: int = 128, vwap_window: int = 20, max_tickers: int = 5_000):
+        self.capacity = capacity
+        self.vwap_window = vwap_window
+        self.max_tickers = max_tickers
+        self._rings: "OrderedDict[str, BarRing]" = OrderedDict()
+
+    def get(self, ticker: str) -> Optional[BarRing]:
+        ring = self._rings.get(ticker)
+        if ring is not None:
+            self._rings.move_to_end(ticker)
+        return ring
+
+    def last_ts(self, ticker: str) -> Optional[float]:
+        ring = self._rings.get(ticker)
+        return ring.last_ts if ring is not None else None
+
+    def ingest(self, ticker: str, bars: Iterable[Dict]) -> BarRing:
+        ring = self.get(ticker)
+        if ring is None:
+            ring = BarRing(self.capacity, self.vwap_window)
+            self._rings[ticker] = ring
+            while len(self._rings) > self.max_tickers:
+                self._rings.popitem(last=False)
+        ring.extend(bars)
+        return ring
+
+    def __len__(self) -> int:
+        return len(self._rings)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+MISSING = object()
+
+
+class NegativeEntry:
+    """Marker cached in place of a value when a load recently failed."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"NegativeEntry({self.error!r})"
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Cheap recursive ``sys.getsizeof`` estimate, limited to two levels deep."""
+
+    size = sys.getsizeof(value)
+    if _depth >= 2:
+        return size
+    if isinstance(value, Mapping):
+        size += sum(approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item, _depth + 1) for item in value)
+    elif is_dataclass(value) and not isinstance(value, type):
+        size += sum(approximate_size(getattr(value, f.name), _depth + 1) for f in fields(value))
+    return size
+
+
+class LRUTTLCache:
+    """Bounded LRU cache with monotonic-clock expiry and per-namespace TTLs.
+
+    Keys are namespaced by the prefix before the first ``:`` (``price:AAPL`` is
+    in the ``price`` namespace). Entries are evicted least-recently-used first
+    once ``max_entries`` or ``max_bytes`` is exceeded, so memory stays bounded
+    however many keys rotate through. ``get`` returns ``MISSING`` for absent
+    keys, which lets falsy values such as ``{}`` or ``[]`` be cached normally.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 120,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        namespace_ttls: Optional[Dict[str, float]] = None,
+        negative_ttl_seconds: float = 15,
+        clock: Callable[[], float] = time.monotonic,
+        sizeof: Callable[[Any], int] = approximate_size,
+    ):
+        self.ttl = ttl_seconds
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max_bytes
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.negative_ttl = negative_ttl_seconds
+        self._clock = clock
+        self._sizeof = sizeof
+        self._store: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "negative_hits": 0, "evictions": 0, "expirations": 0}
+
+    def ttl_for(self, key: str) -> float:
+        namespace = key.partition(":")[0]
+        return self.namespace_ttls.get(namespace, self.ttl)
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        entry = self._store.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+        expires_at, _, value = entry
+        if self._clock() >= expires_at:
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return default
+        self._store.move_to_end(key)
+        if isinstance(value, NegativeEntry):
+            self.stats["negative_hits"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        if ttl <= 0:
+            self.pop(key)
+            return
+        size = self._sizeof(value) if self.max_bytes else 0
+        if key in self._store:
+            self._remove(key)
+        self._store[key] = (self._clock() + ttl, size, value)
+        self.total_bytes += size
+        self._drop_expired_head()
+        self._enforce_budget()
+
+    def set_negative(self, key: str, error: BaseException, ttl: Optional[float] = None):
+        self.set(key, NegativeEntry(error), ttl=self.negative_ttl if ttl is None else ttl)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        if key not in self._store:
+            return default
+        return self._remove(key)
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        expired = [key for key, (expires_at, _, _) in self._store.items() if now >= expires_at]
+        for key in expired:
+            self._remove(key)
+        self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self._store.clear()
+        self.total_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._store.get(key)
+        return entry is not None and self._clock() < entry[0]
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _remove(self, key: str) -> Any:
+        _, size, value = self._store.pop(key)
+        self.total_bytes -= size
+        return value
+
+    def _drop_expired_head(self):
+        # The least-recently-used entry is the most likely to be stale; checking
+        # it on every write reclaims idle keys without a full scan.
+        if not self._store:
+            return
+        key, (expires_at, _, _) = next(iter(self._store.items()))
+        if self._clock() >= expires_at:
+            self._remove(key)
+            self.stats["expirations"] += 1
+
+    def _enforce_budget(self):
+        while len(self._store) > self.max_entries or (
+            self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._store) > 1
+        ):
+            self._remove(next(iter(self._store)))
+            self.stats["evictions"] += 1
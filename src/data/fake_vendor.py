@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from core.logging import get_logger
+from data.providers import BenzingaProvider, MassivePolygonProvider
+
+logger = get_logger(__name__)
+
+
+class FakeVendorServer:
+    """Local HTTP/1.1 stand-in for the Massive/Polygon and Benzinga APIs.
+
+    Serves the same synthetic data as the stub providers over keep-alive
+    connections so the HTTP providers can be exercised by tests and
+    benchmarks without network access. ``latency_ms`` delays every response
+    and ``fail_next`` answers that many requests with ``fail_status``.
+
+    Routes:
+        GET  /v2/aggs/{ticker}?since=&limit=    -> {"results": [bar, ...]}
+        POST /v2/aggs/batch                     -> {"results": {ticker: [bar, ...]}}
+        GET  /v1/greeks?tickers=A,B             -> {"results": {ticker: greeks}}
+        GET  /v1/flow?tickers=A,B               -> NDJSON stream of flow prints
+        GET  /v2/news?tickers=A,B               -> {"results": {ticker: [item, ...]}}
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, gzip_min_bytes: int = 512):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.gzip_min_bytes = gzip_min_bytes
+        self.fail_next = 0
+        self.fail_status = 429
+        self.retry_after: Optional[float] = None
+        self.market = MassivePolygonProvider("")
+        self.news = BenzingaProvider("")
+        self.stats: Dict[str, int] = {"connections": 0, "requests": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "FakeVendorServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "FakeVendorServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                self.stats["requests"] += 1
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, method, target, body, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, method: str, target: str, body: bytes, headers: Dict[str, str], keep_alive: bool):
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            extra = {"Retry-After": f"{self.retry_after:g}"} if self.retry_after is not None else {}
+            self._write(writer, self.fail_status, b'{"error": "rate limited"}', headers, keep_alive, extra)
+            await writer.drain()
+            return
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        tickers = [t for t in query.get("tickers", "").split(",") if t]
+        path = parts.path.rstrip("/")
+        if path == "/v1/flow" and method == "GET":
+            await self._write_ndjson(writer, tickers, headers, keep_alive)
+            return
+        try:
+            status, payload = await self._route(method, path, query, tickers, body)
+        except Exception as exc:  # pragma: no cover - surfaced to the client as a 500
+            status, payload = 500, {"error": str(exc)}
+        self._write(writer, status, json.dumps(payload, default=str).encode(), headers, keep_alive)
+        await writer.drain()
+
+    async def _route(self, method: str, path: str, query: Dict[str, str], tickers: List[str], body: bytes) -> Tuple[int, object]:
+        if path.startswith("/v2/aggs/") and path != "/v2/aggs/batch" and method == "GET":
+            ticker = path.rsplit("/", 1)[-1]
+            since = float(query["since"]) if query.get("since") else None
+            bars = await self.market.fetch_bars(ticker, since=since, limit=int(query.get("limit", 50)))
+            return 200, {"results": bars}
+        if path == "/v2/aggs/batch" and method == "POST":
+            request = json.loads(body or b"{}")
+            since = request.get("since") or {}
+            limit = int(request.get("limit", 50))
+            results = {t: await self.market.fetch_bars(t, since=since.get(t), limit=limit) for t in request.get("tickers", [])}
+            return 200, {"results": results}
+        if path == "/v1/greeks" and method == "GET":
+            return 200, {"results": {t: await self.market.fetch_greeks(t) for t in tickers}}
+        if path == "/v2/news" and method == "GET":
+            return 200, {"results": {t: await self.news.latest_news(t) for t in tickers}}
+        return 404, {"error": f"no route for {method} {path}"}
+
+    async def _write_ndjson(self, writer, tickers: List[str], headers: Dict[str, str], keep_alive: bool):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n")
+        writer.write(b"Connection: keep-alive\r\n\r\n" if keep_alive else b"Connection: close\r\n\r\n")
+        for ticker in tickers:
+            prints = await self.market.options_flow(ticker)
+            chunk = b"".join(json.dumps(p, default=str).encode() + b"\n" for p in prints)
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _write(self, writer, status: int, payload: bytes, headers: Dict[str, str], keep_alive: bool, extra=None):
+        reason = {200: "OK", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}.get(status, "Error")
+        lines = [f"HTTP/1.1 {status} {reason}", "Content-Type: application/json"]
+        if "gzip" in headers.get("accept-encoding", "") and len(payload) >= self.gzip_min_bytes:
+            payload = gzip.compress(payload, compresslevel=1)
+            lines.append("Content-Encoding: gzip")
+        lines.append(f"Content-Length: {len(payload)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from core.logging import get_logger
+from data.providers import ProviderError
+
+logger = get_logger(__name__)
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class HTTPError(ProviderError):
+    def __init__(self, status: int, reason: str, headers: Optional[Dict[str, str]] = None, body: bytes = b""):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.retry_after = _parse_retry_after(self.headers.get("retry-after"))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes = b""
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+
+@dataclass
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    last_used: float = field(default_factory=time.monotonic)
+    requests: int = 0
+
+    def close(self):
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class _HostPool:
+    def __init__(self, limit: int):
+        self.idle: Deque[_Connection] = deque()
+        self.slots = asyncio.Semaphore(limit)
+
+
+class AsyncHTTPClient:
+    """Minimal HTTP/1.1 client with per-host keep-alive connection pools.
+
+    At most ``max_connections_per_host`` connections are open to a host at
+    once; idle ones are reused until ``keepalive_seconds`` elapse. Responses
+    are requested gzip-encoded and decompressed incrementally, and
+    ``stream_json`` yields newline-delimited JSON records as they arrive.
+    ``timeout`` bounds connecting and every write flush and read, so a
+    server that stalls mid-response raises ``asyncio.TimeoutError`` and its
+    connection is discarded instead of holding a pool slot.
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        keepalive_seconds: float = 30.0,
+        timeout: float = 10.0,
+        user_agent: str = "alpha-flow-ai/0.1",
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.latencies_ms: Deque[float] = deque(maxlen=10_000)
+        self.stats: Dict[str, int] = {"requests": 0, "connections_opened": 0, "connections_reused": 0, "errors": 0}
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self.request("GET", url, params=params)
+        return response.json()
+
+    async def post_json(self, url: str, payload: Any, params: Optional[Dict[str, Any]] = None) -> Any:
+        response = await self.request("POST", url, params=params, json_body=payload)
+        return response.json()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> HTTPResponse:
+        chunks = []
+        async with self._exchange(method, url, params, json_body, headers) as (response, body):
+            async for chunk in body:
+                chunks.append(chunk)
+        response.body = b"".join(chunks)
+        if response.status >= 400:
+            raise HTTPError(response.status, response.reason, response.headers, response.body)
+        return response
+
+    async def stream_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """Yield records from a newline-delimited JSON response as lines complete."""
+
+        async with self._exchange("GET", url, params, None, None) as (response, body):
+            if response.status >= 400:
+                raise HTTPError(response.status, response.reason, response.headers)
+            buffer = b""
+            async for chunk in body:
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+
+    async def close(self):
+        for pool in self._pools.values():
+            while pool.idle:
+                pool.idle.popleft().close()
+        self._pools.clear()
+
+    def _exchange(self, method, url, params, json_body, headers):
+        return _Exchange(self, method, url, params, json_body, headers)
+
+    def _pool(self, key: Tuple[str, str, int]) -> _HostPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = _HostPool(self.max_connections_per_host)
+            self._pools[key] = pool
+        return pool
+
+    async def _acquire(self, key: Tuple[str, str, int]) -> Tuple[_Connection, bool]:
+        pool = self._pool(key)
+        await pool.slots.acquire()
+        try:
+            now = time.monotonic()
+            while pool.idle:
+                conn = pool.idle.pop()
+                if now - conn.last_used < self.keepalive_seconds and not conn.writer.is_closing() and not conn.reader.at_eof():
+                    self.stats["connections_reused"] += 1
+                    return conn, True
+                conn.close()
+            scheme, host, port = key
+            if scheme == "https" and self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=self._ssl_context if scheme == "https" else None),
+                self.timeout,
+            )
+            self.stats["connections_opened"] += 1
+            return _Connection(reader, writer), False
+        except BaseException:
+            pool.slots.release()
+            raise
+
+    def _release(self, key: Tuple[str, str, int], conn: _Connection, reusable: bool):
+        pool = self._pools.get(key)
+        if pool is None:
+            conn.close()
+            return
+        if reusable and self.keepalive_seconds > 0:
+            conn.last_used = time.monotonic()
+            pool.idle.append(conn)
+        else:
+            conn.close()
+        pool.slots.release()
+
+    def _build_request(self, method, parts, params, json_body, headers) -> bytes:
+        path = parts.path or "/"
+        query = parts.query
+        if params:
+            extra = urlencode({k: v for k, v in params.items() if v is not None})
+            query = f"{query}&{extra}" if query else extra
+        target = f"{path}?{query}" if query else path
+        body = json.dumps(json_body, default=str).encode() if json_body is not None else b""
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"User-Agent: {self.user_agent}",
+            "Accept: application/json",
+            "Accept-Encoding: gzip",
+            "Connection: keep-alive",
+        ]
+        if body:
+            lines.append("Content-Type: application/json")
+        if body or method in {"POST", "PUT", "PATCH"}:
+            lines.append(f"Content-Length: {len(body)}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+class _Exchange:
+    """One request/response on a pooled connection, released on exit."""
+
+    def __init__(self, client: AsyncHTTPClient, method, url, params, json_body, headers):
+        self.client = client
+        self.method = method
+        self.parts = urlsplit(url)
+        self.params = params
+        self.json_body = json_body
+        self.headers = headers
+        scheme = self.parts.scheme or "http"
+        port = self.parts.port or (443 if scheme == "https" else 80)
+        self.key = (scheme, self.parts.hostname or "", port)
+        self.conn: Optional[_Connection] = None
+        self.reusable = False
+        self.started = 0.0
+
+    async def __aenter__(self):
+        client = self.client
+        payload = client._build_request(self.method, self.parts, self.params, self.json_body, self.headers)
+        self.started = time.perf_counter()
+        client.stats["requests"] += 1
+        for attempt in range(2):
+            self.conn, reused = await client._acquire(self.key)
+            try:
+                self.conn.writer.write(payload)
+                await self._timed(self.conn.writer.drain())
+                response = await self._timed(self._read_head())
+                break
+            except (ConnectionError, asyncio.IncompleteReadError) as exc:
+                client._release(self.key, self.conn, reusable=False)
+                self.conn = None
+                # A pooled connection may have been closed by the server while
+                # idle; retry once on a fresh connection before giving up.
+                if not reused or attempt:
+                    client.stats["errors"] += 1
+                    raise ProviderError(f"Connection to {self.key[1]} failed: {exc}") from exc
+            except BaseException:
+                client._release(self.key, self.conn, reusable=False)
+                self.conn = None
+                client.stats["errors"] += 1
+                raise
+        self.conn.requests += 1
+        return response, self._body(response)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.conn is not None:
+            self.client._release(self.key, self.conn, self.reusable and exc_type is None)
+            self.conn = None
+        self.client.latencies_ms.append((time.perf_counter() - self.started) * 1000)
+        return False
+
+    async def _timed(self, awaitable):
+        # Per operation rather than per response: a long body that keeps
+        # arriving is fine, a stalled one times out.
+        return await asyncio.wait_for(awaitable, self.client.timeout)
+
+    async def _read_head(self) -> HTTPResponse:
+        reader = self.conn.reader
+        status_line = await reader.readuntil(b"\r\n")
+        _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return HTTPResponse(status=int(status), reason=reason[0] if reason else "", headers=headers)
+
+    async def _body(self, response: HTTPResponse) -> AsyncIterator[bytes]:
+        reader = self.conn.reader
+        headers = response.headers
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if headers.get("content-encoding") == "gzip" else None
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        async def raw_chunks() -> AsyncIterator[bytes]:
+            if self.method == "HEAD" or response.status in (204, 304):
+                return
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size_line = await self._timed(reader.readuntil(b"\r\n"))
+                    size = int(size_line.split(b";", 1)[0], 16)
+                    if size == 0:
+                        await self._timed(reader.readuntil(b"\r\n"))
+                        return
+                    yield await self._timed(reader.readexactly(size))
+                    await self._timed(reader.readexactly(2))
+            elif "content-length" in headers:
+                remaining = int(headers["content-length"])
+                while remaining:
+                    chunk = await self._timed(reader.read(min(remaining, _CHUNK_SIZE)))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                nonlocal keep_alive
+                keep_alive = False
+                while chunk := await self._timed(reader.read(_CHUNK_SIZE)):
+                    yield chunk
+
+        async for chunk in raw_chunks():
+            data = decoder.decompress(chunk) if decoder else chunk
+            if data:
+                yield data
+        if decoder:
+            tail = decoder.flush()
+            if tail:
+                yield tail
+        self.reusable = keep_alive
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from data.http import AsyncHTTPClient
+from data.providers import BaseProvider
+
+
+class MassivePolygonHTTPProvider(BaseProvider):
+    """Massive/Polygon provider backed by the pooled ``AsyncHTTPClient``.
+
+    Mirrors the method surface of ``MassivePolygonProvider`` so ``DataService``
+    can use either one.
+    """
+
+    batch_size = 100
+
+    def __init__(self, api_key: str, base_url: str, http: AsyncHTTPClient):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.http = http
+
+    async def fetch_bars(self, ticker: str, since: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        payload = await self.http.get_json(
+            f"{self.base_url}/v2/aggs/{ticker}", params={"since": since, "limit": limit, "apiKey": self.api_key}
+        )
+        return payload.get("results", [])
+
+    async def fetch_bars_many(
+        self, tickers: Iterable[str], since: Optional[Dict[str, Optional[float]]] = None, limit: int = 50
+    ) -> Dict[str, List[Dict]]:
+        payload = await self.http.post_json(
+            f"{self.base_url}/v2/aggs/batch",
+            {"tickers": list(tickers), "since": since or {}, "limit": limit},
+            params={"apiKey": self.api_key},
+        )
+        return payload.get("results", {})
+
+    async def fetch_greeks(self, ticker: str) -> Dict[str, float]:
+        return (await self.fetch_greeks_many([ticker])).get(ticker, {})
+
+    async def fetch_greeks_many(self, tickers: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        payload = await self.http.get_json(
+            f"{self.base_url}/v1/greeks", params={"tickers": ",".join(tickers), "apiKey": self.api_key}
+        )
+        return payload.get("results", {})
+
+    async def options_flow(self, ticker: str) -> List[Dict]:
+        return (await self.options_flow_many([ticker])).get(ticker, [])
+
+    async def options_flow_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        tickers = list(tickers)
+        flows: Dict[str, List[Dict]] = {ticker: [] for ticker in tickers}
+        params = {"tickers": ",".join(tickers), "apiKey": self.api_key}
+        async for record in self.http.stream_json(f"{self.base_url}/v1/flow", params=params):
+            flows.setdefault(record.get("ticker"), []).append(record)
+        return flows
+
+
+class BenzingaHTTPProvider(BaseProvider):
+    batch_size = 50
+
+    def __init__(self, api_key: str, base_url: str, http: AsyncHTTPClient):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.http = http
+
+    async def latest_news(self, ticker: str) -> List[Dict]:
+        return (await self.latest_news_many([ticker])).get(ticker, [])
+
+    async def latest_news_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        payload = await self.http.get_json(
+            f"{self.base_url}/v2/news", params={"tickers": ",".join(tickers), "token": self.api_key}
+        )
+        return payload.get("results", {})
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_MAX_VARIABLES = 500
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot persist {type(value).__name__}")
+
+
+def _decode(obj: Dict) -> Any:
+    if "__datetime__" in obj and len(obj) == 1:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class PersistentCache:
+    """SQLite second-level cache keeping recent provider payloads across restarts.
+
+    Rows hold the JSON payload and the wall-clock time it was fetched, so a
+    reader can tell how much of its TTL is left. Writes are buffered by the
+    caller and committed together with ``put_many``; ``prune`` drops rows older
+    than ``max_age_seconds``. Calls are serialized by a lock so writes can run
+    on a worker thread while the event loop reads.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 86_400):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[float, Any]]:
+        """Return ``{key: (fetched_at, value)}`` for the keys that are stored."""
+
+        keys = list(keys)
+        found: Dict[str, Tuple[float, Any]] = {}
+        for i in range(0, len(keys), _MAX_VARIABLES):
+            chunk = keys[i : i + _MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, fetched_at, payload FROM cache_entries WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            for key, fetched_at, payload in rows:
+                found[key] = (fetched_at, json.loads(payload, object_hook=_decode))
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, float, Any]]):
+        rows: List[Tuple[str, float, str]] = [
+            (key, fetched_at, json.dumps(value, default=_encode)) for key, fetched_at, value in items
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, fetched_at, payload) VALUES (?, ?, ?)", rows
+            )
+
+    def prune(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.time()) - self.max_age_seconds
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM cache_entries WHERE fetched_at < ?", (cutoff,))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import math
 import random
+import time
+import zlib
 from datetime import datetime, timedelta
-from typing import Awaitable, Callable, Dict, List, TypeVar
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
 
 from core.logging import get_logger
 
@@ -17,6 +20,10 @@ class ProviderError(Exception):
 
 
 class BaseProvider:
+    # Maximum tickers per request for ``*_many`` batch endpoints. Providers
+    # without batch endpoints are called once per ticker by ``DataService``.
+    batch_size: int = 1
+
     async def fetch(self, *args, **kwargs):
         raise NotImplementedError
 
@@ -29,17 +36,32 @@ class MassivePolygonProvider(BaseProvider):
     to distinguish which brand is used.
     """
 
+    batch_size = 100
+    bar_interval_seconds = 60
+
     def __init__(self, api_key: str):
         self.api_key = api_key
 
-    async def fetch_ohlc(self, ticker: str, lookback: int = 50) -> List[float]:
-        base = random.uniform(80, 150)
-        series = []
-        price = base
-        for _ in range(lookback):
-            price += random.uniform(-1, 1)
-            series.append(round(price, 2))
-        return series
+    async def fetch_bars(self, ticker: str, since: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        """Return up to ``limit`` of the most recent bars strictly newer than ``since``.
+
+        Bars are ``{"t": epoch_seconds, "c": close, "v": volume}``. The stub
+        derives each bar from the ticker and timestamp so repeated or
+        incremental requests agree on history.
+        """
+
+        interval = self.bar_interval_seconds
+        end = int(time.time() // interval) * interval
+        start = end - (limit - 1) * interval
+        if since is not None:
+            start = max(start, (int(since) // interval + 1) * interval)
+        base = 80 + zlib.crc32(ticker.encode()) % 70
+        bars = []
+        for ts in range(start, end + 1, interval):
+            rng = random.Random(f"{ticker}:{ts}")
+            close = base * (1 + 0.02 * math.sin(ts / 1800)) + rng.uniform(-1, 1)
+            bars.append({"t": ts, "c": round(close, 2), "v": rng.randint(5_000, 50_000)})
+        return bars
 
     async def fetch_greeks(self, ticker: str) -> Dict[str, float]:
         return {"delta": random.uniform(-1, 1), "gamma": random.uniform(-1, 1), "vega": random.uniform(0, 1)}
@@ -58,6 +80,8 @@ class MassivePolygonProvider(BaseProvider):
             last = round((bid + ask) / 2, 2)
             flows.append(
                 {
+                    "id": f"{option_symbol}-{random.getrandbits(48):012x}",
+                    "timestamp": now - timedelta(seconds=random.randint(0, 300)),
                     "ticker": ticker,
                     "direction": side.lower(),
                     "notional": premium * random.uniform(3, 6),
@@ -80,8 +104,22 @@ class MassivePolygonProvider(BaseProvider):
             )
         return flows
 
+    async def fetch_bars_many(
+        self, tickers: Iterable[str], since: Optional[Dict[str, Optional[float]]] = None, limit: int = 50
+    ) -> Dict[str, List[Dict]]:
+        since = since or {}
+        return {ticker: await self.fetch_bars(ticker, since.get(ticker), limit) for ticker in tickers}
+
+    async def fetch_greeks_many(self, tickers: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        return {ticker: await self.fetch_greeks(ticker) for ticker in tickers}
+
+    async def options_flow_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        return {ticker: await self.options_flow(ticker) for ticker in tickers}
+
 
 class BenzingaProvider(BaseProvider):
+    batch_size = 50
+
     def __init__(self, api_key: str):
         self.api_key = api_key
 
@@ -92,13 +130,20 @@ class BenzingaProvider(BaseProvider):
             {"ticker": ticker, "headline": f"{ticker} announces guidance", "timestamp": now - timedelta(hours=2)},
         ]
 
+    async def latest_news_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        return {ticker: await self.latest_news(ticker) for ticker in tickers}
+
 
-async def with_retry(func: Callable[[], Awaitable[T]], attempts: int = 3, base_delay: float = 0.1) -> T:
-    """Execute a coroutine factory with retry and backoff.
+async def with_retry(
+    func: Callable[[], Awaitable[T]], attempts: int = 3, base_delay: float = 0.1, max_delay: float = 30.0
+) -> T:
+    """Execute a coroutine factory with retry and jittered backoff.
 
     Accepts a callable that returns a fresh awaitable on each attempt so that
     failures do not exhaust a single coroutine object (which cannot be awaited
-    twice).
+    twice). Delays use full jitter over an exponential ceiling; when the error
+    carries a ``retry_after`` hint (e.g. an HTTP 429) the wait is at least that
+    long.
     """
 
     for i in range(attempts):
@@ -107,5 +152,9 @@ async def with_retry(func: Callable[[], Awaitable[T]], attempts: int = 3, base_d
         except Exception as exc:  # pragma: no cover - defensive
             if i == attempts - 1:
                 raise
-            await asyncio.sleep(base_delay * (2**i))
+            delay = random.uniform(0, min(base_delay * (2**i), max_delay))
+            retry_after = getattr(exc, "retry_after", None)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            await asyncio.sleep(delay)
     raise ProviderError("with_retry exhausted without returning a result")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# Lower value is served first. Rechecks of queued alerts outrank the
+# background universe scan so a large scan cannot starve them.
+DEFAULT_LANES: Dict[str, int] = {"immediate": 0, "intraday": 1, "swing": 2, "scan": 3}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity else max(rate, 1))
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, tokens: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        self._refill()
+        return max(tokens - self.tokens, 0.0) / self.rate
+
+
+class PriorityRateLimiter:
+    """Token-bucket limiter whose waiters are served by lane priority.
+
+    A ``rate_per_second`` of 0 or ``None`` disables limiting. Requests in the
+    same lane are served first-come first-served. An acquire tagged with a
+    ``request`` key can be moved to a more urgent lane while it waits with
+    ``promote``.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: Optional[float],
+        burst: Optional[float] = None,
+        lanes: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.lanes = dict(lanes or DEFAULT_LANES)
+        self.bucket = TokenBucket(rate_per_second, burst, clock) if rate_per_second else None
+        self._clock = clock
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump: Optional[asyncio.Task] = None
+        self._requests: Dict[Hashable, Tuple[int, asyncio.Future, str]] = {}
+        self._lane_stats: Dict[str, Dict[str, float]] = {
+            lane: {"depth": 0, "acquired": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0} for lane in self.lanes
+        }
+
+    async def acquire(self, lane: str = "scan", request: Optional[Hashable] = None):
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown rate limit lane {lane!r}")
+        stats = self._lane_stats[lane]
+        if self.bucket is None or (not self._waiters and self.bucket.try_take()):
+            stats["acquired"] += 1
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (self.lanes[lane], next(self._seq), future))
+        if request is not None:
+            self._requests[request] = (self.lanes[lane], future, lane)
+        stats["depth"] += 1
+        started = self._clock()
+        if self._pump is None or self._pump.done():
+            self._pump = loop.create_task(self._serve())
+        served = False
+        try:
+            await future
+            served = True
+        finally:
+            entry = self._requests.get(request) if request is not None else None
+            if entry is not None and entry[1] is future:
+                # Counted under the lane it was served from after any ``promote``.
+                del self._requests[request]
+                stats = self._lane_stats[entry[2]]
+            if served:
+                stats["acquired"] += 1
+            stats["depth"] -= 1
+            waited_ms = (self._clock() - started) * 1000
+            stats["total_wait_ms"] += waited_ms
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], waited_ms)
+
+    def promote(self, request: Hashable, lane: str) -> bool:
+        """Move the acquire waiting for ``request`` up to ``lane`` if that outranks it."""
+
+        entry = self._requests.get(request)
+        priority = self.lanes.get(lane)
+        if entry is None or priority is None or entry[1].done() or priority >= entry[0]:
+            return False
+        # The old heap entry stays behind and is skipped once the future is done.
+        self._requests[request] = (priority, entry[1], lane)
+        self._lane_stats[entry[2]]["depth"] -= 1
+        self._lane_stats[lane]["depth"] += 1
+        heapq.heappush(self._waiters, (priority, next(self._seq), entry[1]))
+        return True
+
+    async def _serve(self):
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.bucket.try_take():
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+                continue
+            await asyncio.sleep(self.bucket.wait_time())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {lane: dict(values) for lane, values in self._lane_stats.items()}
@@ -1,73 +1,396 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, List
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 from core.logging import get_logger
-from data.providers import BenzingaProvider, MassivePolygonProvider, with_retry
+from data.bars import BarStore
+from data.cache import MISSING, LRUTTLCache, NegativeEntry
+from data.http import AsyncHTTPClient
+from data.http_providers import BenzingaHTTPProvider, MassivePolygonHTTPProvider
+from data.persistent_cache import PersistentCache
+from data.providers import BaseProvider, BenzingaProvider, MassivePolygonProvider, ProviderError, with_retry
+from data.ratelimit import PriorityRateLimiter
 from models.schemas import PriceSnapshot
 
 logger = get_logger(__name__)
 
 
-class TTLCache:
-    def __init__(self, ttl_seconds: int = 120):
-        self.ttl = ttl_seconds
-        self.store: Dict[str, tuple[datetime, object]] = {}
+class DataService:
+    def __init__(
+        self,
+        market_data_key: str,
+        benzinga_key: str,
+        cache_ttl_seconds: int = 120,
+        cache_max_entries: int = 10_000,
+        cache_max_bytes: Optional[int] = None,
+        cache_namespace_ttls: Optional[Dict[str, float]] = None,
+        negative_cache_ttl_seconds: float = 15,
+        bar_lookback: int = 50,
+        bar_capacity: int = 128,
+        bar_store_max_tickers: int = 5_000,
+        market_base_url: Optional[str] = None,
+        news_base_url: Optional[str] = None,
+        http: Optional[AsyncHTTPClient] = None,
+        market_rate_limit: Optional[float] = None,
+        market_rate_burst: Optional[float] = None,
+        news_rate_limit: Optional[float] = None,
+        news_rate_burst: Optional[float] = None,
+        persistent_cache_path: Optional[str] = None,
+        persistent_cache_max_age_seconds: float = 86_400,
+        persistent_prune_every: int = 12,
+    ):
+        # Providers talk HTTP through one pooled client when a base URL is
+        # configured and fall back to the simulated stubs otherwise.
+        self.http = http or (AsyncHTTPClient() if market_base_url or news_base_url else None)
+        if market_base_url:
+            self.market = MassivePolygonHTTPProvider(market_data_key, market_base_url, self.http)
+        else:
+            self.market = MassivePolygonProvider(market_data_key)
+        if news_base_url:
+            self.benzinga = BenzingaHTTPProvider(benzinga_key, news_base_url, self.http)
+        else:
+            self.benzinga = BenzingaProvider(benzinga_key)
+        self.cache = LRUTTLCache(
+            ttl_seconds=cache_ttl_seconds,
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            # Flow is cached only long enough for a cycle's batch prefetch to be
+            # read back by the per-ticker stage.
+            namespace_ttls={"flow": 30, **(cache_namespace_ttls or {})},
+            negative_ttl_seconds=negative_cache_ttl_seconds,
+        )
+        self.market_limiter = PriorityRateLimiter(market_rate_limit, market_rate_burst)
+        self.news_limiter = PriorityRateLimiter(news_rate_limit, news_rate_burst)
+        self.bar_lookback = bar_lookback
+        self.bars = BarStore(capacity=max(bar_capacity, bar_lookback), max_tickers=bar_store_max_tickers)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._inflight_lanes: Dict[str, str] = {}
+        # Second-level cache on disk: consulted once per key on an L1 miss so a
+        # restart can reuse payloads fetched before it, written back by persist().
+        self.persistent = (
+            PersistentCache(persistent_cache_path, max_age_seconds=persistent_cache_max_age_seconds) if persistent_cache_path else None
+        )
+        self.persistent_prune_every = max(int(persistent_prune_every), 1)
+        self._persist_calls = 0
+        # Keys already looked up on disk, bounded like L1; an evicted key costs one more disk read.
+        self._warm_checked: "OrderedDict[str, None]" = OrderedDict()
+        self._warm_checked_max = cache_max_entries
+        self._dirty: Dict[str, tuple[float, Any]] = {}
+        self.request_stats: Dict[str, int] = {"issued": 0, "coalesced": 0, "batch_calls": 0, "batch_errors": 0, "warm_hits": 0}
 
-    def get(self, key: str):
-        if key in self.store:
-            ts, value = self.store[key]
-            if (datetime.utcnow() - ts).total_seconds() < self.ttl:
-                return value
-            self.store.pop(key, None)
-        return None
+    async def _single_flight(self, key: str, factory: Callable[[], Awaitable[Any]], lane: Optional[str] = None) -> Any:
+        """Share one in-flight load between all concurrent callers of ``key``.
 
-    def set(self, key: str, value: object):
-        self.store[key] = (datetime.utcnow(), value)
+        The load runs as its own task so a cancelled caller does not abort it
+        for the others waiting on the same key. It takes rate-limit tokens in
+        the most urgent ``lane`` of its callers: a caller joining from a higher
+        priority lane promotes the load, including a token wait already queued.
+        """
 
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            if lane is not None:
+                self._inflight_lanes[key] = lane
+            task.add_done_callback(lambda done, k=key: self._release_inflight(k, done))
+            self.request_stats["issued"] += 1
+        else:
+            self.request_stats["coalesced"] += 1
+            if lane is not None:
+                self._promote(key, lane)
+        return await asyncio.shield(task)
 
-class DataService:
-    def __init__(self, market_data_key: str, benzinga_key: str, cache_ttl_seconds: int = 120):
-        self.market = MassivePolygonProvider(market_data_key)
-        self.benzinga = BenzingaProvider(benzinga_key)
-        self.cache = TTLCache(cache_ttl_seconds)
+    def _promote(self, key: str, lane: str):
+        current = self._inflight_lanes.get(key)
+        ranks = self.market_limiter.lanes
+        if current is None or lane not in ranks or ranks[lane] >= ranks.get(current, len(ranks)):
+            return
+        self._inflight_lanes[key] = lane
+        for limiter in (self.market_limiter, self.news_limiter):
+            limiter.promote(key, lane)
+
+    def _release_inflight(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._inflight_lanes.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter was cancelled.
+            task.exception()
 
-    async def get_price_snapshot(self, ticker: str) -> PriceSnapshot:
-        cache_key = f"price:{ticker}"
+    async def _cached(self, cache_key: str, load: Callable[[], Awaitable[Any]], lane: Optional[str] = None) -> Any:
         cached = self.cache.get(cache_key)
-        if cached:
+        if isinstance(cached, NegativeEntry):
+            raise ProviderError(f"{cache_key} failed recently: {cached.error}")
+        if cached is not MISSING:
             return cached
-        series = await with_retry(lambda: self.market.fetch_ohlc(ticker))
-        price = float(series[-1])
-        prev = series[-2] if len(series) > 1 else series[-1]
+        return await self._single_flight(cache_key, lambda: self._fill(cache_key, load), lane)
+
+    async def _fill(self, cache_key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        # Inside the single flight so concurrent callers share one disk lookup.
+        warm = await self._warm_start([cache_key])
+        if cache_key in warm:
+            return warm[cache_key]
+        try:
+            value = await load()
+        except Exception as exc:
+            self.cache.set_negative(cache_key, exc)
+            raise
+        self._store(cache_key, value)
+        return value
+
+    def _store(self, cache_key: str, value: Any):
+        self.cache.set(cache_key, value)
+        if self.persistent is not None and not cache_key.startswith("flow:"):
+            self._dirty[cache_key] = (time.time(), value)
+
+    async def _warm_start(self, cache_keys: List[str]) -> Dict[str, Any]:
+        """Fill L1 from the on-disk cache for keys not yet looked up this process.
+
+        The SQLite read runs in a worker thread, off the event loop.
+
+        Entries still inside their TTL are served with the remaining TTL. Price
+        entries hold the ticker's bars: they always seed the bar ring, so even a
+        stale entry turns the next vendor call into an incremental one.
+        """
+
+        if self.persistent is None:
+            return {}
+        keys = [key for key in cache_keys if key not in self._warm_checked and not key.startswith("flow:")]
+        if not keys:
+            return {}
+        for key in keys:
+            self._warm_checked[key] = None
+        while len(self._warm_checked) > self._warm_checked_max:
+            self._warm_checked.popitem(last=False)
+        warm: Dict[str, Any] = {}
+        now = time.time()
+        for key, (fetched_at, value) in (await asyncio.to_thread(self.persistent.get_many, keys)).items():
+            namespace, _, ticker = key.partition(":")
+            remaining = self.cache.ttl_for(key) - (now - fetched_at)
+            if namespace == "price":
+                if not value or self.bars.get(ticker) is not None:
+                    continue
+                self.bars.ingest(ticker, value)
+                if remaining <= 0:
+                    continue
+                value = self._snapshot_from_bars(ticker, [])
+            elif remaining <= 0:
+                continue
+            self.cache.set(key, value, ttl=remaining)
+            warm[key] = value
+        self.request_stats["warm_hits"] += len(warm)
+        return warm
+
+    async def persist(self):
+        """Write everything fetched since the last call to the on-disk cache in one transaction.
+
+        The write runs in a worker thread. Every ``persistent_prune_every``
+        calls, entries older than the cache's ``max_age_seconds`` are pruned
+        in the same thread.
+        """
+
+        if self.persistent is None:
+            return
+        self._persist_calls += 1
+        prune = self._persist_calls % self.persistent_prune_every == 0
+        items = []
+        for key, (fetched_at, value) in self._dirty.items():
+            if key.startswith("price:"):
+                ring = self.bars.get(key.partition(":")[2])
+                if ring is None:
+                    continue
+                value = ring.to_bars(self.bar_lookback)
+            items.append((key, fetched_at, value))
+        self._dirty.clear()
+        if items or prune:
+            await asyncio.to_thread(self._write_persistent, items, prune)
+
+    def _write_persistent(self, items: List[Tuple[str, float, Any]], prune: bool):
+        self.persistent.put_many(items)
+        if prune:
+            self.persistent.prune()
+
+    async def _call(
+        self, provider: BaseProvider, call: Callable[[], Awaitable[Any]], lane: str = "scan", request: Optional[str] = None
+    ) -> Any:
+        """Run a provider call with retry, taking a rate-limit token per attempt.
+
+        ``request`` is the single-flight key the call loads, so each attempt
+        uses the lane the load has been promoted to.
+        """
+
+        limiter = self.news_limiter if provider is self.benzinga else self.market_limiter
+
+        async def attempt():
+            await limiter.acquire(self._inflight_lanes.get(request, lane), request)
+            return await call()
+
+        return await with_retry(attempt)
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {"market": self.market_limiter.stats(), "news": self.news_limiter.stats()}
+
+    async def get_price_snapshot(self, ticker: str, lane: str = "scan") -> PriceSnapshot:
+        return await self._cached(f"price:{ticker}", lambda: self._load_price_snapshot(ticker, lane), lane)
+
+    async def _load_price_snapshot(self, ticker: str, lane: str = "scan") -> PriceSnapshot:
+        since = self.bars.last_ts(ticker)
+        bars = await self._call(
+            self.market, lambda: self.market.fetch_bars(ticker, since=since, limit=self.bar_lookback), lane, f"price:{ticker}"
+        )
+        return self._snapshot_from_bars(ticker, bars)
+
+    def _snapshot_from_bars(self, ticker: str, bars: List[Dict]) -> PriceSnapshot:
+        """Append newly fetched bars to the ticker's ring and snapshot it."""
+
+        ring = self.bars.ingest(ticker, bars)
+        if not len(ring):
+            raise ProviderError(f"No bars available for {ticker}")
+        series = ring.closes(self.bar_lookback)
+        price = series[-1]
+        prev = series[-2] if len(series) > 1 else price
         change_pct = float((price - prev) / prev * 100) if prev else 0
-        volume = abs(price * 10_000)
-        vwap = sum(series[-20:]) / min(len(series), 20)
-        sector_strength = 0.0
-        snapshot = PriceSnapshot(
+        return PriceSnapshot(
             ticker=ticker,
             price=price,
             change_pct=change_pct,
-            volume=volume,
-            vwap=vwap,
-            sector_strength=sector_strength,
-            ohlc=series[-50:],
+            volume=ring.window_volume,
+            vwap=ring.vwap,
+            sector_strength=0.0,
+            ohlc=series,
+            bars_total=ring.count,
         )
-        self.cache.set(cache_key, snapshot)
-        return snapshot
 
-    async def get_greeks(self, ticker: str) -> Dict[str, float]:
-        cache_key = f"greeks:{ticker}"
-        cached = self.cache.get(cache_key)
-        if cached:
-            return cached
-        greeks = await with_retry(lambda: self.market.fetch_greeks(ticker))
-        self.cache.set(cache_key, greeks)
-        return greeks
+    async def get_greeks(self, ticker: str, lane: str = "scan") -> Dict[str, float]:
+        key = f"greeks:{ticker}"
+        return await self._cached(key, lambda: self._call(self.market, lambda: self.market.fetch_greeks(ticker), lane, key), lane)
+
+    async def get_options_flow(self, ticker: str, lane: str = "scan"):
+        key = f"flow:{ticker}"
+        return await self._cached(key, lambda: self._call(self.market, lambda: self.market.options_flow(ticker), lane, key), lane)
+
+    async def get_news(self, ticker: str, lane: str = "scan"):
+        key = f"news:{ticker}"
+        return await self._cached(key, lambda: self._call(self.benzinga, lambda: self.benzinga.latest_news(ticker), lane, key), lane)
+
+    async def _cached_many(
+        self,
+        namespace: str,
+        tickers: Iterable[str],
+        provider: BaseProvider,
+        batch_method: str,
+        single_method: str,
+        transform: Optional[Callable[[str, Any], Any]] = None,
+        since: Optional[Callable[[str], Optional[float]]] = None,
+    ) -> Dict[str, Any]:
+        """Serve ``tickers`` from cache and load the misses in vendor-sized chunks.
+
+        Each chunk is one call to ``provider.<batch_method>`` when the provider
+        has it, otherwise the chunk falls back to one ``<single_method>`` call per
+        ticker. Every ticker in a response is cached individually. Tickers the
+        vendor omits from a response are left out of the result. A chunk that
+        fails is logged and left out so the per-ticker path can retry those
+        tickers; a ticker whose single call or ``transform`` fails is
+        negative-cached like a failed ``_cached`` load. ``since``
+        supplies the per-ticker ``since=`` cursor for the incremental bar
+        endpoints, which are also asked for ``bar_lookback`` bars at most.
+        """
+
+        results: Dict[str, Any] = {}
+        misses: List[str] = []
+        for ticker in dict.fromkeys(tickers):
+            cached = self.cache.get(f"{namespace}:{ticker}")
+            if cached is MISSING or isinstance(cached, NegativeEntry):
+                misses.append(ticker)
+            else:
+                results[ticker] = cached
+        if misses:
+            warm = await self._warm_start([f"{namespace}:{ticker}" for ticker in misses])
+            for key, value in warm.items():
+                results[key.partition(":")[2]] = value
+            misses = [ticker for ticker in misses if ticker not in results]
+        if not misses:
+            return results
+
+        batch = getattr(provider, batch_method, None)
+        single = getattr(provider, single_method)
+        size = max(int(getattr(provider, "batch_size", 1) or 1), 1) if batch else 1
+
+        async def load_chunk(chunk: List[str]) -> Dict[str, Any]:
+            if batch:
+                self.request_stats["batch_calls"] += 1
+                if since:
+                    cursors = {t: since(t) for t in chunk}
+                    return await self._call(provider, lambda: batch(chunk, since=cursors, limit=self.bar_lookback))
+                return await self._call(provider, lambda: batch(chunk))
+            if since:
+                calls = (self._call(provider, lambda t=t: single(t, since=since(t), limit=self.bar_lookback)) for t in chunk)
+            else:
+                calls = (self._call(provider, lambda t=t: single(t)) for t in chunk)
+            return dict(zip(chunk, await asyncio.gather(*calls, return_exceptions=True)))
+
+        chunks = [misses[i : i + size] for i in range(0, len(misses), size)]
+        responses = await asyncio.gather(*(load_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BaseException):
+                self.request_stats["batch_errors"] += 1
+                logger.warning(f"Batch {namespace} load failed for {len(chunk)} tickers: {response}")
+                continue
+            for ticker, raw in response.items():
+                cache_key = f"{namespace}:{ticker}"
+                try:
+                    if isinstance(raw, BaseException):
+                        raise raw
+                    value = transform(ticker, raw) if transform else raw
+                except Exception as exc:
+                    self.cache.set_negative(cache_key, exc)
+                    continue
+                self._store(cache_key, value)
+                results[ticker] = value
+        return results
+
+    async def get_price_snapshots(self, tickers: Iterable[str]) -> Dict[str, PriceSnapshot]:
+        return await self._cached_many(
+            "price",
+            tickers,
+            self.market,
+            "fetch_bars_many",
+            "fetch_bars",
+            transform=self._snapshot_from_bars,
+            since=self.bars.last_ts,
+        )
+
+    async def get_greeks_many(self, tickers: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        return await self._cached_many("greeks", tickers, self.market, "fetch_greeks_many", "fetch_greeks")
+
+    async def get_options_flow_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        return await self._cached_many("flow", tickers, self.market, "options_flow_many", "options_flow")
+
+    async def get_news_many(self, tickers: Iterable[str]) -> Dict[str, List[Dict]]:
+        return await self._cached_many("news", tickers, self.benzinga, "latest_news_many", "latest_news")
+
+    async def prefetch(self, tickers: Iterable[str], enrichment: bool = True, greeks: bool = True):
+        """Warm the cache for a whole universe using batch endpoints.
+
+        Greeks and news are skipped when ``enrichment`` is False; greeks alone
+        are skipped when ``greeks`` is False.
+        """
 
-    async def get_options_flow(self, ticker: str):
-        return await with_retry(lambda: self.market.options_flow(ticker))
+        tickers = list(tickers)
+        loads = [self.get_price_snapshots(tickers), self.get_options_flow_many(tickers)]
+        if enrichment:
+            loads.append(self.get_news_many(tickers))
+            if greeks:
+                loads.append(self.get_greeks_many(tickers))
+        await asyncio.gather(*loads)
 
-    async def get_news(self, ticker: str):
-        return await with_retry(lambda: self.benzinga.latest_news(ticker))
+    async def close(self):
+        if self.http is not None:
+            await self.http.close()
+        if self.persistent is not None:
+            await self.persist()
+            self.persistent.close()
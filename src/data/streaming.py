@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class FlowSource:
+    """Async source of raw options flow prints (the dicts ``options_flow`` returns)."""
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        raise NotImplementedError
+        yield  # pragma: no cover - marks this as an async generator
+
+
+class QueueFlowSource(FlowSource):
+    """In-process source fed with ``publish``; ``close`` ends the stream."""
+
+    _CLOSED = object()
+
+    def __init__(self, maxsize: int = 0):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def publish(self, flow: Dict):
+        await self._queue.put(flow)
+
+    async def close(self):
+        await self._queue.put(self._CLOSED)
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        while True:
+            item = await self._queue.get()
+            if item is self._CLOSED:
+                return
+            yield item
+
+
+class ReplayFlowSource(FlowSource):
+    """Replay newline-delimited JSON prints from a file.
+
+    With ``delay_seconds`` set, prints are paced that far apart to mimic a
+    live tape; otherwise the file is replayed as fast as it is consumed.
+    """
+
+    def __init__(self, path: str | Path, delay_seconds: float = 0.0):
+        self.path = Path(path)
+        self.delay_seconds = delay_seconds
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        with self.path.open() as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                yield json.loads(line)
+                if self.delay_seconds:
+                    await asyncio.sleep(self.delay_seconds)
+
+
+class SocketFlowSource(FlowSource):
+    """Read newline-delimited JSON prints from a TCP feed.
+
+    Without ``reconnect_seconds`` the stream ends when the feed closes and
+    connection errors propagate. With it, a closed, refused or reset feed is
+    reconnected after a delay that doubles on each consecutive failure, up to
+    ``max_backoff_seconds``, and resets once a connection is established.
+    Lines that are not valid JSON are logged, counted in ``stats`` and skipped.
+    """
+
+    def __init__(self, host: str, port: int, reconnect_seconds: Optional[float] = None, max_backoff_seconds: float = 60.0):
+        self.host = host
+        self.port = port
+        self.reconnect_seconds = reconnect_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stats: Dict[str, int] = {"bad_lines": 0}
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        delay = self.reconnect_seconds
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                delay = self.reconnect_seconds
+                while line := await reader.readline():
+                    if not line.strip():
+                        continue
+                    try:
+                        flow = json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        self.stats["bad_lines"] += 1
+                        logger.warning(f"Skipping malformed line from {self.host}:{self.port}: {exc}")
+                        continue
+                    yield flow
+                reason = "closed"
+            except OSError as exc:
+                if self.reconnect_seconds is None:
+                    raise
+                reason = f"failed: {exc}"
+            finally:
+                if writer is not None:
+                    writer.close()
+            if self.reconnect_seconds is None:
+                return
+            logger.warning(f"Flow feed {self.host}:{self.port} {reason}; reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(max(delay * 2, 0.1), self.max_backoff_seconds)
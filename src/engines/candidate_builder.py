@@ -1,21 +1,46 @@
 from __future__ import annotations
 
-from typing import List
+import heapq
+import itertools
+from typing import Dict, Generic, List, Tuple, TypeVar
 
 from core.logging import get_logger
 from models.schemas import Candidate, FlowEvent, MarketRegimeState, PriceSnapshot, TechnicalContext
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class CandidateBuilder:
+    """Turns a ticker's detected flow into candidates.
+
+    Up to ``max_per_ticker`` candidates are built, one per distinct contract
+    (its largest print), largest notional first.
+    """
+
+    def __init__(self, max_per_ticker: int = 1):
+        self.max_per_ticker = max(max_per_ticker, 1)
+
     def build(self, flows: List[FlowEvent], price: PriceSnapshot, regime: MarketRegimeState, technical: TechnicalContext) -> List[Candidate]:
         ticker_flows = [f for f in flows if f.ticker == price.ticker]
         if not ticker_flows:
             return []
 
-        primary = max(ticker_flows, key=lambda f: f.notional)
-        candidate = Candidate(
+        if self.max_per_ticker == 1:
+            primaries = [max(ticker_flows, key=lambda f: f.notional)]
+        else:
+            by_contract: Dict[Tuple, FlowEvent] = {}
+            for flow in ticker_flows:
+                key = (flow.option_symbol,) if flow.option_symbol else (flow.direction, flow.strike, flow.expiry)
+                if key not in by_contract or flow.notional > by_contract[key].notional:
+                    by_contract[key] = flow
+            primaries = heapq.nlargest(self.max_per_ticker, by_contract.values(), key=lambda f: f.notional)
+        return [self._candidate(primary, price, regime, technical) for primary in primaries]
+
+    @staticmethod
+    def _candidate(primary: FlowEvent, price: PriceSnapshot, regime: MarketRegimeState, technical: TechnicalContext) -> Candidate:
+        return Candidate(
             ticker=primary.ticker,
             symbol=primary.ticker,
             flow=primary,
@@ -35,4 +60,45 @@ class CandidateBuilder:
             primary_open_interest=primary.open_interest,
             primary_notional=primary.notional,
         )
-        return [candidate]
+
+
+class CandidateRanker(Generic[T]):
+    """Streaming top-N across the universe, kept in a size-N min-heap.
+
+    Items are offered as tickers finish collecting; anything that cannot make
+    the top ``limit`` is dropped on the spot, so memory and downstream work are
+    bounded by ``limit`` however much flow the tape produces. Ties keep the
+    item offered first.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._heap: List[Tuple[Tuple[float, ...], int, T]] = []
+        self._order = itertools.count()
+        self.offered = 0
+
+    @staticmethod
+    def rank_key(candidate: Candidate) -> Tuple[float, float]:
+        return candidate.flow.conviction_score, candidate.flow.notional
+
+    def offer(self, key: Tuple[float, ...], item: T) -> bool:
+        self.offered += 1
+        # Negated order so that, on equal keys, the earlier item ranks higher.
+        entry = (key, -next(self._order), item)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+            return True
+        if self.limit and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def drain(self) -> List[T]:
+        """Return the kept items best first and reset the ranker."""
+
+        ranked = [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+        self._heap.clear()
+        return ranked
+
+    def __len__(self) -> int:
+        return len(self._heap)
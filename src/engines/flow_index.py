@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from core.logging import get_logger
+from models.schemas import FlowEvent
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ContractActivity:
+    """Rolling activity for one option contract, bucketed by print time."""
+
+    option_symbol: str
+    ticker: str
+    buckets: Deque[List[float]] = field(default_factory=deque)  # [bucket_start, premium, sweeps, volume]
+    open_interest: Optional[int] = None
+    emitted_premium: float = 0.0
+
+    @property
+    def premium(self) -> float:
+        return sum(bucket[1] for bucket in self.buckets)
+
+    @property
+    def sweep_count(self) -> int:
+        return int(sum(bucket[2] for bucket in self.buckets))
+
+    @property
+    def volume(self) -> int:
+        return int(sum(bucket[3] for bucket in self.buckets))
+
+    @property
+    def volume_oi_ratio(self) -> float:
+        return self.volume / self.open_interest if self.open_interest else 0.0
+
+
+class FlowIndex:
+    """Remembers flow across polling cycles so each print is only acted on once.
+
+    Prints are identified by their vendor ``id``, or by contract, timestamp,
+    premium, volume and side when no id is given. Prints without either are
+    never treated as duplicates. Seen identities are kept for
+    ``seen_ttl_seconds`` (a trading day by default), bounded to ``max_seen``.
+
+    Every recorded print is added to its contract's ``bucket_seconds`` buckets.
+    Buckets older than ``window_seconds`` expire. ``filter`` passes on a new
+    print only when its contract has not been passed on within the window, or
+    when the window premium has grown by ``growth_threshold`` since it last was.
+
+    Checking and recording are separate so a print is only remembered once it
+    has been acted on: ``filter``/``partition`` do not change what is seen,
+    and ``commit`` records prints after they were scored and stored. Prints
+    that fail downstream are therefore offered again on the next poll.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 300,
+        window_seconds: float = 3_600,
+        growth_threshold: float = 0.5,
+        seen_ttl_seconds: float = 86_400,
+        max_seen: int = 500_000,
+        max_contracts: int = 50_000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self.growth_threshold = growth_threshold
+        self.seen_ttl_seconds = seen_ttl_seconds
+        self.max_seen = max_seen
+        self.max_contracts = max_contracts
+        self._clock = clock
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._last_sweep = float("-inf")
+        self.contracts: "OrderedDict[str, ContractActivity]" = OrderedDict()
+        self.stats: Dict[str, int] = {"new": 0, "duplicates": 0, "suppressed": 0, "emitted": 0, "committed": 0}
+
+    def filter(self, events: List[FlowEvent]) -> List[FlowEvent]:
+        """Return the events that are new and belong to new or materially grown contracts."""
+
+        return self.partition(events)[0]
+
+    def partition(self, events: List[FlowEvent]) -> Tuple[List[FlowEvent], List[FlowEvent]]:
+        """Split new events into ``(passed_on, suppressed)``; duplicates are dropped.
+
+        Nothing is recorded: pass ``passed_on`` to ``commit`` once it has been
+        acted on, and ``suppressed`` with ``passed_on=False`` so its premium
+        still counts towards contract growth.
+        """
+
+        now = self._clock()
+        self._expire(now)
+        cutoff = now - self.window_seconds
+        batch_ids: Set[Hashable] = set()
+        fresh: "OrderedDict[str, List[FlowEvent]]" = OrderedDict()
+        for event in events:
+            identity = self.print_id(event.raw)
+            if identity is not None:
+                if identity in self._seen or identity in batch_ids:
+                    self.stats["duplicates"] += 1
+                    continue
+                batch_ids.add(identity)
+            self.stats["new"] += 1
+            fresh.setdefault(self._key(event), []).append(event)
+
+        passed: List[FlowEvent] = []
+        suppressed: List[FlowEvent] = []
+        for key, contract_events in fresh.items():
+            activity = self.contracts.get(key)
+            # Same window as ``_trim``: a contract quiet for a whole window counts as new.
+            window = [b[1] for b in activity.buckets if b[0] + self.bucket_seconds > cutoff] if activity else []
+            if not window or not activity.emitted_premium:
+                passed.extend(contract_events)
+                continue
+            premium = sum(window) + sum(event.premium for event in contract_events)
+            if premium >= activity.emitted_premium * (1 + self.growth_threshold):
+                passed.extend(contract_events)
+            else:
+                suppressed.extend(contract_events)
+        self.stats["suppressed"] += len(suppressed)
+        self.stats["emitted"] += len(passed)
+        return passed, suppressed
+
+    def commit(self, events: List[FlowEvent], passed_on: bool = True):
+        """Record ``events`` as seen and add them to their contracts' activity.
+
+        With ``passed_on`` the contracts' current premium becomes the baseline
+        that later growth is measured against. Prints already seen are skipped.
+        """
+
+        now = self._clock()
+        touched: Dict[str, ContractActivity] = {}
+        for event in events:
+            identity = self.print_id(event.raw)
+            if identity is not None:
+                if identity in self._seen:
+                    continue
+                self._seen[identity] = now
+            touched[self._key(event)] = self._add(event, now)
+            self.stats["committed"] += 1
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+        if passed_on:
+            for activity in touched.values():
+                activity.emitted_premium = activity.premium
+
+    def aggregate(self, option_symbol: str) -> Optional[ContractActivity]:
+        return self.contracts.get(option_symbol)
+
+    @staticmethod
+    def print_id(flow: Dict) -> Optional[Hashable]:
+        identity = flow.get("id")
+        if identity is not None:
+            return identity
+        timestamp = flow.get("timestamp")
+        if timestamp is None:
+            return None
+        symbol = flow.get("option_symbol") or flow.get("optionSymbol")
+        return (symbol, str(timestamp), flow.get("premium"), flow.get("volume"), flow.get("side"))
+
+    @staticmethod
+    def _key(event: FlowEvent) -> str:
+        return event.option_symbol or event.ticker
+
+    def _add(self, event: FlowEvent, now: float) -> ContractActivity:
+        key = self._key(event)
+        activity = self.contracts.get(key)
+        if activity is None:
+            activity = self.contracts[key] = ContractActivity(option_symbol=key, ticker=event.ticker)
+            while len(self.contracts) > self.max_contracts:
+                self.contracts.popitem(last=False)
+        else:
+            self.contracts.move_to_end(key)
+            self._trim(activity, now - self.window_seconds)
+        printed_at = self._timestamp(event.raw.get("timestamp"), now)
+        start = printed_at - printed_at % self.bucket_seconds
+        bucket = next((b for b in activity.buckets if b[0] == start), None)
+        if bucket is None:
+            bucket = [start, 0.0, 0, 0]
+            activity.buckets.append(bucket)
+            if len(activity.buckets) > 1 and activity.buckets[-2][0] > start:
+                # Late print: keep buckets ordered by start time.
+                activity.buckets = deque(sorted(activity.buckets, key=lambda b: b[0]))
+        bucket[1] += event.premium
+        bucket[2] += 1 if event.is_sweep else 0
+        bucket[3] += event.volume or 0
+        if event.open_interest is not None:
+            activity.open_interest = event.open_interest
+        return activity
+
+    def _trim(self, activity: ContractActivity, cutoff: float):
+        while activity.buckets and activity.buckets[0][0] + self.bucket_seconds <= cutoff:
+            activity.buckets.popleft()
+        if not activity.buckets:
+            # Quiet for a whole window: the next print counts as new activity.
+            activity.emitted_premium = 0.0
+
+    def _expire(self, now: float):
+        # Contracts touched by a batch are trimmed as they are updated; idle
+        # ones are swept at most once per bucket.
+        if now - self._last_sweep >= self.bucket_seconds:
+            self._last_sweep = now
+            cutoff = now - self.window_seconds
+            for key in [k for k, a in self.contracts.items() if not a.buckets or a.buckets[-1][0] + self.bucket_seconds <= cutoff]:
+                del self.contracts[key]
+        seen_cutoff = now - self.seen_ttl_seconds
+        while self._seen:
+            identity, seen_at = next(iter(self._seen.items()))
+            if seen_at > seen_cutoff:
+                break
+            del self._seen[identity]
+
+    @staticmethod
+    def _timestamp(value, default: float) -> float:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return default
+        if isinstance(value, datetime):
+            # Naive datetimes are UTC throughout the pipeline.
+            return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+        return default
@@ -1,34 +1,179 @@
 from __future__ import annotations
 
 import math
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from dataclasses import replace
 from datetime import datetime
 from statistics import median, pstdev
-from typing import Iterable
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from core.logging import get_logger
-from models.schemas import MarketRegimeState
+from models.schemas import MarketRegimeState, PriceSnapshot
 
 logger = get_logger(__name__)
 
 
+class RollingReturns:
+    """Sliding window of closes with O(1) variance and median of |returns|.
+
+    Variance uses Welford's update with removal; the absolute returns are kept
+    in a sorted list so the median is an index lookup. Keeping that list sorted
+    is a binary search plus an O(n) list shift per added or dropped return,
+    which is a short memmove at regime window sizes. Sums are rebuilt from the
+    window every ``window`` removals to shed floating point drift.
+    """
+
+    def __init__(self, window: int):
+        self.window = max(window, 2)
+        self.closes: Deque[float] = deque()
+        self._returns: Deque[float] = deque()
+        self._sorted_abs: List[float] = []
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._removed = 0
+
+    def extend(self, closes: Iterable[float]):
+        for close in closes:
+            self.append(close)
+
+    def append(self, close: float):
+        close = float(close)
+        if self.closes:
+            previous = self.closes[-1]
+            self._add_return((close - previous) / previous)
+        self.closes.append(close)
+        while len(self.closes) > self.window:
+            self.closes.popleft()
+            self._remove_return(self._returns[0])
+
+    def _add_return(self, value: float):
+        self._returns.append(value)
+        insort(self._sorted_abs, abs(value))
+        delta = value - self._mean
+        self._mean += delta / len(self._returns)
+        self._m2 += delta * (value - self._mean)
+
+    def _remove_return(self, value: float):
+        self._returns.popleft()
+        del self._sorted_abs[bisect_left(self._sorted_abs, abs(value))]
+        count = len(self._returns)
+        if not count:
+            self._mean = self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / count
+        self._m2 -= delta * (value - self._mean)
+        self._removed += 1
+        if self._removed >= self.window:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._removed = 0
+        count = len(self._returns)
+        self._mean = sum(self._returns) / count
+        self._m2 = sum((r - self._mean) ** 2 for r in self._returns)
+
+    @property
+    def variance(self) -> float:
+        count = len(self._returns)
+        return max(self._m2, 0.0) / count if count else 0.0
+
+    @property
+    def median_abs_return(self) -> float:
+        values = self._sorted_abs
+        if not values:
+            return 0.0
+        middle = len(values) // 2
+        if len(values) % 2:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2
+
+    @property
+    def trend(self) -> float:
+        return (self.closes[-1] - self.closes[0]) / self.closes[0]
+
+
 class MarketRegimeEngine:
-    def __init__(self):
-        self.history: list[MarketRegimeState] = []
+    """Derives a regime from a close series plus dealer greeks.
 
-    def evaluate(self, ohlc_series: Iterable[float], gex: float, vex: float) -> MarketRegimeState:
-        prices = list(ohlc_series)
+    ``history`` keeps at most ``history_size`` states per ticker for at most
+    ``max_tickers`` tickers. When ``evaluate`` is given ``ticker`` and
+    ``bars_total`` (``PriceSnapshot.bars_total``), a ``RollingReturns`` window
+    per ticker is advanced by the new bars only instead of recomputing the
+    statistics over the whole series.
+    """
+
+    def __init__(self, history_size: int = 100, max_tickers: int = 5_000):
+        self.history_size = history_size
+        self.max_tickers = max_tickers
+        self.history: "OrderedDict[str, Deque[MarketRegimeState]]" = OrderedDict()
+        self._windows: "OrderedDict[str, tuple[int, RollingReturns]]" = OrderedDict()
+
+    def evaluate(
+        self,
+        ohlc_series: Iterable[float],
+        gex: float,
+        vex: float,
+        ticker: Optional[str] = None,
+        bars_total: Optional[int] = None,
+    ) -> MarketRegimeState:
+        volatility, trend, liquidity = self._stats(ohlc_series, ticker, bars_total)
+        regime = self._state(volatility, trend, liquidity, gex, vex)
+        self._remember(ticker or "", regime)
+        return regime
+
+    def evaluate_market(self, snapshots: Dict[str, PriceSnapshot], gex: float, vex: float) -> MarketRegimeState:
+        """Evaluate the broad market from index/ETF snapshots and aggregate greeks.
+
+        Volatility, trend and liquidity are averaged across the symbols, each
+        kept on its own rolling window. The result is remembered under the
+        ``"market"`` history key.
+        """
+
+        stats = [self._stats(s.ohlc or [], symbol, s.bars_total) for symbol, s in snapshots.items() if s.ohlc and len(s.ohlc) >= 5]
+        if not stats:
+            raise ValueError("Not enough data to evaluate market regime")
+        volatility, trend, liquidity = (sum(column) / len(stats) for column in zip(*stats))
+        regime = self._state(volatility, trend, liquidity, gex, vex)
+        regime = replace(regime, reasoning=f"market[{','.join(snapshots)}] {regime.reasoning}")
+        self._remember("market", regime)
+        return regime
+
+    @staticmethod
+    def overlay(market: MarketRegimeState, ohlc_series: Sequence[float]) -> MarketRegimeState:
+        """Per-ticker view of a market regime: the name's own trend, market everything else."""
+
+        if len(ohlc_series) < 2 or not ohlc_series[0]:
+            return market
+        trend = (ohlc_series[-1] - ohlc_series[0]) / ohlc_series[0]
+        trend_bias = MarketRegimeEngine._trend_bias(trend)
+        if trend_bias == market.trend_bias:
+            return market
+        return replace(market, trend_bias=trend_bias, reasoning=f"{market.reasoning} ticker_trend={trend_bias}")
+
+    def _stats(self, ohlc_series: Iterable[float], ticker: Optional[str], bars_total: Optional[int]) -> Tuple[float, float, float]:
+        prices = ohlc_series if isinstance(ohlc_series, Sequence) else list(ohlc_series)
         if len(prices) < 5:
             raise ValueError("Not enough data to evaluate regime")
 
-        returns = [(prices[i + 1] - prices[i]) / prices[i] for i in range(len(prices) - 1)]
-        volatility = float(pstdev(returns) * math.sqrt(252)) if len(returns) > 1 else 0
-        trend = float((prices[-1] - prices[0]) / prices[0])
-        liquidity = float(median([abs(r) for r in returns])) if returns else 0
+        if ticker is not None and bars_total is not None:
+            window = self._window_for(ticker, prices, bars_total)
+            volatility = float(math.sqrt(window.variance) * math.sqrt(252))
+            trend = float(window.trend)
+            liquidity = float(window.median_abs_return)
+        else:
+            prices = list(prices)
+            returns = [(prices[i + 1] - prices[i]) / prices[i] for i in range(len(prices) - 1)]
+            volatility = float(pstdev(returns) * math.sqrt(252)) if len(returns) > 1 else 0
+            trend = float((prices[-1] - prices[0]) / prices[0])
+            liquidity = float(median([abs(r) for r in returns])) if returns else 0
+        return volatility, trend, liquidity
 
-        trend_bias = "bullish" if trend > 0.02 else "bearish" if trend < -0.02 else "neutral"
+    def _state(self, volatility: float, trend: float, liquidity: float, gex: float, vex: float) -> MarketRegimeState:
+        trend_bias = self._trend_bias(trend)
         risk_env = self._risk_environment(volatility, liquidity, vex)
-
-        regime = MarketRegimeState(
+        return MarketRegimeState(
             as_of=datetime.utcnow(),
             trend_bias=trend_bias,
             volatility=volatility,
@@ -38,8 +183,40 @@ class MarketRegimeEngine:
             vex=vex,
             reasoning=f"trend={trend_bias} vol={volatility:.2f} liquidity={liquidity:.4f} gex={gex:.2f} vex={vex:.2f}",
         )
-        self.history.append(regime)
-        return regime
+
+    @staticmethod
+    def _trend_bias(trend: float) -> str:
+        return "bullish" if trend > 0.02 else "bearish" if trend < -0.02 else "neutral"
+
+    def _window_for(self, ticker: str, prices: Sequence[float], bars_total: int) -> RollingReturns:
+        entry = self._windows.get(ticker)
+        if entry is not None:
+            seen, window = entry
+            new = bars_total - seen
+            if 0 <= new <= len(prices) and window.window <= len(prices) <= len(window.closes) + new:
+                # A window that is still filling up grows with the series.
+                window.window = len(prices)
+                window.extend(prices[len(prices) - new :] if new else ())
+                self._windows[ticker] = (bars_total, window)
+                self._windows.move_to_end(ticker)
+                return window
+        window = RollingReturns(len(prices))
+        window.extend(prices)
+        self._windows[ticker] = (bars_total, window)
+        self._windows.move_to_end(ticker)
+        while len(self._windows) > self.max_tickers:
+            self._windows.popitem(last=False)
+        return window
+
+    def _remember(self, ticker: str, regime: MarketRegimeState):
+        states = self.history.get(ticker)
+        if states is None:
+            states = self.history[ticker] = deque(maxlen=self.history_size)
+            while len(self.history) > self.max_tickers:
+                self.history.popitem(last=False)
+        else:
+            self.history.move_to_end(ticker)
+        states.append(regime)
 
     @staticmethod
     def _risk_environment(volatility: float, liquidity: float, vex: float) -> str:
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import heapq
 from datetime import datetime
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
 
 from core.logging import get_logger
 from models.schemas import Direction, FlowEvent
 
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - exercised when dependency missing
+    np = None
+
 logger = get_logger(__name__)
 
 
@@ -16,45 +22,126 @@ class OptionsFlowEngine:
 
     def detect(self, raw_flows: Iterable[dict]) -> List[FlowEvent]:
         events: List[FlowEvent] = []
+        now = datetime.utcnow()
         for flow in raw_flows:
             if flow.get("premium", 0) < self.min_premium:
                 continue
             if flow.get("volume_multiple", 0) < self.min_volume_multiple:
                 continue
-            expiry = flow.get("expiry")
-            if isinstance(expiry, str):
-                expiry = datetime.fromisoformat(expiry)
-            direction = Direction.CALL if flow.get("direction") == "call" else Direction.PUT
-            conviction = self._conviction(flow)
-            expiry_horizon = expiry - datetime.utcnow()
-            dte = max(int(expiry_horizon.days), 0)
-            event = FlowEvent(
-                ticker=flow.get("ticker"),
-                direction=direction,
-                notional=float(flow.get("notional")),
-                premium=float(flow.get("premium")),
-                iv=float(flow.get("iv")),
-                expiry_horizon=expiry_horizon,
-                dte=dte,
-                conviction_score=conviction,
-                spot_price=float(flow.get("spot")),
-                strike=float(flow.get("strike")),
-                expiry=expiry,
-                option_symbol=flow.get("option_symbol") or flow.get("optionSymbol") or "",
-                side=(flow.get("side") or direction.value).upper(),
-                last_price=self._safe_float(flow.get("last_price")),
-                bid=self._safe_float(flow.get("bid")),
-                ask=self._safe_float(flow.get("ask")),
-                volume=self._safe_int(flow.get("volume")),
-                open_interest=self._safe_int(flow.get("open_interest")),
-                volume_multiple=float(flow.get("volume_multiple")),
-                is_sweep=bool(flow.get("is_sweep", False)),
-                is_block=bool(flow.get("is_block", False)),
-                raw=flow,
-            )
-            events.append(event)
+            events.append(self._event(flow, self._conviction(flow), now))
         return sorted(events, key=lambda e: e.conviction_score, reverse=True)
 
+    def detect_columnar(self, columns: Mapping[str, Sequence], top_k: Optional[int] = None) -> List[FlowEvent]:
+        """Detect flow from a struct of arrays (one column per print field).
+
+        Filters and conviction scoring run over whole columns (vectorized when
+        NumPy is installed) and ``FlowEvent`` objects are only built for the
+        surviving rows, or just the ``top_k`` highest-conviction ones. The
+        result matches ``detect`` on the equivalent list of dicts.
+        """
+
+        if np is None:
+            return self._detect_columns_python(columns, top_k)
+        premium = np.asarray(columns["premium"], dtype=float)
+        rows = len(premium)
+        if not rows:
+            return []
+        volume_multiple = np.asarray(columns["volume_multiple"], dtype=float)
+        sweep = np.asarray(columns["is_sweep"], dtype=bool) if "is_sweep" in columns else np.zeros(rows, dtype=bool)
+        block = np.asarray(columns["is_block"], dtype=bool) if "is_block" in columns else np.zeros(rows, dtype=bool)
+
+        survivors = np.flatnonzero((premium >= self.min_premium) & (volume_multiple >= self.min_volume_multiple))
+        conviction = (
+            np.minimum(premium[survivors] / 1_000_000, 3)
+            + np.where(sweep[survivors], 1.5, 0.0)
+            + np.where(block[survivors], 1.0, 0.0)
+            + np.minimum(volume_multiple[survivors], 3)
+        )
+        if top_k is not None and top_k < len(survivors):
+            # Partition first so only the top_k rows are fully sorted.
+            keep = np.argpartition(-conviction, top_k - 1)[:top_k] if top_k > 0 else np.empty(0, dtype=int)
+            keep = keep[np.lexsort((keep, -conviction[keep]))]
+        else:
+            keep = np.argsort(-conviction, kind="stable")
+        rows = self._rows(columns, survivors[keep])
+        now = datetime.utcnow()
+        return [self._event(row, score, now) for row, score in zip(rows, conviction[keep].tolist())]
+
+    def _detect_columns_python(self, columns: Mapping[str, Sequence], top_k: Optional[int]) -> List[FlowEvent]:
+        premium = columns["premium"]
+        volume_multiple = columns["volume_multiple"]
+        sweep = columns.get("is_sweep")
+        block = columns.get("is_block")
+        scored = []
+        for i in range(len(premium)):
+            row_premium = premium[i] or 0
+            row_multiple = volume_multiple[i] or 0
+            if row_premium < self.min_premium or row_multiple < self.min_volume_multiple:
+                continue
+            weight = 0
+            weight += min(row_premium / 1_000_000, 3)
+            weight += 1.5 if sweep is not None and sweep[i] else 0
+            weight += 1.0 if block is not None and block[i] else 0
+            weight += min(row_multiple, 3)
+            scored.append((-weight, i))
+        ranked = heapq.nsmallest(top_k, scored) if top_k is not None else sorted(scored)
+        rows = self._rows(columns, [i for _, i in ranked])
+        now = datetime.utcnow()
+        return [self._event(row, -negated, now) for row, (negated, _) in zip(rows, ranked)]
+
+    @staticmethod
+    def _rows(columns: Mapping[str, Sequence], indices) -> List[Dict]:
+        """Gather the selected rows back into plain print dicts."""
+
+        picked = []
+        for column in columns.values():
+            if hasattr(column, "take"):
+                picked.append(column.take(indices).tolist())
+            else:
+                picked.append([column[i] for i in indices])
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*picked)]
+
+    @staticmethod
+    def to_columns(raw_flows: Iterable[dict]) -> Dict[str, List]:
+        """Convert print dicts into the struct of arrays ``detect_columnar`` takes."""
+
+        flows = list(raw_flows)
+        names = {name: None for flow in flows for name in flow}
+        return {name: [flow.get(name) for flow in flows] for name in names}
+
+    def _event(self, flow: dict, conviction: float, now: datetime) -> FlowEvent:
+        expiry = flow.get("expiry")
+        if isinstance(expiry, str):
+            expiry = datetime.fromisoformat(expiry)
+        direction = Direction.CALL if flow.get("direction") == "call" else Direction.PUT
+        expiry_horizon = expiry - now
+        dte = max(int(expiry_horizon.days), 0)
+        return FlowEvent(
+            ticker=flow.get("ticker"),
+            direction=direction,
+            notional=float(flow.get("notional")),
+            premium=float(flow.get("premium")),
+            iv=float(flow.get("iv")),
+            expiry_horizon=expiry_horizon,
+            dte=dte,
+            conviction_score=conviction,
+            spot_price=float(flow.get("spot")),
+            strike=float(flow.get("strike")),
+            expiry=expiry,
+            option_symbol=flow.get("option_symbol") or flow.get("optionSymbol") or "",
+            side=(flow.get("side") or direction.value).upper(),
+            last_price=self._safe_float(flow.get("last_price")),
+            bid=self._safe_float(flow.get("bid")),
+            ask=self._safe_float(flow.get("ask")),
+            volume=self._safe_int(flow.get("volume")),
+            open_interest=self._safe_int(flow.get("open_interest")),
+            volume_multiple=float(flow.get("volume_multiple")),
+            is_sweep=bool(flow.get("is_sweep", False)),
+            is_block=bool(flow.get("is_block", False)),
+            raw=flow,
+        )
+
     def _conviction(self, flow: dict) -> float:
         weight = 0
         weight += min(flow.get("premium", 0) / 1_000_000, 3)
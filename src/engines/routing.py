@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from engines.rules import RuleTable
 from models.schemas import RoutedSignal, ScoreResult
 
 
@@ -10,48 +14,165 @@ class QueueItem(RoutedSignal):
     expires_at: datetime
 
 
+class ExpiryQueue:
+    """Signals ordered by expiry in a heap, with a per-signal index.
+
+    Removal only drops the index entry; the stale heap entry is skipped when it
+    surfaces and the heap is compacted once stale entries outnumber live ones.
+    Expiry costs O(expired log n), push and removal O(log n) and O(1).
+    Pushing a queued signal again replaces its entry.
+    With ``max_size`` set, the signals closest to expiry are evicted first.
+    Iteration yields live signals in insertion order.
+    """
+
+    def __init__(self, ttl: Optional[timedelta] = None, max_size: Optional[int] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._heap: List[Tuple[datetime, int, int]] = []
+        self._index: Dict[int, Tuple[datetime, int, RoutedSignal]] = {}
+        self._order = itertools.count()
+        self._stale = 0
+
+    def push(self, signal: RoutedSignal) -> List[RoutedSignal]:
+        """Queue ``signal`` and return any signals evicted to respect ``max_size``."""
+
+        expires_at = signal.created_at + self.ttl if self.ttl is not None else datetime.max
+        seq = next(self._order)
+        if id(signal) in self._index:
+            # The replaced heap entry is skipped like a removed one.
+            self._stale += 1
+        self._index[id(signal)] = (expires_at, seq, signal)
+        heapq.heappush(self._heap, (expires_at, seq, id(signal)))
+        evicted = []
+        while self.max_size is not None and len(self._index) > self.max_size:
+            evicted.append(self._pop())
+        return evicted
+
+    def remove(self, signal: RoutedSignal) -> bool:
+        if self._index.pop(id(signal), None) is None:
+            return False
+        self._stale += 1
+        if self._stale > 64 and self._stale > len(self._index):
+            self._compact()
+        return True
+
+    def pop_expired(self, now: datetime) -> List[RoutedSignal]:
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            signal = self._pop()
+            if signal is not None:
+                expired.append(signal)
+        return expired
+
+    def _pop(self) -> Optional[RoutedSignal]:
+        while self._heap:
+            expires_at, seq, key = heapq.heappop(self._heap)
+            entry = self._index.get(key)
+            if entry is not None and entry[1] == seq:
+                del self._index[key]
+                return entry[2]
+            self._stale -= 1
+        return None
+
+    def _compact(self):
+        self._heap = [(expires_at, seq, key) for key, (expires_at, seq, _) in self._index.items()]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def __contains__(self, signal: RoutedSignal) -> bool:
+        return id(signal) in self._index
+
+    def __iter__(self) -> Iterator[RoutedSignal]:
+        return iter([signal for _, _, signal in self._index.values()])
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
 class RoutingEngine:
-    def __init__(self, intraday_expiry_minutes: int = 60, swing_expiry_days: int = 10):
-        self.immediate: List[RoutedSignal] = []
-        self.intraday: List[RoutedSignal] = []
-        self.swing: List[RoutedSignal] = []
-        self.rejected: List[RoutedSignal] = []
+    """Routes scored signals into immediate, intraday, swing and rejected queues.
+
+    Intraday and swing signals expire after their horizon; immediate and
+    rejected ones are kept for ``*_retention`` and capped at ``max_*``. Routes
+    and promotion come from ``rules`` (a ``RuleTable``), replaced with
+    ``set_rules``. ``refresh_queues`` pops expired signals in O(expired log n)
+    and makes one pass over intraday to promote signals whose score was raised
+    in place; ``rescore`` updates and promotes a single signal in O(log n).
+    ``stats`` counts expiries, promotions and cap evictions and records how
+    long the last ``refresh_queues`` took.
+    """
+
+    def __init__(
+        self,
+        intraday_expiry_minutes: int = 60,
+        swing_expiry_days: int = 10,
+        immediate_retention_minutes: Optional[float] = 24 * 60,
+        rejected_retention_minutes: Optional[float] = 60,
+        max_immediate: Optional[int] = 1_000,
+        max_rejected: Optional[int] = 1_000,
+        rules: Optional[RuleTable] = None,
+    ):
+        self.rules = rules or RuleTable()
         self.intraday_expiry = timedelta(minutes=intraday_expiry_minutes)
         self.swing_expiry = timedelta(days=swing_expiry_days)
+        self.immediate = ExpiryQueue(self._minutes(immediate_retention_minutes), max_immediate)
+        self.intraday = ExpiryQueue(self.intraday_expiry)
+        self.swing = ExpiryQueue(self.swing_expiry)
+        self.rejected = ExpiryQueue(self._minutes(rejected_retention_minutes), max_rejected)
+        self.stats: Dict[str, float] = {"expired": 0, "promoted": 0, "evicted": 0, "refreshes": 0, "last_refresh_ms": 0.0}
+
+    @staticmethod
+    def _minutes(value: Optional[float]) -> Optional[timedelta]:
+        return timedelta(minutes=value) if value else None
 
     def route(self, score: ScoreResult, routed_signal: RoutedSignal) -> str:
-        route = self._determine_route(score.score)
+        route = self.rules.route(score.score, *self._rule_keys(routed_signal))
         routed_signal.route = route
-        if route == "immediate_alert":
-            self.immediate.append(routed_signal)
-        elif route == "intraday_watch":
-            self.intraday.append(routed_signal)
-        elif route == "swing_watch":
-            self.swing.append(routed_signal)
-        else:
-            self.rejected.append(routed_signal)
+        queue = {"immediate_alert": self.immediate, "intraday_watch": self.intraday, "swing_watch": self.swing}.get(route, self.rejected)
+        self.stats["evicted"] += len(queue.push(routed_signal))
         return route
 
+    def rescore(self, signal: RoutedSignal, score: float) -> str:
+        """Update a queued signal's score and grade, promoting it out of intraday in O(log n)."""
+
+        signal.score.score = score
+        signal.score.grade = self.rules.grade(score)
+        if self._promotable(signal) and self.intraday.remove(signal):
+            self._promote(signal)
+        return signal.route
+
+    def set_rules(self, rules: RuleTable):
+        """Swap in ``rules`` and promote intraday signals that now qualify (one pass)."""
+
+        self.rules = rules
+        self._promote_qualified()
+
     def refresh_queues(self):
+        start = time.perf_counter()
         now = datetime.utcnow()
-        self.intraday = [s for s in self.intraday if (now - s.created_at) < self.intraday_expiry]
-        self.swing = [s for s in self.swing if (now - s.created_at) < self.swing_expiry]
-
-        promotions: List[RoutedSignal] = []
-        for s in list(self.intraday):
-            if s.score.score >= 85:
-                promotions.append(s)
-        for p in promotions:
-            self.intraday.remove(p)
-            p.route = "immediate_alert"
-            self.immediate.append(p)
+        for queue in (self.immediate, self.intraday, self.swing, self.rejected):
+            self.stats["expired"] += len(queue.pop_expired(now))
+        self._promote_qualified()
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def queue_sizes(self) -> Dict[str, int]:
+        return {"immediate": len(self.immediate), "intraday": len(self.intraday), "swing": len(self.swing), "rejected": len(self.rejected)}
+
+    def _promote_qualified(self):
+        for signal in [s for s in self.intraday if self._promotable(s)]:
+            self.intraday.remove(signal)
+            self._promote(signal)
+
+    def _promote(self, signal: RoutedSignal):
+        signal.route = "immediate_alert"
+        self.stats["promoted"] += 1
+        self.stats["evicted"] += len(self.immediate.push(signal))
 
     @staticmethod
-    def _determine_route(score: float) -> str:
-        if score >= 85:
-            return "immediate_alert"
-        if score >= 65:
-            return "intraday_watch"
-        if score >= 50:
-            return "swing_watch"
-        return "reject"
+    def _rule_keys(signal: RoutedSignal) -> Tuple[Optional[str], Optional[str]]:
+        candidate = signal.candidate
+        return candidate.classification, candidate.regime.risk_environment if candidate.regime else None
+
+    def _promotable(self, signal: RoutedSignal) -> bool:
+        return signal.score.score >= self.rules.promotion_threshold(*self._rule_keys(signal))
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from itertools import product
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from core.config import ConfigError
+
+ROUTES = ("immediate_alert", "intraday_watch", "swing_watch")
+GRADES = ("A", "B", "C")
+DEFAULT_BANDS = {"immediate_alert": 85, "intraday_watch": 65, "swing_watch": 50}
+DEFAULT_GRADES = {"A": 85, "B": 65, "C": 50}
+
+
+class _Bands:
+    """Score thresholds compiled to a sorted list for ``bisect``."""
+
+    __slots__ = ("thresholds", "labels", "floors")
+
+    def __init__(self, floors: Mapping[str, float], below: str):
+        ordered = sorted(floors.items(), key=lambda item: item[1])
+        self.floors = dict(floors)
+        self.thresholds: List[float] = [float(floor) for _, floor in ordered]
+        self.labels: List[str] = [below] + [label for label, _ in ordered]
+
+    def lookup(self, score: float) -> str:
+        return self.labels[bisect_right(self.thresholds, score)]
+
+
+class RuleTable:
+    """Declarative routing and grading rules compiled into bisect lookups.
+
+    ``bands`` maps each route to the minimum score that reaches it (anything
+    below the lowest band is rejected) and ``grades`` does the same for
+    letter grades (below the lowest is ``D``). ``overrides`` replaces band
+    floors per candidate classification and/or per regime risk environment;
+    regime overrides are applied over classification ones. A queued intraday
+    signal is promoted once it scores ``promotion.min_score``, which defaults
+    to the signal's own immediate-alert floor.
+
+    Every classification/regime combination is compiled up front, so a lookup
+    is one dict access plus one bisect. Each compiled table must keep
+    ``swing_watch <= intraday_watch <= immediate_alert`` (and ``C <= B <= A``
+    for grades), otherwise ``ConfigError`` is raised. Tables are immutable;
+    swap the whole table to change rules at runtime.
+    """
+
+    def __init__(
+        self,
+        bands: Optional[Mapping[str, float]] = None,
+        grades: Optional[Mapping[str, float]] = None,
+        overrides: Optional[Mapping[str, Mapping[str, Mapping[str, float]]]] = None,
+        promotion: Optional[Mapping[str, float]] = None,
+    ):
+        base = self._validated({**DEFAULT_BANDS, **(bands or {})}, "bands")
+        overrides = overrides or {}
+        unknown = set(overrides) - {"classification", "regime"}
+        if unknown:
+            raise ConfigError(f"Unknown routing override scopes: {sorted(unknown)}")
+        by_class = {name: self._validated(floors, f"classification override {name!r}") for name, floors in (overrides.get("classification") or {}).items()}
+        by_regime = {name: self._validated(floors, f"regime override {name!r}") for name, floors in (overrides.get("regime") or {}).items()}
+
+        self._tables: Dict[Tuple[Optional[str], Optional[str]], _Bands] = {}
+        for classification, regime in product([None, *by_class], [None, *by_regime]):
+            floors = {**base, **by_class.get(classification, {}), **by_regime.get(regime, {})}
+            self._ordered(floors, ROUTES, f"bands for classification {classification!r}, regime {regime!r}")
+            self._tables[(classification, regime)] = _Bands(floors, "reject")
+        self._classifications = frozenset(by_class)
+        self._regimes = frozenset(by_regime)
+        grade_floors = self._validated({**DEFAULT_GRADES, **(grades or {})}, "grades", GRADES)
+        self._ordered(grade_floors, GRADES, "grades")
+        self.grades = _Bands(grade_floors, "D")
+        self.promotion_min_score = (promotion or {}).get("min_score")
+        # Lowest score that routes anywhere but reject, under any override.
+        self.min_route_score = min(table.thresholds[0] for table in self._tables.values())
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> "RuleTable":
+        """Build from the ``routing`` config section (missing keys use the defaults)."""
+
+        section = config.get("routing") or {}
+        return cls(
+            bands=section.get("bands"),
+            grades=section.get("grades"),
+            overrides=section.get("overrides"),
+            promotion=section.get("promotion"),
+        )
+
+    @staticmethod
+    def _validated(floors: Mapping[str, float], where: str, labels: Tuple[str, ...] = ROUTES) -> Dict[str, float]:
+        if not isinstance(floors, Mapping):
+            raise ConfigError(f"Expected a mapping of score thresholds in {where}")
+        unknown = set(floors) - set(labels)
+        if unknown:
+            raise ConfigError(f"Unknown labels in {where}: {sorted(map(str, unknown))}")
+        try:
+            return {label: float(floor) for label, floor in floors.items()}
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(f"Invalid score threshold in {where}: {exc}") from exc
+
+    @staticmethod
+    def _ordered(floors: Mapping[str, float], labels: Tuple[str, ...], where: str):
+        """Require floors to be non-increasing from the best label to the worst."""
+
+        for higher, lower in zip(labels, labels[1:]):
+            if floors[lower] > floors[higher]:
+                raise ConfigError(f"Invalid {where}: {lower} ({floors[lower]:g}) is above {higher} ({floors[higher]:g})")
+
+    def _bands(self, classification: Optional[str], regime: Optional[str]) -> _Bands:
+        key = (
+            classification if classification in self._classifications else None,
+            regime if regime in self._regimes else None,
+        )
+        return self._tables[key]
+
+    @property
+    def bands(self) -> Dict[str, float]:
+        """Route floors without overrides."""
+
+        return dict(self._tables[(None, None)].floors)
+
+    def route(self, score: float, classification: Optional[str] = None, regime: Optional[str] = None) -> str:
+        return self._bands(classification, regime).lookup(score)
+
+    def grade(self, score: float) -> str:
+        return self.grades.lookup(score)
+
+    def promotion_threshold(self, classification: Optional[str] = None, regime: Optional[str] = None) -> float:
+        if self.promotion_min_score is not None:
+            return float(self.promotion_min_score)
+        return self._bands(classification, regime).floors["immediate_alert"]
@@ -1,14 +1,129 @@
 from __future__ import annotations
 
-from typing import List
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
 
 from models.schemas import TechnicalContext
 
+try:
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - exercised when dependency missing
+    np = None
+
+_EMA_SPANS = (9, 20, 50, 12, 26)
+_COLUMNS = ("rsi", "macd", "macd_signal", "ema_fast", "ema_mid", "ema_slow", "volume_trend", "bias")
+
+
+class IndicatorState:
+    """Running EMA9/20/50, Wilder RSI and MACD for one ticker, updated in O(1) per bar.
+
+    EMAs are seeded with the first close. Gain/loss averages are seeded with the
+    simple mean of the first ``rsi_period`` moves and Wilder-smoothed after
+    that. The MACD signal line is a real EMA9 of the MACD line, started once
+    EMA26 has ``26`` bars behind it; MACD is reported from bar 35 on.
+    """
+
+    __slots__ = ("bars", "last_close", "ema_fast", "ema_mid", "ema_slow", "ema12", "ema26", "signal", "avg_gain", "avg_loss", "rsi_period")
+
+    def __init__(self, rsi_period: int = 14):
+        self.rsi_period = rsi_period
+        self.bars = 0
+        self.last_close = 0.0
+        self.ema_fast = self.ema_mid = self.ema_slow = self.ema12 = self.ema26 = 0.0
+        self.signal = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    @classmethod
+    def from_history(cls, closes: Iterable[float], rsi_period: int = 14) -> "IndicatorState":
+        state = cls(rsi_period)
+        state.extend(closes)
+        return state
+
+    def extend(self, closes: Iterable[float]):
+        for close in closes:
+            self.update(close)
+
+    def update(self, close: float):
+        close = float(close)
+        if self.bars == 0:
+            self.ema_fast = self.ema_mid = self.ema_slow = self.ema12 = self.ema26 = close
+            self.last_close = close
+            self.bars = 1
+            return
+        self.ema_fast += (close - self.ema_fast) * (2 / 10)
+        self.ema_mid += (close - self.ema_mid) * (2 / 21)
+        self.ema_slow += (close - self.ema_slow) * (2 / 51)
+        self.ema12 += (close - self.ema12) * (2 / 13)
+        self.ema26 += (close - self.ema26) * (2 / 27)
+
+        delta = close - self.last_close
+        gain, loss = (delta, 0.0) if delta >= 0 else (0.0, -delta)
+        moves = self.bars  # number of deltas including this one
+        period = self.rsi_period
+        if moves <= period:
+            self.avg_gain += gain / period
+            self.avg_loss += loss / period
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        self.bars += 1
+        self.last_close = close
+        macd = self.ema12 - self.ema26
+        if self.bars == 26:
+            self.signal = macd
+        elif self.bars > 26:
+            self.signal += (macd - self.signal) * (2 / 10)
+
+    @property
+    def rsi(self) -> float:
+        if self.bars <= self.rsi_period:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else 50.0
+        return 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+    @property
+    def macd(self) -> tuple[float, float]:
+        if self.bars < 35:
+            return 0.0, 0.0
+        return self.ema12 - self.ema26, self.signal
+
 
 class TechnicalEngine:
-    def evaluate(self, ticker: str, prices: List[float], volume: float, vwap: float, sector_strength: float) -> TechnicalContext:
-        rsi = self._rsi(prices)
-        macd, signal = self._macd(prices)
+    """Per-ticker technical context.
+
+    By default every call recomputes indicators from ``prices``. With
+    ``incremental=True`` an ``IndicatorState`` is kept per ticker (LRU-bounded
+    to ``max_tickers``) and callers pass ``bars_total``, the number of bars
+    ever seen for the ticker (``PriceSnapshot.bars_total``), so only bars that
+    arrived since the previous call are folded in. The state is reseeded from
+    ``prices`` when the bar count goes backwards or more bars arrived than
+    ``prices`` holds. Both modes use the same Wilder RSI and MACD signal line,
+    so switching ``incremental`` on does not change scores.
+    """
+
+    def __init__(self, incremental: bool = False, max_tickers: int = 5_000):
+        self.incremental = incremental
+        self.max_tickers = max_tickers
+        self._states: "OrderedDict[str, tuple[int, IndicatorState]]" = OrderedDict()
+        self.state_stats: Dict[str, int] = {"updates": 0, "reseeds": 0}
+
+    def evaluate(
+        self,
+        ticker: str,
+        prices: Sequence[float],
+        volume: float,
+        vwap: float,
+        sector_strength: float,
+        bars_total: Optional[int] = None,
+    ) -> TechnicalContext:
+        if self.incremental and prices:
+            return self._evaluate_incremental(ticker, prices, volume, vwap, bars_total)
+        state = IndicatorState.from_history(prices)
+        rsi = state.rsi
+        macd, signal = state.macd
         ema_fast = self._ema(prices, 9)
         ema_mid = self._ema(prices, 20)
         ema_slow = self._ema(prices, 50)
@@ -29,6 +144,162 @@ class TechnicalEngine:
             bias=bias,
         )
 
+    def _evaluate_incremental(self, ticker: str, prices: Sequence[float], volume: float, vwap: float, bars_total: Optional[int]) -> TechnicalContext:
+        state = self._state_for(ticker, prices, bars_total)
+        macd, signal = state.macd
+        return self._context(ticker, prices, volume, vwap, state.rsi, macd, signal, state.ema_fast, state.ema_mid, state.ema_slow)
+
+    def _state_for(self, ticker: str, prices: Sequence[float], bars_total: Optional[int]) -> IndicatorState:
+        entry = self._states.get(ticker)
+        if entry is not None and bars_total is not None:
+            seen, state = entry
+            new = bars_total - seen
+            if 0 <= new <= len(prices):
+                if new:
+                    state.extend(prices[len(prices) - new :])
+                    self.state_stats["updates"] += new
+                self._states[ticker] = (bars_total, state)
+                self._states.move_to_end(ticker)
+                return state
+        return self.reseed(ticker, prices, bars_total)
+
+    def reseed(self, ticker: str, prices: Sequence[float], bars_total: Optional[int] = None) -> IndicatorState:
+        """Rebuild ``ticker``'s indicator state from its price history."""
+
+        state = IndicatorState.from_history(prices)
+        self._states[ticker] = (len(prices) if bars_total is None else bars_total, state)
+        self._states.move_to_end(ticker)
+        while len(self._states) > self.max_tickers:
+            self._states.popitem(last=False)
+        self.state_stats["reseeds"] += 1
+        return state
+
+    def _context(self, ticker, prices, volume, vwap, rsi, macd, signal, ema_fast, ema_mid, ema_slow) -> TechnicalContext:
+        avg_price = sum(prices[-10:]) / min(len(prices), 10)
+        return TechnicalContext(
+            ticker=ticker,
+            rsi=rsi,
+            macd=macd,
+            macd_signal=signal,
+            ema_fast=ema_fast,
+            ema_mid=ema_mid,
+            ema_slow=ema_slow,
+            vwap=vwap,
+            volume=volume,
+            volume_trend=volume / avg_price,
+            bias=self._bias(prices, ema_fast, ema_mid, ema_slow, vwap),
+        )
+
+    def evaluate_batch(
+        self,
+        tickers: Sequence[str],
+        prices: Sequence[Sequence[float]],
+        volumes: Sequence[float],
+        vwaps: Sequence[float],
+        sector_strengths: Sequence[float] | None = None,
+    ) -> List[TechnicalContext]:
+        """Evaluate a whole universe at once; ``prices`` is a tickers x bars matrix.
+
+        Produces the same contexts as calling ``evaluate`` per ticker. Every row
+        must hold the same number of bars (oldest first).
+        """
+
+        columns = self.compute_batch(prices, volumes, vwaps)
+        return [
+            TechnicalContext(
+                ticker=ticker,
+                rsi=float(columns["rsi"][i]),
+                macd=float(columns["macd"][i]),
+                macd_signal=float(columns["macd_signal"][i]),
+                ema_fast=float(columns["ema_fast"][i]),
+                ema_mid=float(columns["ema_mid"][i]),
+                ema_slow=float(columns["ema_slow"][i]),
+                vwap=float(vwaps[i]),
+                volume=float(volumes[i]),
+                volume_trend=float(columns["volume_trend"][i]),
+                bias=str(columns["bias"][i]),
+            )
+            for i, ticker in enumerate(tickers)
+        ]
+
+    def compute_batch(self, prices: Sequence[Sequence[float]], volumes: Sequence[float], vwaps: Sequence[float]) -> Dict[str, Sequence]:
+        """Columnar indicators for a tickers x bars price matrix.
+
+        Returns one column per indicator (``rsi``, ``macd``, ``macd_signal``,
+        ``ema_fast``, ``ema_mid``, ``ema_slow``, ``volume_trend``, ``bias``).
+        Uses NumPy when installed and falls back to the per-ticker loop.
+        """
+
+        if np is None or len(prices) == 0 or len(prices[0]) == 0:
+            rows = [self.evaluate("", list(row), volume, vwap, 0.0) for row, volume, vwap in zip(prices, volumes, vwaps)]
+            return {name: [getattr(row, name) for row in rows] for name in _COLUMNS}
+
+        matrix = np.asarray(prices, dtype=float)
+        if matrix.ndim != 2:
+            raise ValueError("prices must be a tickers x bars matrix")
+        volume = np.asarray(volumes, dtype=float)
+        vwap = np.asarray(vwaps, dtype=float)
+        bars = matrix.shape[1]
+
+        # One pass over the bar axis updates every span, the Wilder gain/loss
+        # averages and the MACD signal line for every ticker, with the same
+        # recurrences as ``IndicatorState``.
+        period = 14
+        k = np.array([2 / (span + 1) for span in _EMA_SPANS])[:, None]
+        decay = np.array([1 - 2 / (span + 1) for span in _EMA_SPANS])[:, None]
+        emas = np.repeat(matrix[None, :, 0], len(_EMA_SPANS), axis=0)
+        avg_gain = np.zeros(len(matrix))
+        avg_loss = np.zeros(len(matrix))
+        signal = np.zeros(len(matrix))
+        for column in range(1, bars):
+            emas = matrix[:, column] * k + emas * decay
+            delta = matrix[:, column] - matrix[:, column - 1]
+            gain, loss = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+            if column <= period:
+                avg_gain += gain / period
+                avg_loss += loss / period
+            else:
+                avg_gain = (avg_gain * (period - 1) + gain) / period
+                avg_loss = (avg_loss * (period - 1) + loss) / period
+            if column + 1 == 26:
+                signal = emas[3] - emas[4]
+            elif column + 1 > 26:
+                signal = signal + (emas[3] - emas[4] - signal) * (2 / 10)
+        ema_fast, ema_mid, ema_slow, ema12, ema26 = emas
+
+        if bars >= 35:
+            macd = ema12 - ema26
+        else:
+            macd = np.zeros(len(matrix))
+            signal = np.zeros(len(matrix))
+
+        if bars <= period:
+            rsi = np.full(len(matrix), 50.0)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = np.where(
+                    avg_loss == 0,
+                    np.where(avg_gain > 0, 100.0, 50.0),
+                    100 - (100 / (1 + avg_gain / avg_loss)),
+                )
+        avg_price = matrix[:, -10:].sum(axis=1) / min(bars, 10)
+        volume_trend = volume / avg_price
+
+        last = matrix[:, -1]
+        bullish = (last > ema_fast) & (ema_fast > ema_mid) & (ema_mid > ema_slow) & (last > vwap)
+        bearish = (last < ema_fast) & (ema_fast < ema_mid) & (ema_mid < ema_slow) & (last < vwap)
+        bias = np.where(bullish, "bullish", np.where(bearish, "bearish", "neutral"))
+        return {
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": signal,
+            "ema_fast": ema_fast,
+            "ema_mid": ema_mid,
+            "ema_slow": ema_slow,
+            "volume_trend": volume_trend,
+            "bias": bias,
+        }
+
     def _ema(self, prices: List[float], span: int) -> float:
         if not prices:
             return 0.0
@@ -38,31 +309,6 @@ class TechnicalEngine:
             ema = price * k + ema * (1 - k)
         return ema
 
-    def _rsi(self, prices: List[float], period: int = 14) -> float:
-        if len(prices) < period + 1:
-            return 50.0
-        gains = []
-        losses = []
-        for i in range(1, len(prices)):
-            delta = prices[i] - prices[i - 1]
-            if delta >= 0:
-                gains.append(delta)
-            else:
-                losses.append(-delta)
-        avg_gain = sum(gains[-period:]) / period if gains else 0
-        avg_loss = sum(losses[-period:]) / period if losses else 0
-        rs = avg_gain / avg_loss if avg_loss != 0 else 0
-        return 100 - (100 / (1 + rs)) if rs else 50.0
-
-    def _macd(self, prices: List[float]) -> tuple[float, float]:
-        if len(prices) < 35:
-            return 0.0, 0.0
-        ema12 = self._ema(prices, 12)
-        ema26 = self._ema(prices, 26)
-        macd = ema12 - ema26
-        signal = self._ema([macd] * 9, 9)
-        return macd, signal
-
     def _bias(self, prices: List[float], ema_fast: float, ema_mid: float, ema_slow: float, vwap: float) -> str:
         if not prices:
             return "neutral"
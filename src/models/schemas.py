@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 
 class Direction(str, Enum):
@@ -60,7 +60,8 @@ class PriceSnapshot:
     vwap: float
     sector_strength: float
     timestamp: datetime = field(default_factory=datetime.utcnow)
-    ohlc: Optional[List[float]] = None
+    ohlc: Optional[Sequence[float]] = None
+    bars_total: Optional[int] = None
 
 
 @dataclass
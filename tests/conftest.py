@@ -1,7 +1,105 @@
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+from core.brain import TradingBrain  # noqa: E402
+from models.schemas import (  # noqa: E402
+    Candidate,
+    Direction,
+    FlowEvent,
+    MarketRegimeState,
+    PriceSnapshot,
+    RoutedSignal,
+    ScoreResult,
+    TechnicalContext,
+)
+
+
+def _build_signal(route: str = "intraday_watch") -> RoutedSignal:
+    flow = FlowEvent(
+        ticker="AAPL",
+        direction=Direction.CALL,
+        notional=1_000_000,
+        premium=50_000,
+        iv=0.4,
+        expiry_horizon=timedelta(days=7),
+        dte=7,
+        conviction_score=0.85,
+        spot_price=190.0,
+        strike=195.0,
+        expiry=datetime.utcnow() + timedelta(days=7),
+        option_symbol="AAPL240901C00195000",
+        side="CALL",
+        last_price=5.2,
+        bid=5.1,
+        ask=5.3,
+        volume=2000,
+        open_interest=7500,
+        volume_multiple=5,
+    )
+    price = PriceSnapshot(
+        ticker="AAPL",
+        price=190.0,
+        change_pct=0.02,
+        volume=1_000_000,
+        vwap=189.5,
+        sector_strength=0.5,
+        ohlc=[185, 188, 191, 190],
+    )
+    regime = MarketRegimeState(
+        trend_bias="bullish",
+        volatility=0.2,
+        liquidity=0.8,
+        risk_environment="benign",
+        gex=1.2,
+        vex=0.4,
+        reasoning="test regime",
+    )
+    technical = TechnicalContext(
+        ticker="AAPL",
+        rsi=55,
+        macd=1.2,
+        macd_signal=1.0,
+        ema_fast=188,
+        ema_mid=185,
+        ema_slow=180,
+        vwap=189.5,
+        volume=1_000_000,
+        volume_trend=1.1,
+        bias="bullish",
+    )
+    candidate = Candidate(ticker="AAPL", flow=flow, price=price, regime=regime, technical=technical)
+    score = ScoreResult(score=78, grade="B", reasoning="solid flow")
+    return RoutedSignal(candidate=candidate, score=score, route=route)
+
+
+@pytest.fixture
+def build_signal():
+    """Factory for a fully populated AAPL ``RoutedSignal`` on a given route.
+
+    Same signal as ``test_storage.build_signal``, for the newer test modules.
+    """
+
+    return _build_signal
+
+
+@pytest.fixture
+def make_brain(tmp_path):
+    """Factory for a ``TradingBrain`` with its ledger under ``tmp_path`` and no transports."""
+
+    def factory(**app) -> TradingBrain:
+        config = {
+            "app": {"max_concurrent_tasks": 4, **app},
+            "storage": {"path": str(tmp_path / "alerts.db")},
+            "alerts": {"transports": {"telegram": {"enabled": False}}},
+        }
+        return TradingBrain(config)
+
+    return factory
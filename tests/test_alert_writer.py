@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from core.alert_writer import AsyncAlertWriter
+from core.storage import AlertStore
+
+
+class SlowStore(AlertStore):
+    def __init__(self, *args, delay: float = 0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.batches = []
+        self.threads = set()
+
+    def record_signals(self, signals):
+        signals = list(signals)
+        time.sleep(self.delay)
+        self.batches.append(len(signals))
+        self.threads.add(threading.current_thread().name)
+        return super().record_signals(signals)
+
+
+def test_writer_batches_off_loop_with_backpressure(tmp_path, build_signal):
+    store = SlowStore(db_path=str(tmp_path / "alerts.db"))
+    writer = AsyncAlertWriter(store, max_pending=4, batch_size=3)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        beat = asyncio.create_task(heartbeat())
+        await writer.submit((build_signal("intraday_watch"), {"n": i}) for i in range(12))
+        await writer.flush()
+        beat.cancel()
+        pending = await writer.call(store.get_pending_for_checks, 50)
+        await writer.close()
+        return ticks, pending
+
+    ticks, pending = asyncio.run(scenario())
+
+    assert len(pending) == 12
+    assert writer.stats["written"] == 12 and writer.stats["errors"] == 0
+    assert writer.stats["backpressure_waits"] > 0
+    assert max(store.batches) <= 3 and len(store.batches) < 12
+    assert store.threads == {next(iter(store.threads))} and "alert-writer" in next(iter(store.threads))
+    # The loop kept running while the writer thread slept in SQLite.
+    assert ticks >= 10
+    store.close()
+
+
+def test_brain_flushes_writer_on_close(tmp_path, make_brain, build_signal):
+    brain = make_brain()
+
+    async def scenario():
+        await brain.alert_writer.submit([(build_signal("swing_watch"), None)])
+        await brain.close()
+
+    asyncio.run(scenario())
+
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    assert [record["route"] for record in store.get_pending_for_checks()] == ["swing_watch"]
+    store.close()
+
+
+class FlakyStore(AlertStore):
+    def __init__(self, *args, failures: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failures = failures
+
+    def record_signals(self, signals):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return super().record_signals(signals)
+
+
+def test_writer_retries_failed_batches_then_drops(tmp_path, build_signal):
+    store = FlakyStore(db_path=str(tmp_path / "alerts.db"), failures=2)
+    writer = AsyncAlertWriter(store, batch_size=10, max_retries=2, retry_seconds=0.001)
+
+    async def scenario():
+        await writer.submit([(build_signal(), None)])
+        await writer.flush()
+        store.failures = 3
+        await writer.submit([(build_signal(), None)])
+        await writer.close()
+
+    asyncio.run(scenario())
+
+    assert len(store.get_pending_for_checks(50)) == 1
+    assert (writer.stats["written"], writer.stats["errors"], writer.stats["dropped"]) == (1, 5, 1)
+    store.close()
+
+
+def test_records_left_by_a_finished_loop_are_written_by_the_next(tmp_path, build_signal):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    writer = AsyncAlertWriter(store, batch_size=1)
+
+    async def submit_only():
+        await writer.submit([(build_signal(), {"n": i}) for i in range(4)])
+
+    asyncio.run(submit_only())
+    asyncio.run(writer.close())
+
+    # Cancelled mid-batch by ``asyncio.run``; the rest wait in the old queue.
+    assert len(store.get_pending_for_checks(50)) == 4
+    store.close()
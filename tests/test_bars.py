@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from data.bars import BarRing
+from data.service import DataService
+
+
+def test_ring_rolling_vwap_matches_full_recompute():
+    ring = BarRing(capacity=25, vwap_window=20)
+    bars = [(float(t), 100 + (t % 7) * 0.5, 1_000 + t * 10) for t in range(60)]
+    for ts, close, volume in bars:
+        ring.append(ts, close, volume)
+
+    window = bars[-20:]
+    expected = sum(c * v for _, c, v in window) / sum(v for _, _, v in window)
+    assert ring.vwap == pytest.approx(expected)
+    assert ring.window_volume == pytest.approx(sum(v for _, _, v in window))
+    assert list(ring.closes(5)) == [c for _, c, _ in bars[-5:]]
+    assert not ring.append(10.0, 1.0, 1.0)
+
+
+def test_closes_are_copied_and_survive_wraparound():
+    ring = BarRing(capacity=4, vwap_window=2)
+    for ts in range(6):
+        ring.append(float(ts), float(ts), 1.0)
+    window = ring.closes(3)
+    for ts in range(6, 20):
+        ring.append(float(ts), float(ts), 1.0)
+
+    assert list(window) == [3.0, 4.0, 5.0]
+    assert list(ring.closes()) == [16.0, 17.0, 18.0, 19.0]
+    assert list(ring.closes(10)) == [16.0, 17.0, 18.0, 19.0]
+
+
+def test_price_snapshot_fetches_only_new_bars():
+    service = DataService(market_data_key="", benzinga_key="", cache_ttl_seconds=0)
+    requests = []
+    history = [{"t": t * 60, "c": 100.0 + t, "v": 1_000} for t in range(60)]
+
+    async def fetch_bars(ticker, since=None, limit=50):
+        requests.append(since)
+        newer = [bar for bar in history if since is None or bar["t"] > since]
+        return newer[-limit:]
+
+    service.market.fetch_bars = fetch_bars
+
+    async def run():
+        first = await service.get_price_snapshot("AAPL")
+        history.append({"t": 60 * 60, "c": 200.0, "v": 1_000})
+        second = await service.get_price_snapshot("AAPL")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert requests == [None, 59 * 60]
+    assert len(second.ohlc) == 50
+    assert second.price == 200.0
+    assert first.ohlc[-1] == 159.0
+    assert (first.bars_total, second.bars_total) == (50, 51)
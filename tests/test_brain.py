@@ -0,0 +1,223 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.brain import TradingBrain
+from core.config import ConfigError
+
+
+def test_refresh_runs_concurrently_in_ticker_order(make_brain):
+    brain = make_brain()
+    active = {"now": 0, "peak": 0}
+
+    async def fake_run(ticker):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01 if ticker != "A" else 0.03)
+        active["now"] -= 1
+        if ticker == "BAD":
+            raise RuntimeError("boom")
+        return [ticker]
+
+    brain.run_for_ticker = fake_run
+    tickers = ["A", "B", "BAD", "C", "D", "E", "F", "G"]
+
+    signals = asyncio.run(brain.refresh(tickers))
+
+    assert signals == ["A", "B", "C", "D", "E", "F", "G"]
+    assert active["peak"] == 4
+
+
+def test_fetch_inputs_issues_provider_calls_concurrently(make_brain):
+    brain = make_brain()
+    calls = []
+
+    def slow(name, result):
+        async def call(ticker):
+            calls.append(name)
+            await asyncio.sleep(0.05)
+            return result
+
+        return call
+
+    brain.data.get_price_snapshot = slow("price", None)
+    brain.data.get_options_flow = slow("flow", [])
+    brain.data.get_greeks = slow("greeks", {"gamma": 0.1})
+    brain.data.get_news = slow("news", [])
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        inputs = await brain.fetch_inputs("AAPL")
+        return inputs, loop.time() - start
+
+    inputs, elapsed = asyncio.run(run())
+
+    assert sorted(calls) == ["flow", "greeks", "news", "price"]
+    assert elapsed < 0.15
+    assert set(inputs.timings_ms) == {"price", "flow", "greeks", "news"}
+    assert brain.fetch_timings["AAPL"] == inputs.timings_ms
+
+
+def test_fetch_inputs_skips_enrichment_without_flow(make_brain):
+    brain = make_brain(skip_enrichment_without_flow=True)
+
+    async def no_flow(ticker):
+        return []
+
+    brain.data.get_options_flow = no_flow
+
+    inputs = asyncio.run(brain.fetch_inputs("AAPL"))
+
+    assert inputs.flows == []
+    assert set(inputs.timings_ms) == {"price", "flow"}
+
+
+def test_recheck_pending_records_movement_and_closes_only_when_configured(make_brain, build_signal):
+    brain = make_brain()
+    brain.alert_store.record_signal(build_signal("intraday_watch"))
+    lanes = []
+
+    async def price(ticker, lane="scan"):
+        from models.schemas import PriceSnapshot
+
+        lanes.append(lane)
+        return PriceSnapshot(ticker=ticker, price=199.5, change_pct=0, volume=0, vwap=0, sector_strength=0)
+
+    brain.data.get_price_snapshot = price
+
+    assert not brain.recheck_enabled and not brain.recheck_close_after_check
+    assert asyncio.run(brain.recheck_pending()) == 1
+    assert lanes == ["intraday"]
+    (alert,) = brain.alert_store.get_pending_for_checks()
+    assert alert["movement_observed"] == 5.0 and alert["last_checked_at"]
+
+    brain.recheck_close_after_check = True
+    assert asyncio.run(brain.recheck_pending()) == 1
+    assert brain.alert_store.get_pending_for_checks() == []
+
+
+def test_market_regime_is_evaluated_once_per_refresh(tmp_path):
+    brain = TradingBrain(
+        {
+            "storage": {"path": str(tmp_path / "alerts.db")},
+            "alerts": {"transports": {"telegram": {"enabled": False}}},
+            "regime": {"scope": "market", "market_symbols": "SPY, QQQ"},
+        }
+    )
+    counts = {"ticker": 0, "market": 0}
+    greeks_for = []
+    evaluate, evaluate_market = brain.regime_engine.evaluate, brain.regime_engine.evaluate_market
+    get_greeks_many = brain.data.get_greeks_many
+
+    def count(name, func):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    async def record_greeks(tickers):
+        greeks_for.extend(tickers)
+        return await get_greeks_many(tickers)
+
+    brain.regime_engine.evaluate = count("ticker", evaluate)
+    brain.regime_engine.evaluate_market = count("market", evaluate_market)
+    brain.data.get_greeks_many = record_greeks
+
+    signals = asyncio.run(brain.refresh(["AAPL", "MSFT", "NVDA", "TSLA"]))
+
+    assert brain.market_symbols == ["SPY", "QQQ"]
+    assert counts == {"ticker": 0, "market": 1}
+    assert greeks_for == ["SPY", "QQQ"]
+    assert signals
+    assert {signal.candidate.regime.vex for signal in signals} == {brain._market_regime.vex}
+
+
+def test_repolled_flow_is_not_routed_twice(make_brain):
+    brain = make_brain()
+    brain.batch_prefetch = False
+    expiry = (datetime.utcnow() + timedelta(days=20)).isoformat()
+
+    async def same_tape(ticker, lane="scan"):
+        return [
+            {
+                "id": f"{ticker}-1",
+                "ticker": ticker,
+                "direction": "call",
+                "notional": 6_000_000,
+                "premium": 1_500_000,
+                "iv": 0.4,
+                "expiry": expiry,
+                "strike": 150.0,
+                "spot": 148.0,
+                "volume_multiple": 5.0,
+                "option_symbol": f"{ticker}C150",
+            }
+        ]
+
+    brain.data.get_options_flow = same_tape
+
+    async def run():
+        return await brain.refresh(["AAPL"]), await brain.refresh(["AAPL"])
+
+    first, second = asyncio.run(run())
+
+    assert len(first) == 1
+    assert second == []
+    assert brain.flow_index.stats["duplicates"] == 1
+
+
+def test_reload_rules_swaps_scoring_and_routing_rules(make_brain):
+    brain = make_brain()
+    rules = brain.reload_rules({"routing": {"bands": {"immediate_alert": 75}, "grades": {"A": 75}}})
+
+    assert brain.scoring.rules is rules and brain.routing.rules is rules
+    assert brain.routing.rules.route(80) == "immediate_alert"
+    with pytest.raises(ConfigError):
+        brain.reload_rules({"routing": {"bands": {"immediate_alert": "soon"}}})
+    assert brain.rules is rules
+    asyncio.run(brain.close())
+
+
+def test_flow_is_offered_again_when_processing_fails(make_brain):
+    brain = make_brain()
+    brain.batch_prefetch = False
+    expiry = (datetime.utcnow() + timedelta(days=20)).isoformat()
+    tape = [
+        {
+            "id": "AAPL-1",
+            "ticker": "AAPL",
+            "direction": "call",
+            "notional": 6_000_000,
+            "premium": 1_500_000,
+            "iv": 0.4,
+            "expiry": expiry,
+            "strike": 150.0,
+            "spot": 148.0,
+            "volume_multiple": 5.0,
+            "option_symbol": "AAPLC150",
+        }
+    ]
+
+    async def flows(ticker, lane="scan"):
+        return tape
+
+    brain.data.get_options_flow = flows
+    original = brain.process_candidates
+
+    async def failing(candidates):
+        raise RuntimeError("store unavailable")
+
+    async def run():
+        brain.process_candidates = failing
+        first = await brain.refresh(["AAPL"])
+        brain.process_candidates = original
+        return first, await brain.refresh(["AAPL"]), await brain.refresh(["AAPL"])
+
+    first, retried, repolled = asyncio.run(run())
+
+    assert first == []
+    assert len(retried) == 1
+    assert repolled == []
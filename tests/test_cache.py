@@ -0,0 +1,43 @@
+from data.cache import MISSING, LRUTTLCache, NegativeEntry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_namespace_ttls():
+    clock = FakeClock()
+    cache = LRUTTLCache(ttl_seconds=100, max_entries=2, namespace_ttls={"price": 10}, clock=clock)
+
+    cache.set("price:AAPL", 1.0)
+    cache.set("greeks:AAPL", {})
+    assert cache.get("price:AAPL") == 1.0  # refreshes recency
+    cache.set("news:AAPL", [])
+
+    assert cache.get("greeks:AAPL") is MISSING
+    assert cache.get("news:AAPL") == []
+    assert cache.stats["evictions"] == 1
+
+    clock.now = 11
+    assert cache.get("price:AAPL") is MISSING
+    assert cache.get("news:AAPL") == []
+    assert cache.stats["expirations"] == 1
+
+
+def test_byte_budget_and_negative_entries():
+    clock = FakeClock()
+    cache = LRUTTLCache(max_bytes=300, negative_ttl_seconds=5, clock=clock, sizeof=lambda value: 100)
+
+    for i in range(5):
+        cache.set(f"price:T{i}", i)
+    assert len(cache) == 3
+    assert cache.total_bytes == 300
+
+    cache.set_negative("greeks:BAD", RuntimeError("down"))
+    assert isinstance(cache.get("greeks:BAD"), NegativeEntry)
+    clock.now = 6
+    assert cache.get("greeks:BAD") is MISSING
@@ -0,0 +1,116 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from core.brain import TradingBrain
+from engines.candidate_builder import CandidateBuilder, CandidateRanker
+from engines.market_regime import MarketRegimeEngine
+from engines.options_flow import OptionsFlowEngine
+from engines.technical import TechnicalEngine
+from models.schemas import PriceSnapshot
+
+
+def make_print(ticker, symbol, notional, premium=1_000_000):
+    return {
+        "ticker": ticker,
+        "direction": "call",
+        "notional": notional,
+        "premium": premium,
+        "iv": 0.4,
+        "expiry": datetime.utcnow() + timedelta(days=20),
+        "strike": 150.0,
+        "spot": 148.0,
+        "volume_multiple": 5.0,
+        "option_symbol": symbol,
+    }
+
+
+def test_builder_emits_one_candidate_per_contract_up_to_k():
+    prices = [100.0 + i for i in range(50)]
+    price = PriceSnapshot(ticker="AAPL", price=149.0, change_pct=0.5, volume=1e6, vwap=148.0, sector_strength=0.0, ohlc=prices)
+    regime = MarketRegimeEngine().evaluate(prices, gex=0.0, vex=0.0)
+    technical = TechnicalEngine().evaluate("AAPL", prices, 1e6, 148.0, 0.0)
+    flows = OptionsFlowEngine().detect(
+        [
+            make_print("AAPL", "C150", 2e6),
+            make_print("AAPL", "C150", 9e6),
+            make_print("AAPL", "C160", 5e6),
+            make_print("AAPL", "P140", 1e6),
+            make_print("MSFT", "C400", 8e6),
+        ]
+    )
+
+    single = CandidateBuilder().build(flows, price, regime, technical)
+    several = CandidateBuilder(max_per_ticker=2).build(flows, price, regime, technical)
+
+    assert [(c.primary_option_symbol, c.primary_notional) for c in single] == [("C150", 9e6)]
+    assert [(c.primary_option_symbol, c.primary_notional) for c in several] == [("C150", 9e6), ("C160", 5e6)]
+
+
+def test_ranker_keeps_global_top_n():
+    ranker = CandidateRanker(3)
+    values = list(range(20))
+    random.Random(1).shuffle(values)
+    for value in values:
+        ranker.offer((float(value % 10),), value)
+
+    assert ranker.offered == 20
+    ranked = ranker.drain()
+    assert [v % 10 for v in ranked] == [9, 9, 8]
+    assert len(ranker) == 0
+    assert CandidateRanker(0).offer((1.0,), "x") is False
+
+
+def test_refresh_processes_only_the_top_n_candidates(tmp_path):
+    brain = TradingBrain(
+        {
+            "storage": {"path": str(tmp_path / "alerts.db")},
+            "alerts": {"transports": {"telegram": {"enabled": False}}},
+            "market_data": {"batch_prefetch": False},
+            "candidates": {"max_per_ticker": 2, "top_n": 3},
+        }
+    )
+
+    async def tape(ticker, lane="scan"):
+        size = {"AAA": 1, "BBB": 2, "CCC": 3}[ticker]
+        return [make_print(ticker, f"{ticker}C{i}", 1e6 * i, premium=500_000 * size + i) for i in range(1, 4)]
+
+    brain.data.get_options_flow = tape
+    classified = []
+    classify = brain.classifier.classify
+    brain.classifier.classify = lambda candidate: classified.append(candidate) or classify(candidate)
+
+    signals = asyncio.run(brain.refresh(["AAA", "BBB", "CCC"]))
+
+    assert len(classified) == 3
+    assert [s.candidate.primary_option_symbol for s in signals] == ["CCCC3", "CCCC2", "BBBC3"]
+
+
+def test_ranked_out_flow_competes_again_next_cycle(tmp_path):
+    brain = TradingBrain(
+        {
+            "storage": {"path": str(tmp_path / "alerts.db")},
+            "alerts": {"transports": {"telegram": {"enabled": False}}},
+            "market_data": {"batch_prefetch": False},
+            "candidates": {"max_per_ticker": 2, "top_n": 3},
+        }
+    )
+
+    async def tape(ticker, lane="scan"):
+        size = {"AAA": 1, "BBB": 2, "CCC": 3}[ticker]
+        prints = [make_print(ticker, f"{ticker}C{i}", 1e6 * i, premium=500_000 * size + i) for i in range(1, 4)]
+        for flow in prints:
+            flow["id"] = flow["option_symbol"]
+        return prints
+
+    brain.data.get_options_flow = tape
+
+    async def run():
+        return await brain.refresh(["AAA", "BBB", "CCC"]), await brain.refresh(["AAA", "BBB", "CCC"])
+
+    first, second = asyncio.run(run())
+
+    first_contracts = {s.candidate.primary_option_symbol for s in first}
+    second_contracts = {s.candidate.primary_option_symbol for s in second}
+    assert first_contracts == {"CCCC3", "CCCC2", "BBBC3"}
+    assert len(second_contracts) == 3 and not first_contracts & second_contracts
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+
+from data.cache import MISSING, NegativeEntry
+from data.providers import ProviderError
+from data.service import DataService
+
+
+def test_concurrent_misses_share_one_provider_call():
+    service = DataService(market_data_key="", benzinga_key="")
+    calls = {"n": 0}
+
+    async def fetch_greeks(ticker):
+        calls["n"] += 1
+        await asyncio.sleep(0.01)
+        return {"delta": 0.5, "gamma": 0.1, "vega": 0.2}
+
+    service.market.fetch_greeks = fetch_greeks
+
+    async def run():
+        return await asyncio.gather(*(service.get_greeks("AAPL") for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert calls["n"] == 1
+    assert all(result == results[0] for result in results)
+    assert service.request_stats["issued"] == 1
+    assert service.request_stats["coalesced"] == 4
+    assert service._inflight == {}
+
+
+def test_empty_values_are_served_from_cache():
+    service = DataService(market_data_key="", benzinga_key="")
+    calls = {"n": 0}
+
+    async def fetch_greeks(ticker):
+        calls["n"] += 1
+        return {}
+
+    service.market.fetch_greeks = fetch_greeks
+
+    async def run():
+        await service.get_greeks("AAPL")
+        return await service.get_greeks("AAPL")
+
+    assert asyncio.run(run()) == {}
+    assert calls["n"] == 1
+    assert service.cache.stats["hits"] == 1
+
+
+def test_batch_fetch_chunks_and_fills_per_ticker_cache():
+    service = DataService(market_data_key="", benzinga_key="")
+    service.market.batch_size = 2
+    chunks = []
+
+    async def fetch_greeks_many(tickers):
+        chunks.append(list(tickers))
+        return {ticker: {"gamma": 0.1} for ticker in tickers}
+
+    service.market.fetch_greeks_many = fetch_greeks_many
+    tickers = ["A", "B", "C", "D", "E"]
+
+    async def run():
+        batch = await service.get_greeks_many(tickers)
+        single = await service.get_greeks("C")
+        return batch, single
+
+    batch, single = asyncio.run(run())
+
+    assert chunks == [["A", "B"], ["C", "D"], ["E"]]
+    assert set(batch) == set(tickers)
+    assert single == {"gamma": 0.1}
+    assert service.request_stats["batch_calls"] == 3
+
+
+def test_batch_fetch_falls_back_to_single_calls():
+    service = DataService(market_data_key="", benzinga_key="")
+    calls = []
+
+    class SingleOnlyProvider:
+        async def latest_news(self, ticker):
+            calls.append(ticker)
+            return []
+
+    service.benzinga = SingleOnlyProvider()
+
+    news = asyncio.run(service.get_news_many(["A", "B", "A"]))
+
+    assert news == {"A": [], "B": []}
+    assert calls == ["A", "B"]
+    assert service.request_stats["batch_calls"] == 0
+
+
+def test_persistent_cache_warm_starts_a_new_service(tmp_path):
+    path = str(tmp_path / "cache.db")
+    calls = []
+
+    def patch(service):
+        async def fetch_greeks(ticker):
+            calls.append(("greeks", ticker))
+            return {"gamma": 0.3}
+
+        async def fetch_bars(ticker, since=None, limit=50):
+            calls.append(("bars", since))
+            return [{"t": t * 60, "c": 100.0 + t, "v": 10} for t in range(50) if since is None or t * 60 > since]
+
+        service.market.fetch_greeks = fetch_greeks
+        service.market.fetch_bars = fetch_bars
+
+    async def run():
+        first = DataService("", "", persistent_cache_path=path)
+        patch(first)
+        await first.get_greeks("AAPL")
+        await first.get_price_snapshot("AAPL")
+        await first.close()
+
+        restarted = DataService("", "", persistent_cache_path=path)
+        patch(restarted)
+        greeks = await restarted.get_greeks("AAPL")
+        snapshot = await restarted.get_price_snapshot("AAPL")
+        await restarted.close()
+        return greeks, snapshot, restarted.request_stats
+
+    greeks, snapshot, stats = asyncio.run(run())
+
+    assert calls == [("greeks", "AAPL"), ("bars", None)]
+    assert greeks == {"gamma": 0.3}
+    assert snapshot.price == 149.0
+    assert len(snapshot.ohlc) == 50
+    assert stats["warm_hits"] == 2
+
+
+def test_persist_prunes_old_entries_on_schedule(tmp_path):
+    service = DataService("", "", persistent_cache_path=str(tmp_path / "cache.db"), persistent_prune_every=2, cache_max_entries=3)
+    service.persistent.put_many([("greeks:OLD", 0.0, {"gamma": 1.0})])
+
+    async def run():
+        await service.persist()
+        kept = service.persistent.get_many(["greeks:OLD"])
+        await service.persist()
+        return kept, service.persistent.get_many(["greeks:OLD"])
+
+    before, after = asyncio.run(run())
+
+    assert "greeks:OLD" in before
+    assert after == {}
+    asyncio.run(service._warm_start([f"greeks:T{i}" for i in range(10)]))
+    assert list(service._warm_checked) == ["greeks:T7", "greeks:T8", "greeks:T9"]
+    service.persistent.close()
+
+
+def test_joining_caller_promotes_the_shared_load_lane():
+    service = DataService("", "", market_rate_limit=50, market_rate_burst=1)
+    order = []
+
+    async def fetch_greeks(ticker):
+        order.append(ticker)
+        return {"gamma": 0.1}
+
+    service.market.fetch_greeks = fetch_greeks
+
+    async def run():
+        await service.market_limiter.acquire("scan")  # drain the burst so loads queue
+        scans = [asyncio.ensure_future(service.get_greeks(ticker)) for ticker in ("MSFT", "NVDA", "AAPL")]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        urgent = await service.get_greeks("AAPL", lane="immediate")
+        await asyncio.gather(*scans)
+        return urgent
+
+    assert asyncio.run(run()) == {"gamma": 0.1}
+    assert order[0] == "AAPL"
+    assert service.request_stats["coalesced"] == 1
+    stats = service.rate_limit_stats()["market"]
+    assert (stats["scan"]["acquired"], stats["immediate"]["acquired"]) == (3, 1)
+    assert stats["scan"]["depth"] == stats["immediate"]["depth"] == 0
+    assert service._inflight_lanes == {}
+
+
+def test_batch_fetch_keeps_chunks_that_succeeded():
+    service = DataService(market_data_key="", benzinga_key="")
+    service.market.batch_size = 2
+
+    async def fetch_greeks_many(tickers):
+        if "C" in tickers:
+            raise ProviderError("vendor 502")
+        return {ticker: {"gamma": 0.1} for ticker in tickers}
+
+    async def fetch_bars_many(tickers, since=None, limit=50):
+        return {ticker: [] if ticker == "EMPTY" else [{"t": 60, "c": 10.0, "v": 5}] for ticker in tickers}
+
+    service.market.fetch_greeks_many = fetch_greeks_many
+    service.market.fetch_bars_many = fetch_bars_many
+
+    async def run():
+        return await service.get_greeks_many(["A", "B", "C", "D", "E"]), await service.get_price_snapshots(["EMPTY", "AAPL"])
+
+    greeks, snapshots = asyncio.run(run())
+
+    assert sorted(greeks) == ["A", "B", "E"]
+    assert service.cache.get("greeks:C") is MISSING
+    assert service.request_stats["batch_errors"] == 1
+    assert list(snapshots) == ["AAPL"]
+    assert isinstance(service.cache.get("price:EMPTY"), NegativeEntry)
+
+
+def test_single_call_fallback_negative_caches_failed_tickers():
+    service = DataService(market_data_key="", benzinga_key="")
+
+    class SingleOnlyProvider:
+        async def latest_news(self, ticker):
+            if ticker == "BAD":
+                raise ProviderError("not found")
+            return [{"headline": ticker}]
+
+    service.benzinga = SingleOnlyProvider()
+
+    news = asyncio.run(service.get_news_many(["A", "BAD", "B"]))
+
+    assert sorted(news) == ["A", "B"]
+    assert isinstance(service.cache.get("news:BAD"), NegativeEntry)
+
+
+def test_disk_lookups_run_off_the_loop_once_per_key(tmp_path):
+    service = DataService("", "", persistent_cache_path=str(tmp_path / "cache.db"))
+    service.persistent.put_many([("greeks:AAPL", time.time(), {"gamma": 0.2})])
+    lookups = []
+    get_many = service.persistent.get_many
+
+    def spy(keys):
+        lookups.append((list(keys), threading.current_thread() is threading.main_thread()))
+        return get_many(keys)
+
+    service.persistent.get_many = spy
+
+    async def run():
+        return await asyncio.gather(*(service.get_greeks("AAPL") for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert results == [{"gamma": 0.2}] * 3
+    assert lookups == [(["greeks:AAPL"], False)]
+    service.persistent.close()
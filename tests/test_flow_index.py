@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from engines.flow_index import FlowIndex
+from engines.options_flow import OptionsFlowEngine
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_print(print_id, symbol="AAPL240621C00150000", premium=500_000, at=None):
+    return {
+        "id": print_id,
+        "timestamp": at,
+        "ticker": "AAPL",
+        "direction": "call",
+        "notional": premium * 4,
+        "premium": premium,
+        "iv": 0.4,
+        "expiry": datetime.utcnow() + timedelta(days=20),
+        "strike": 150.0,
+        "spot": 148.0,
+        "volume_multiple": 5.0,
+        "is_sweep": True,
+        "option_symbol": symbol,
+        "volume": 1_000,
+        "open_interest": 4_000,
+    }
+
+
+def filter_and_commit(index, events):
+    passed, suppressed = index.partition(events)
+    index.commit(suppressed, passed_on=False)
+    index.commit(passed)
+    return passed
+
+
+def test_repolled_prints_are_dropped_and_growth_is_required():
+    clock = Clock()
+    index = FlowIndex(bucket_seconds=60, window_seconds=600, growth_threshold=0.5, clock=clock)
+    detect = OptionsFlowEngine().detect
+
+    first = filter_and_commit(index, detect([make_print("a"), make_print("b")]))
+    assert [e.raw["id"] for e in first] == ["a", "b"]
+
+    # The next poll returns the same prints plus one small new one.
+    clock.now += 30
+    assert filter_and_commit(index, detect([make_print("a"), make_print("b"), make_print("c", premium=300_000)])) == []
+    assert index.stats["duplicates"] == 2
+    assert index.stats["suppressed"] == 1
+
+    # Premium grows past 1.5x of what was last passed on.
+    grown = filter_and_commit(index, detect([make_print("d", premium=900_000)]))
+    assert [e.raw["id"] for e in grown] == ["d"]
+    activity = index.aggregate("AAPL240621C00150000")
+    assert activity.premium == 2_200_000
+    assert activity.sweep_count == 4
+    assert activity.volume_oi_ratio == 1.0
+
+
+def test_contract_activity_expires_with_the_window():
+    clock = Clock()
+    index = FlowIndex(bucket_seconds=60, window_seconds=300, clock=clock)
+    detect = OptionsFlowEngine().detect
+
+    assert len(filter_and_commit(index, detect([make_print("a")]))) == 1
+    clock.now += 400
+    # A quiet window later, new activity on the same contract counts as new.
+    assert len(filter_and_commit(index, detect([make_print("b")]))) == 1
+    assert index.aggregate("AAPL240621C00150000").premium == 500_000
+    clock.now += 400
+    filter_and_commit(index, detect([make_print("x", symbol="MSFT240621C00400000")]))
+    assert index.aggregate("AAPL240621C00150000") is None
+
+
+def test_print_identity_falls_back_to_contract_and_time():
+    at = datetime(2024, 6, 3, 14, 30)
+    with_time = make_print(None, at=at)
+    assert FlowIndex.print_id(with_time) == ("AAPL240621C00150000", str(at), 500_000, 1_000, None)
+    assert FlowIndex.print_id(make_print(None)) is None
+
+
+def test_filter_records_nothing_until_commit():
+    index = FlowIndex(clock=Clock())
+    events = OptionsFlowEngine().detect([make_print("a"), make_print("a")])
+
+    assert [e.raw["id"] for e in index.filter(events)] == ["a"]
+    assert [e.raw["id"] for e in index.filter(events)] == ["a"]
+    assert index.aggregate("AAPL240621C00150000") is None
+
+    index.commit(index.filter(events))
+    index.commit(events)
+    assert index.filter(events) == []
+    assert index.aggregate("AAPL240621C00150000").premium == 500_000
+    assert index.stats["committed"] == 1
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from data.fake_vendor import FakeVendorServer
+from data.http import AsyncHTTPClient, HTTPError
+from data.service import DataService
+
+
+def test_client_reuses_pooled_connections_and_decodes_gzip():
+    async def run():
+        async with FakeVendorServer(gzip_min_bytes=0) as server:
+            client = AsyncHTTPClient(max_connections_per_host=2)
+            results = [await client.get_json(f"{server.base_url}/v1/greeks", {"tickers": "AAPL"}) for _ in range(5)]
+            await asyncio.gather(*(client.get_json(f"{server.base_url}/v2/aggs/MSFT") for _ in range(6)))
+            await client.close()
+            return results, client.stats, server.stats
+
+    results, client_stats, server_stats = asyncio.run(run())
+
+    assert set(results[0]["results"]["AAPL"]) == {"delta", "gamma", "vega"}
+    assert client_stats["requests"] == 11
+    assert client_stats["connections_opened"] <= 2
+    assert client_stats["connections_reused"] == 11 - client_stats["connections_opened"]
+    assert server_stats["connections"] == client_stats["connections_opened"]
+
+
+def test_stream_json_and_error_status():
+    async def run():
+        async with FakeVendorServer() as server:
+            client = AsyncHTTPClient()
+            records = [r async for r in client.stream_json(f"{server.base_url}/v1/flow", {"tickers": "AAPL,MSFT"})]
+            server.fail_next = 1
+            server.retry_after = 2
+            with pytest.raises(HTTPError) as excinfo:
+                await client.get_json(f"{server.base_url}/v1/greeks", {"tickers": "AAPL"})
+            await client.close()
+            return records, excinfo.value
+
+    records, error = asyncio.run(run())
+
+    assert {r["ticker"] for r in records} == {"AAPL", "MSFT"}
+    assert error.status == 429
+    assert error.headers["retry-after"] == "2"
+
+
+def test_data_service_over_http_providers():
+    async def run():
+        async with FakeVendorServer() as server:
+            service = DataService("key", "key", market_base_url=server.base_url, news_base_url=server.base_url)
+            await service.prefetch(["AAPL", "MSFT"])
+            snapshot = await service.get_price_snapshot("AAPL")
+            flows = await service.get_options_flow("MSFT")
+            await service.close()
+            return snapshot, flows, service.http.stats
+
+    snapshot, flows, stats = asyncio.run(run())
+
+    assert len(snapshot.ohlc) == 50
+    assert flows and all(f["ticker"] == "MSFT" for f in flows)
+    assert stats["connections_opened"] <= 4
+
+
+def test_stalled_body_times_out_and_frees_the_pool_slot():
+    async def run():
+        async def stall(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n{\"partial\":")
+            await writer.drain()
+            await asyncio.sleep(5)
+
+        server = await asyncio.start_server(stall, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        client = AsyncHTTPClient(max_connections_per_host=1, timeout=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_json(url)
+        elapsed = loop.time() - start
+        idle = len(client._pools[("http", "127.0.0.1", server.sockets[0].getsockname()[1])].idle)
+        await client.close()
+        server.close()
+        return elapsed, idle
+
+    elapsed, idle = asyncio.run(run())
+
+    # The second request got the only slot back, and the stalled connection was not pooled.
+    assert elapsed < 1.0
+    assert idle == 0
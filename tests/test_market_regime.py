@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from engines.market_regime import MarketRegimeEngine
+
+
+def test_rolling_window_matches_full_recompute():
+    rng = random.Random(3)
+    closes = [100.0]
+    for _ in range(400):
+        closes.append(closes[-1] * (1 + rng.gauss(0, 0.01)))
+
+    rolling = MarketRegimeEngine()
+    full = MarketRegimeEngine()
+    # The window fills up to 50 bars, then slides one or two bars at a time.
+    for end in list(range(20, 50)) + list(range(50, 401, 2)):
+        window = closes[max(end - 50, 0) : end]
+        got = rolling.evaluate(window, gex=0.0, vex=0.0, ticker="SPY", bars_total=end)
+        expected = full.evaluate(window, gex=0.0, vex=0.0)
+        assert got.volatility == pytest.approx(expected.volatility, rel=1e-9)
+        assert got.liquidity == pytest.approx(expected.liquidity, rel=1e-12)
+        assert got.trend_bias == expected.trend_bias
+
+
+def test_history_is_bounded_per_ticker():
+    engine = MarketRegimeEngine(history_size=3, max_tickers=2)
+    prices = [100.0, 101.0, 100.5, 102.0, 101.5]
+    for ticker in ("AAA", "BBB", "AAA", "CCC"):
+        for _ in range(5):
+            engine.evaluate(prices, gex=0.0, vex=0.0, ticker=ticker)
+
+    assert list(engine.history) == ["AAA", "CCC"]
+    assert all(len(states) == 3 for states in engine.history.values())
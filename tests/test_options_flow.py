@@ -0,0 +1,40 @@
+import asyncio
+import random
+
+import pytest
+
+from data.providers import MassivePolygonProvider
+from engines import options_flow
+from engines.options_flow import OptionsFlowEngine
+
+
+def tape(count: int):
+    random.seed(5)
+    provider = MassivePolygonProvider("")
+    flows = []
+    while len(flows) < count:
+        flows.extend(asyncio.run(provider.options_flow(f"T{len(flows)}")))
+    for flow in flows[::3]:
+        flow["premium"] = 100_000.0
+    return flows[:count]
+
+
+def summary(events):
+    return [(e.option_symbol, e.conviction_score, e.notional, e.is_sweep, e.raw) for e in events]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_detect_columnar_matches_detect(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(options_flow, "np", None)
+    elif options_flow.np is None:
+        pytest.skip("numpy not installed")
+    engine = OptionsFlowEngine()
+    flows = tape(300)
+    columns = OptionsFlowEngine.to_columns(flows)
+
+    expected = engine.detect(flows)
+    assert len(expected) < len(flows)
+    assert summary(engine.detect_columnar(columns)) == summary(expected)
+    assert summary(engine.detect_columnar(columns, top_k=10)) == summary(expected[:10])
+    assert engine.detect_columnar(columns, top_k=0) == []
@@ -0,0 +1,77 @@
+import asyncio
+
+from data.providers import with_retry
+from data.ratelimit import PriorityRateLimiter
+
+
+def test_priority_lanes_are_served_first():
+    limiter = PriorityRateLimiter(rate_per_second=200, burst=1)
+    order = []
+
+    async def request(lane, name):
+        await limiter.acquire(lane)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire("scan")  # drain the burst so later requests queue
+        scans = [asyncio.create_task(request("scan", f"scan{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        recheck = asyncio.create_task(request("immediate", "recheck"))
+        await asyncio.gather(*scans, recheck)
+
+    asyncio.run(run())
+
+    assert order[0] == "recheck"
+    stats = limiter.stats()
+    assert stats["scan"]["acquired"] == 4
+    assert stats["scan"]["depth"] == 0
+    assert stats["scan"]["max_wait_ms"] > 0
+
+
+def test_with_retry_honours_retry_after():
+    attempts = {"n": 0}
+
+    class Throttled(Exception):
+        retry_after = 0.05
+
+    async def flaky():
+        attempts["n"] += 1
+        if attempts["n"] == 1:
+            raise Throttled()
+        return "ok"
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await with_retry(flaky, attempts=2, base_delay=0)
+        return result, loop.time() - start
+
+    result, elapsed = asyncio.run(run())
+
+    assert result == "ok"
+    assert elapsed >= 0.05
+
+
+def test_promote_moves_a_queued_request_ahead():
+    limiter = PriorityRateLimiter(rate_per_second=200, burst=1)
+    order = []
+
+    async def request(name):
+        await limiter.acquire("scan", request=name)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire("scan")
+        scans = [asyncio.create_task(request(f"scan{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        assert limiter.promote("scan2", "immediate")
+        assert not limiter.promote("scan2", "swing")
+        await asyncio.gather(*scans)
+
+    asyncio.run(run())
+
+    assert order == ["scan2", "scan0", "scan1"]
+    assert limiter._requests == {}
+    stats = limiter.stats()
+    assert (stats["scan"]["acquired"], stats["immediate"]["acquired"]) == (3, 1)
+    assert stats["scan"]["depth"] == stats["immediate"]["depth"] == 0
@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+from core.migrations import ALERTS_MIGRATIONS
+from core.retention import LedgerRetention, iter_archived
+from core.storage import AlertStore
+
+
+def seed(store: AlertStore, rows, build_signal):
+    """Insert signals and backdate them: ``rows`` is a list of (created_at, status, ticker)."""
+
+    signals = []
+    for created_at, status, ticker in rows:
+        signal = build_signal("swing_watch")
+        signal.candidate.ticker = ticker
+        signal.created_at = created_at
+        signals.append(signal)
+    store.record_signals((signal, None) for signal in signals)
+    with store._transaction() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM alerts ORDER BY id")]
+        conn.executemany("UPDATE alerts SET status=? WHERE id=?", [(status, i) for (_, status, _), i in zip(rows, ids)])
+
+
+def test_retention_archives_finished_rows_by_month(tmp_path, build_signal):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    now = datetime(2024, 6, 15)
+    seed(
+        store,
+        [
+            (datetime(2024, 1, 10), "checked", "AAPL"),
+            (datetime(2024, 1, 20), "expired", "MSFT"),
+            (datetime(2024, 2, 5), "checked", "AAPL"),
+            (datetime(2024, 2, 6), "pending", "AAPL"),
+            (datetime(2024, 6, 1), "checked", "AAPL"),
+        ],
+        build_signal,
+    )
+    retention = LedgerRetention(store, archive_dir=str(tmp_path / "archive"), horizon_days=30, batch_size=1)
+
+    assert retention.run(now=now) == 3
+
+    hot = store._conn.execute("SELECT status, created_at FROM alerts ORDER BY created_at").fetchall()
+    assert [status for status, _ in hot] == ["pending", "checked"]
+    assert sorted(p.name for p in (tmp_path / "archive").iterdir()) == ["alerts-2024-01.db", "alerts-2024-02.db"]
+    archived = list(iter_archived(str(tmp_path / "archive")))
+    assert [(r["ticker"], r["status"]) for r in archived] == [("AAPL", "checked"), ("MSFT", "expired"), ("AAPL", "checked")]
+    assert [r["created_at"][:10] for r in iter_archived(str(tmp_path / "archive"), ticker="AAPL", since=datetime(2024, 2, 1))] == ["2024-02-05"]
+    assert retention.run(now=now) == 0
+    assert retention.stats["runs"] == 2 and retention.stats["archived"] == 3
+    assert store._conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    store.close()
+
+
+def test_retention_converts_legacy_ledger_to_incremental_vacuum(tmp_path, build_signal):
+    db_path = str(tmp_path / "alerts.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(ALERTS_MIGRATIONS[0].statements[0])
+    store = AlertStore(db_path=db_path)
+    assert store._conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    seed(store, [(datetime(2023, 1, 1) + timedelta(hours=i), "expired", "AAPL") for i in range(200)], build_signal)
+    retention = LedgerRetention(store, archive_dir=str(tmp_path / "archive"), interval_minutes=60)
+
+    assert retention.due()
+    assert retention.run() == 200
+    assert not retention.due()
+    assert store._conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert store._conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert store._conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 0
+    assert len(list(iter_archived(str(tmp_path / "archive")))) == 200
+    store.close()
+
+
+def test_retention_retry_after_partial_move_does_not_duplicate(tmp_path, build_signal):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    seed(store, [(datetime(2024, 1, 10), "checked", "AAPL"), (datetime(2024, 1, 11), "expired", "AAPL")], build_signal)
+    rows = store._conn.execute("SELECT * FROM alerts").fetchall()
+    retention = LedgerRetention(store, archive_dir=str(tmp_path / "archive"))
+    assert retention.run(now=datetime(2024, 6, 1)) == 2
+
+    # A crash after the archive commit but before the delete leaves rows in both files.
+    with store._transaction() as conn:
+        conn.executemany(f"INSERT INTO alerts VALUES ({','.join('?' * len(rows[0]))})", rows)
+    assert retention.run(now=datetime(2024, 6, 1)) == 2
+
+    assert len(list(iter_archived(str(tmp_path / "archive")))) == 2
+    assert store._conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 0
+    store.close()
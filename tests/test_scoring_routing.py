@@ -1,5 +1,10 @@
 from datetime import datetime, timedelta
 
+import pytest
+
+from core.config import ConfigError
+from engines import scoring
+from engines.rules import RuleTable
 from engines.scoring import ScoringEngine
 from engines.routing import RoutingEngine
 from models.schemas import Candidate, Direction, FlowEvent, MarketRegimeState, PriceSnapshot, TechnicalContext
@@ -82,3 +87,150 @@ def score_to_signal(candidate: Candidate, score):
     from models.schemas import RoutedSignal
 
     return RoutedSignal(candidate=candidate, score=score, route="pending")
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_score_batch_matches_score_and_skips_reject_presentation(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("numpy not installed")
+    boosts = [0.2 + 0.02 * i for i in range(60)]
+    batch = [make_candidate(boost) for boost in boosts]
+    news = [i % 2 == 0 for i in range(len(boosts))]
+    for i, candidate in enumerate(batch):
+        candidate.technical.rsi = 30 + i
+        candidate.regime.volatility = 0.1 * (i % 11)
+        if i % 3 == 0:
+            candidate.technical.macd, candidate.technical.bias = 0.0, "bearish"
+
+    results = ScoringEngine().score_batch(batch, news)
+
+    for candidate, has_news, result in zip(batch, news, results):
+        expected_candidate = make_candidate()
+        expected_candidate.flow, expected_candidate.technical, expected_candidate.regime = candidate.flow, candidate.technical, candidate.regime
+        expected = ScoringEngine().score(expected_candidate, has_news=has_news)
+        assert (result.score, result.grade) == (expected.score, expected.grade)
+        assert candidate.total_score == expected.score
+        if result.score >= 50:
+            assert result.reasoning == expected.reasoning
+            assert candidate.flow_pattern == expected_candidate.flow_pattern
+        else:
+            assert result.reasoning == ""
+            assert candidate.flow_pattern is None
+    assert any(r.score < 50 for r in results) and any(r.score >= 50 for r in results)
+
+
+def routed_with(score: float, age: timedelta = timedelta(0)):
+    from models.schemas import RoutedSignal, ScoreResult
+
+    return RoutedSignal(candidate=make_candidate(), score=ScoreResult(score, "B", ""), route="pending", created_at=datetime.utcnow() - age)
+
+
+def test_queues_expire_cap_and_report_metrics():
+    engine = RoutingEngine(intraday_expiry_minutes=30, rejected_retention_minutes=10, max_rejected=3)
+    stale = routed_with(70, age=timedelta(minutes=45))
+    fresh = routed_with(70)
+    for signal in (stale, fresh):
+        engine.route(signal.score, signal)
+    for age in range(5):
+        rejected = routed_with(10, age=timedelta(minutes=age))
+        engine.route(rejected.score, rejected)
+
+    assert engine.queue_sizes() == {"immediate": 0, "intraday": 2, "swing": 0, "rejected": 3}
+    assert engine.stats["evicted"] == 2
+
+    engine.refresh_queues()
+
+    assert list(engine.intraday) == [fresh]
+    assert engine.stats["expired"] == 1
+    assert engine.stats["refreshes"] == 1
+    assert engine.stats["last_refresh_ms"] >= 0
+
+
+def test_rescore_promotes_and_refresh_picks_up_in_place_scores():
+    engine = RoutingEngine()
+    signals = [routed_with(70) for _ in range(200)]
+    for signal in signals:
+        engine.route(signal.score, signal)
+
+    for signal in signals[:150]:
+        assert engine.rescore(signal, 90) == "immediate_alert"
+    assert signals[0].score.grade == "A"
+
+    assert len(engine.intraday) == 50
+    assert len(engine.immediate) == 150
+    assert engine.stats["promoted"] == 150
+    assert signals[0] not in engine.intraday and signals[0] in engine.immediate
+    # Removed entries are compacted out of the heap once they dominate it.
+    assert len(engine.intraday._heap) < 200
+    signals[-1].score.score = 95
+    engine.refresh_queues()
+    assert len(engine.intraday) == 49 and signals[-1] in engine.immediate
+
+
+def test_pushing_a_queued_signal_again_counts_the_old_entry_as_stale():
+    engine = RoutingEngine()
+    signal = routed_with(70)
+    engine.intraday.push(signal)
+    engine.intraday.push(signal)
+
+    assert len(engine.intraday) == 1 and engine.intraday._stale == 1
+    assert engine.intraday.pop_expired(datetime.utcnow() + timedelta(days=1)) == [signal]
+    assert engine.intraday._stale == 0 and engine.intraday._heap == []
+
+
+def test_rule_table_defaults_match_legacy_thresholds():
+    rules = RuleTable()
+    routes = [rules.route(score) for score in (10, 49.9, 50, 64.9, 65, 84.9, 85, 100)]
+    grades = [rules.grade(score) for score in (49.9, 50, 65, 85)]
+
+    assert routes == ["reject", "reject", "swing_watch", "swing_watch", "intraday_watch", "intraday_watch", "immediate_alert", "immediate_alert"]
+    assert grades == ["D", "C", "B", "A"]
+    assert rules.min_route_score == 50
+
+
+def test_rule_table_overrides_and_validation():
+    rules = RuleTable.from_config(
+        {
+            "routing": {
+                "bands": {"swing_watch": 55},
+                "overrides": {
+                    "classification": {"structural": {"immediate_alert": 80}},
+                    "regime": {"high_risk": {"immediate_alert": 92, "swing_watch": 40}},
+                },
+                "promotion": {"min_score": 88},
+            }
+        }
+    )
+
+    assert rules.route(52) == "reject"
+    assert rules.route(82, "structural") == "immediate_alert"
+    assert rules.route(90, "structural", "high_risk") == "intraday_watch"
+    assert rules.route(45, "unknown", "high_risk") == "swing_watch"
+    assert rules.promotion_threshold("structural") == 88
+    assert rules.min_route_score == 40
+    with pytest.raises(ConfigError):
+        RuleTable(bands={"moonshot": 99})
+    with pytest.raises(ConfigError):
+        RuleTable(overrides={"regime": {"high_risk": {"swing_watch": "high"}}})
+    with pytest.raises(ConfigError):
+        RuleTable(overrides={"classification": {"x": {"immediate_alert": 60}}})
+    with pytest.raises(ConfigError):
+        RuleTable(grades={"A": "hi"})
+    with pytest.raises(ConfigError):
+        RuleTable(grades={"E": 10})
+    with pytest.raises(ConfigError):
+        RuleTable(grades={"C": 70})
+
+
+def test_routing_uses_swapped_rules():
+    engine = RoutingEngine()
+    signal = routed_with(70)
+    assert engine.route(signal.score, signal) == "intraday_watch"
+    assert engine.rescore(signal, 80) == "intraday_watch"
+
+    engine.set_rules(RuleTable(bands={"immediate_alert": 75}))
+
+    assert signal.route == "immediate_alert" and signal in engine.immediate
+    assert ScoringEngine(rules=RuleTable(grades={"A": 60, "B": 55})).score(make_candidate(0.7), has_news=False).grade == "A"
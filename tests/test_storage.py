@@ -1,6 +1,8 @@
+import sqlite3
 from datetime import datetime, timedelta
 
-from core.storage import AlertStore
+from core.migrations import ALERTS_MIGRATIONS, migrate, schema_version
+from core.storage import EXPIRE_SQL, HISTORY_SQL, PENDING_FILTERED_SQL, PENDING_FILTERS, PENDING_SQL, AlertStore
 from models.schemas import Candidate, Direction, FlowEvent, MarketRegimeState, PriceSnapshot, RoutedSignal, ScoreResult, TechnicalContext
 
 
@@ -91,3 +93,124 @@ def test_expire_stale(tmp_path):
     # Expire immediately due to zero minute expiry
     store.expire_stale()
     assert store.get_pending_for_checks() == []
+
+
+def test_batched_writes_share_one_wal_connection(tmp_path):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    routes = ["intraday_watch", "swing_watch", "reject", "immediate_alert"]
+
+    written = store.record_signals([(build_signal(route), {"batch": i}) for i, route in enumerate(routes)])
+
+    assert written == 3
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    pending = store.get_pending_for_checks()
+    assert [record["payload"]["metadata"]["batch"] for record in pending] == [0, 1, 3]
+
+    assert store.mark_checked_many([(record["id"], 0.5) for record in pending[:2]]) == 2
+    assert [record["route"] for record in store.get_pending_for_checks()] == ["immediate_alert"]
+    store.close()
+
+
+def test_migrations_upgrade_legacy_database_once(tmp_path):
+    db_path = str(tmp_path / "alerts.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(ALERTS_MIGRATIONS[0].statements[0])
+        conn.execute("INSERT INTO alerts (ticker, route, status, created_at) VALUES ('AAPL', 'swing_watch', 'pending', '2024-01-01')")
+
+    store = AlertStore(db_path=db_path)
+    assert store.schema_version == ALERTS_MIGRATIONS[-1].version
+    store.close()
+    store = AlertStore(db_path=db_path)
+
+    applied = store._conn.execute("SELECT version FROM schema_version ORDER BY version").fetchall()
+    assert [version for (version,) in applied] == [m.version for m in ALERTS_MIGRATIONS]
+    assert schema_version(store._conn) == store.schema_version
+    assert [record["ticker"] for record in store.get_history("AAPL")] == ["AAPL"]
+    store.close()
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    now = datetime.utcnow().isoformat()
+    plans = {
+        "expire": (EXPIRE_SQL, (now,)),
+        "pending": (PENDING_SQL, (now, 50)),
+        "history": (HISTORY_SQL, ("AAPL", "", 100)),
+        "filtered": (PENDING_FILTERED_SQL.format(where=" AND ".join(PENDING_FILTERS)), ("call", 1_000_000, now, 100)),
+        "classified": (
+            PENDING_FILTERED_SQL.format(where=" AND ".join(PENDING_FILTERS + ("classification=?",))),
+            ("call", 1_000_000, now, "catalyst", 100),
+        ),
+    }
+    expected = {
+        "expire": "idx_alerts_status_expires",
+        "pending": "idx_alerts_status_created",
+        "history": "idx_alerts_ticker_created",
+        "filtered": "idx_alerts_status_direction_notional",
+        "classified": "idx_alerts_status_direction_notional",
+    }
+
+    for name, (sql, params) in plans.items():
+        plan = " | ".join(row[-1] for row in store._conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert f"USING INDEX {expected[name]}" in plan, (name, plan)
+        assert "TEMP B-TREE" not in plan, (name, plan)
+    store.close()
+
+
+def test_history_returns_ticker_alerts_newest_first(tmp_path):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    signals = [build_signal(route) for route in ("swing_watch", "intraday_watch")]
+    signals[0].created_at -= timedelta(days=3)
+    store.record_signals((signal, None) for signal in signals)
+    store.mark_checked(store.get_pending_for_checks()[0]["id"], movement_observed=2.0)
+
+    history = store.get_history("AAPL")
+    assert [record["route"] for record in history] == ["intraday_watch", "swing_watch"]
+    assert history[1]["status"] == "checked" and history[1]["movement_observed"] == 2.0
+    assert [record["route"] for record in store.get_history("AAPL", since=datetime.utcnow() - timedelta(days=1))] == ["intraday_watch"]
+    assert store.get_history("MSFT") == []
+    store.close()
+
+
+def test_typed_columns_and_lazy_payload(tmp_path):
+    store = AlertStore(db_path=str(tmp_path / "alerts.db"))
+    signals = []
+    for notional, direction in ((500_000, Direction.CALL), (2_000_000, Direction.CALL), (3_000_000, Direction.PUT), (1_500_000, Direction.CALL)):
+        signal = build_signal("swing_watch")
+        signal.candidate.flow.notional, signal.candidate.flow.direction = notional, direction
+        signal.candidate.classification = "structural" if notional > 1_800_000 else "catalyst"
+        signals.append(signal)
+    store.record_signals((signal, None) for signal in signals)
+
+    calls = store.query_pending("call", min_notional=1_000_000)
+    assert [row["notional"] for row in calls] == [2_000_000, 1_500_000]
+    row = calls[0]
+    assert (row["strike"], row["spot_price"], row["regime"], row["option_symbol"]) == (195.0, 190.0, "benign", "AAPL240901C00195000")
+    assert row._payload is None
+    assert row["payload"]["candidate"]["classification"] == row["classification"] == "structural"
+    assert dict(row)["payload"] is row.payload
+    assert [r["notional"] for r in store.query_pending("call", 1_000_000, classification="catalyst")] == [1_500_000]
+    assert store.query_pending("put", 1_000_000, regime="volatile") == []
+    store.close()
+
+
+def test_promoted_columns_are_backfilled_from_payload(tmp_path):
+    db_path = str(tmp_path / "alerts.db")
+    conn = sqlite3.connect(db_path)
+    migrate(conn, ALERTS_MIGRATIONS[:2])
+    legacy = AlertStore.__new__(AlertStore)
+    legacy.intraday_expiry, legacy.swing_expiry = timedelta(minutes=60), timedelta(days=5)
+    row = legacy._row(build_signal("swing_watch"), None)
+    with conn:
+        conn.execute(
+            "INSERT INTO alerts (ticker, route, status, created_at, expires_at, score, grade, direction, reasoning, payload)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            row[:9] + row[-1:],
+        )
+    conn.close()
+
+    store = AlertStore(db_path=db_path)
+    (record,) = store.query_pending("call", 900_000)
+    assert (record["notional"], record["strike"], record["spot_price"], record["regime"]) == (1_000_000, 195.0, 190.0, "benign")
+    assert record["expiry"] == record["payload"]["candidate"]["flow"]["expiry"]
+    store.close()
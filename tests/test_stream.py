@@ -0,0 +1,206 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.brain import TradingBrain
+from core.stream import FlowStreamProcessor
+from data.streaming import QueueFlowSource, ReplayFlowSource, SocketFlowSource
+
+
+def make_print(ticker, premium=1_500_000):
+    return {
+        "ticker": ticker,
+        "direction": "call",
+        "notional": premium * 4,
+        "premium": premium,
+        "iv": 0.4,
+        "expiry": (datetime.utcnow() + timedelta(days=20)).isoformat(),
+        "strike": 150.0,
+        "spot": 148.0,
+        "volume_multiple": 5.0,
+        "is_sweep": True,
+        "option_symbol": f"{ticker}C150",
+    }
+
+
+def test_stream_processes_only_affected_tickers(tmp_path):
+    brain = TradingBrain({"storage": {"path": str(tmp_path / "alerts.db")}})
+    processed = []
+    original = brain.process_flows
+
+    async def spy(ticker, flows):
+        processed.append((ticker, len(flows)))
+        return await original(ticker, flows)
+
+    brain.process_flows = spy
+
+    async def run():
+        source = QueueFlowSource()
+        processor = FlowStreamProcessor(brain, source, batch_size=10, max_batch_delay_ms=5)
+        task = asyncio.create_task(processor.run(collect=True))
+        await source.publish(make_print("AAPL"))
+        await source.publish(make_print("AAPL"))
+        await source.publish(make_print("MSFT", premium=10_000))  # filtered by detect
+        await source.close()
+        return await task, processor
+
+    signals, processor = asyncio.run(run())
+
+    assert processed == [("AAPL", 2)]
+    assert {s.candidate.ticker for s in signals} == {"AAPL"}
+    assert processor.stats["prints"] == 3
+    assert len(processor.latencies_ms) == 2
+    assert max(processor.latencies_ms) < 1_000
+
+
+def test_replay_source_reads_ndjson(tmp_path):
+    path = tmp_path / "tape.ndjson"
+    path.write_text("\n".join(json.dumps(make_print(t)) for t in ["AAPL", "NVDA"]) + "\n")
+
+    async def collect():
+        return [flow async for flow in ReplayFlowSource(path).stream()]
+
+    assert [flow["ticker"] for flow in asyncio.run(collect())] == ["AAPL", "NVDA"]
+
+
+def test_live_run_does_not_keep_signals(tmp_path):
+    brain = TradingBrain({"storage": {"path": str(tmp_path / "alerts.db")}})
+
+    async def run():
+        source = QueueFlowSource()
+        processor = FlowStreamProcessor(brain, source, batch_size=10, max_batch_delay_ms=5)
+        task = asyncio.create_task(processor.run())
+        await source.publish(make_print("AAPL"))
+        await source.close()
+        return await task, processor
+
+    signals, processor = asyncio.run(run())
+
+    assert signals == []
+    assert processor.stats["signals"] == 1
+
+
+def test_socket_source_reconnects_after_refused_and_closed_connections():
+    async def run():
+        probe = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = probe.sockets[0].getsockname()[1]
+        probe.close()
+        await probe.wait_closed()
+        connections = 0
+
+        async def serve(reader, writer):
+            nonlocal connections
+            connections += 1
+            writer.write((json.dumps(make_print(f"T{connections}")) + "\n").encode())
+            await writer.drain()
+            writer.close()
+
+        source = SocketFlowSource("127.0.0.1", port, reconnect_seconds=0.02)
+        received = []
+
+        async def consume():
+            async for flow in source.stream():
+                received.append(flow["ticker"])
+                if len(received) == 2:
+                    return
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)  # nothing is listening yet: connections are refused
+        server = await asyncio.start_server(serve, "127.0.0.1", port)
+        await asyncio.wait_for(consumer, 5)
+        server.close()
+        await server.wait_closed()
+        return received
+
+    assert asyncio.run(run()) == ["T1", "T2"]
+
+
+def test_socket_source_without_reconnect_raises_connection_errors():
+    async def run():
+        probe = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+        port = probe.sockets[0].getsockname()[1]
+        probe.close()
+        await probe.wait_closed()
+        return [flow async for flow in SocketFlowSource("127.0.0.1", port).stream()]
+
+    with pytest.raises(OSError):
+        asyncio.run(run())
+
+
+def test_bad_prints_and_failed_batches_do_not_stop_the_stream(tmp_path):
+    brain = TradingBrain({"storage": {"path": str(tmp_path / "alerts.db")}})
+    detect = brain.detect_flows
+
+    def fragile_detect(flows):
+        if any(flow.get("ticker") == "BAD" for flow in flows):
+            raise ValueError("malformed print")
+        return detect(flows)
+
+    brain.detect_flows = fragile_detect
+
+    async def run():
+        source = QueueFlowSource()
+        processor = FlowStreamProcessor(brain, source, batch_size=1, max_batch_delay_ms=5)
+        process = processor._process
+        calls = {"n": 0}
+
+        async def flaky_process(batch):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("enrichment down")
+            return await process(batch)
+
+        processor._process = flaky_process
+        task = asyncio.create_task(processor.run(collect=True))
+        for ticker in ("AAPL", "BAD", "NVDA"):
+            await source.publish(make_print(ticker))
+        await source.close()
+        return await task, processor
+
+    signals, processor = asyncio.run(run())
+
+    assert [s.candidate.ticker for s in signals] == ["NVDA"]
+    assert processor.stats["errors"] == 2
+
+
+def test_source_failure_is_raised_from_run(tmp_path):
+    brain = TradingBrain({"storage": {"path": str(tmp_path / "alerts.db")}})
+
+    class BrokenSource(QueueFlowSource):
+        async def stream(self):
+            yield make_print("AAPL")
+            raise ConnectionResetError("feed reset")
+
+    async def run():
+        processor = FlowStreamProcessor(brain, BrokenSource(), batch_size=10, max_batch_delay_ms=5)
+        await processor.run()
+
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(run())
+
+
+def test_socket_source_skips_malformed_lines():
+    async def run():
+        async def serve(reader, writer):
+            writer.write(b'{"ticker": "AAPL"}\nnot json\n{"ticker": "NVDA"}\n')
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        source = SocketFlowSource("127.0.0.1", port, reconnect_seconds=0.01)
+        received = []
+        async for flow in source.stream():
+            received.append(flow["ticker"])
+            if len(received) == 2:
+                break
+        server.close()
+        await server.wait_closed()
+        return received, source.stats
+
+    received, stats = asyncio.run(run())
+
+    assert received == ["AAPL", "NVDA"]
+    assert stats["bad_lines"] == 1
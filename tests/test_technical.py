@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from engines import technical
+from engines.technical import IndicatorState, TechnicalEngine
+
+
+def random_universe(tickers: int, bars: int, seed: int = 7):
+    rng = random.Random(seed)
+    prices = []
+    for _ in range(tickers):
+        price = rng.uniform(10, 500)
+        row = []
+        for _ in range(bars):
+            price = max(price * (1 + rng.gauss(0, 0.01)), 0.5)
+            row.append(price)
+        prices.append(row)
+    volumes = [rng.uniform(1e4, 1e6) for _ in range(tickers)]
+    vwaps = [row[-1] * rng.uniform(0.98, 1.02) for row in prices]
+    return [f"T{i}" for i in range(tickers)], prices, volumes, vwaps
+
+
+def assert_matches_per_ticker(engine, bars):
+    tickers, prices, volumes, vwaps = random_universe(40, bars)
+    batch = engine.evaluate_batch(tickers, prices, volumes, vwaps)
+    for ticker, row, volume, vwap, got in zip(tickers, prices, volumes, vwaps, batch):
+        expected = engine.evaluate(ticker, row, volume, vwap, 0.0)
+        assert got.ticker == expected.ticker
+        assert got.bias == expected.bias
+        for field in ("rsi", "macd", "macd_signal", "ema_fast", "ema_mid", "ema_slow", "volume_trend", "vwap", "volume"):
+            assert getattr(got, field) == pytest.approx(getattr(expected, field), rel=1e-9, abs=1e-9)
+        # Checked against the reference recurrences, not just against ``evaluate``.
+        reference = IndicatorState.from_history(row)
+        assert got.rsi == pytest.approx(reference.rsi, rel=1e-9, abs=1e-9)
+        assert (got.macd, got.macd_signal) == pytest.approx(reference.macd, rel=1e-9, abs=1e-9)
+        if bars >= 35:
+            assert got.macd != got.macd_signal
+
+
+@pytest.mark.parametrize("bars", [1, 10, 15, 20, 35, 50])
+def test_evaluate_batch_matches_evaluate(bars):
+    assert_matches_per_ticker(TechnicalEngine(), bars)
+
+
+def test_evaluate_batch_without_numpy(monkeypatch):
+    monkeypatch.setattr(technical, "np", None)
+    assert_matches_per_ticker(TechnicalEngine(), 50)
+
+
+def test_indicator_state_updates_match_reseed():
+    _, prices, _, _ = random_universe(1, 80)
+    closes = prices[0]
+    state = IndicatorState.from_history(closes[:40])
+    for close in closes[40:]:
+        state.update(close)
+    seeded = IndicatorState.from_history(closes)
+    assert state.bars == seeded.bars == 80
+    assert state.rsi == pytest.approx(seeded.rsi)
+    assert state.macd == pytest.approx(seeded.macd)
+    assert state.ema_slow == pytest.approx(TechnicalEngine()._ema(closes, 50))
+
+
+def test_indicator_state_signal_line_is_an_ema_of_macd():
+    closes = [100 + i * 0.5 + (i % 3) for i in range(60)]
+    state = IndicatorState.from_history(closes)
+    macd, signal = state.macd
+    engine = TechnicalEngine()
+    macd_line = [engine._ema(closes[: n + 1], 12) - engine._ema(closes[: n + 1], 26) for n in range(25, 60)]
+    assert macd == pytest.approx(macd_line[-1])
+    assert signal == pytest.approx(engine._ema(macd_line, 9))
+    assert signal != pytest.approx(macd)
+    assert IndicatorState.from_history([float(i) for i in range(1, 30)]).rsi == 100.0
+
+
+def test_incremental_engine_folds_in_only_new_bars():
+    _, prices, _, _ = random_universe(1, 70)
+    closes = prices[0]
+    engine = TechnicalEngine(incremental=True)
+    engine.evaluate("AAA", closes[:50], 1e5, closes[49], 0.0, bars_total=50)
+    assert engine.state_stats == {"updates": 0, "reseeds": 1}
+
+    # Two new bars on a sliding 50-bar window.
+    context = engine.evaluate("AAA", closes[2:52], 1e5, closes[51], 0.0, bars_total=52)
+    assert engine.state_stats == {"updates": 2, "reseeds": 1}
+    expected = IndicatorState.from_history(closes[:52])
+    assert context.rsi == pytest.approx(expected.rsi)
+    assert (context.macd, context.macd_signal) == pytest.approx(expected.macd)
+
+    # A repeated snapshot changes nothing; a shrinking count reseeds.
+    engine.evaluate("AAA", closes[2:52], 1e5, closes[51], 0.0, bars_total=52)
+    assert engine.state_stats["updates"] == 2
+    engine.evaluate("AAA", closes[:20], 1e5, closes[19], 0.0, bars_total=20)
+    assert engine.state_stats["reseeds"] == 2
+
+
+def test_default_signal_line_is_a_real_ema_of_macd():
+    closes = [100 + i * 0.8 + (i % 4) * 0.5 for i in range(60)]
+    context = TechnicalEngine().evaluate("AAA", closes, 1e5, closes[-1], 0.0)
+
+    assert context.macd != pytest.approx(context.macd_signal)
+    assert (context.macd, context.macd_signal) == pytest.approx(IndicatorState.from_history(closes).macd)
+
+
+def test_incremental_mode_does_not_change_indicators():
+    tickers, prices, volumes, vwaps = random_universe(5, 60)
+    full, incremental = TechnicalEngine(), TechnicalEngine(incremental=True)
+    for ticker, row, volume, vwap in zip(tickers, prices, volumes, vwaps):
+        expected = full.evaluate(ticker, row, volume, vwap, 0.0)
+        got = incremental.evaluate(ticker, row, volume, vwap, 0.0, bars_total=len(row))
+        for field in ("rsi", "macd", "macd_signal", "ema_fast", "ema_mid", "ema_slow"):
+            assert getattr(got, field) == pytest.approx(getattr(expected, field), rel=1e-9, abs=1e-9)
+        assert got.bias == expected.bias